@@ -0,0 +1,41 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Optional
+
+
+class BackgroundLoop:
+    """An asyncio event loop running in a daemon thread
+
+    Lets the synchronous crawler drive async clients (such as Playwright)
+    that must stay on one loop: coroutines are submitted from any thread
+    with ``run`` and the caller blocks for the result.
+    """
+
+    def __init__(self, name: str = "crawler-asyncio"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def run(self, coroutine: Awaitable, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the loop and wait for its result"""
+        return self.submit(coroutine).result(timeout)
+
+    def submit(self, coroutine: Awaitable) -> Future:
+        """Schedule a coroutine on the loop without waiting for it"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def in_loop_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def stop(self):
+        """Stop the loop and wait for its thread to exit"""
+        if self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
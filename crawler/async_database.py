@@ -0,0 +1,269 @@
+import asyncio
+import hashlib
+import logging
+import threading
+from concurrent.futures import Future, wait
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set
+import httpx
+from .aio import BackgroundLoop
+from .config import (
+    SUPABASE_URL, SUPABASE_SERVICE_KEY, TIMEOUT, CONNECT_TIMEOUT, DB_MAX_CONNECTIONS, DB_MAX_IN_FLIGHT,
+    DB_MAX_PENDING_WRITES, DB_KEEPALIVE_SECONDS,
+)
+from .database import DatabaseManager
+from .failures import failure_row
+from .models import CampsiteData, PERSISTED_FIELDS
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+def in_filter(values: Iterable[str]) -> str:
+    """PostgREST ``in`` filter, with every value quoted"""
+    quoted = ('"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"' for value in values)
+    return f"in.({','.join(quoted)})"
+
+
+class SupabaseRest:
+    """Minimal async client for PostgREST and Storage
+
+    One ``httpx.AsyncClient`` holds a keep-alive pool of at most
+    ``max_connections`` connections (HTTP/2 when the ``h2`` package is
+    installed, so requests share one multiplexed connection), and a
+    semaphore caps requests in flight. Must be used on a single event loop.
+    """
+
+    def __init__(self, url: str, key: str, max_connections: int = DB_MAX_CONNECTIONS,
+                 max_in_flight: int = DB_MAX_IN_FLIGHT, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.url = url.rstrip('/')
+        self.http2 = HTTP2_AVAILABLE and transport is None
+        self.client = httpx.AsyncClient(
+            base_url=self.url,
+            headers={"apikey": key, "Authorization": f"Bearer {key}"},
+            http2=self.http2,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections,
+                                keepalive_expiry=DB_KEEPALIVE_SECONDS),
+            timeout=httpx.Timeout(TIMEOUT, connect=CONNECT_TIMEOUT),
+            transport=transport,
+        )
+        self.semaphore = asyncio.Semaphore(max_in_flight)
+
+    async def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        async with self.semaphore:
+            response = await self.client.request(method, path, **kwargs)
+        response.raise_for_status()
+        return response
+
+    async def select(self, table: str, columns: str, **filters) -> List[dict]:
+        params = {"select": columns, **filters}
+        return (await self.request("GET", f"/rest/v1/{table}", params=params)).json()
+
+    async def insert(self, table: str, rows):
+        await self.request("POST", f"/rest/v1/{table}", json=rows, headers={"Prefer": "return=minimal"})
+
+    async def upsert(self, table: str, rows, on_conflict: str):
+        await self.request("POST", f"/rest/v1/{table}", json=rows, params={"on_conflict": on_conflict},
+                           headers={"Prefer": "resolution=merge-duplicates,return=minimal"})
+
+    async def update(self, table: str, values: dict, **filters):
+        await self.request("PATCH", f"/rest/v1/{table}", json=values, params=filters,
+                           headers={"Prefer": "return=minimal"})
+
+    async def delete(self, table: str, **filters):
+        await self.request("DELETE", f"/rest/v1/{table}", params=filters)
+
+    async def rpc(self, function: str, arguments: dict):
+        return (await self.request("POST", f"/rest/v1/rpc/{function}", json=arguments)).json()
+
+    async def upload(self, bucket: str, path: str, data: bytes, content_type: str):
+        await self.request("POST", f"/storage/v1/object/{bucket}/{path}", content=data,
+                           headers={"Content-Type": content_type})
+
+    def public_url(self, bucket: str, path: str) -> str:
+        return f"{self.url}/storage/v1/object/public/{bucket}/{path}"
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class AsyncDatabaseManager(DatabaseManager):
+    """DatabaseManager whose per-URL reads and writes use ``SupabaseRest``
+
+    The client runs on a background event loop. Writes (inserts, recrawl
+    changes, last-seen times, the retry queue) are queued and return
+    immediately, so database round trips overlap with fetching and
+    extraction; at most ``max_pending_writes`` are queued before crawl
+    threads wait. Reads still block the calling thread, but concurrent
+    reads from pipeline workers share the pooled connection(s), and
+    retry-queue lookups for a batch of URLs run in parallel. Call
+    ``flush`` (not just the buffer flushes, which miss changes that saves
+    still in flight will buffer) before reading ``write_stats``, and
+    ``close`` at the end.
+    Maintenance operations (statistics, cleanup) use the synchronous client.
+    """
+
+    def __init__(self, url: str = SUPABASE_URL, key: str = SUPABASE_SERVICE_KEY,
+                 max_pending_writes: int = DB_MAX_PENDING_WRITES,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        super().__init__()
+        self._aio = BackgroundLoop("crawler-database")
+        self.rest: SupabaseRest = self._aio.run(self._connect(url, key, transport))
+        self._pending: Set[Future] = set()
+        self._pending_lock = threading.Lock()
+        self._write_slots = threading.BoundedSemaphore(max_pending_writes)
+        logger.info(f"Async database client ready ({'HTTP/2' if self.rest.http2 else 'HTTP/1.1'})")
+
+    async def _connect(self, url: str, key: str, transport) -> SupabaseRest:
+        # Created on the loop that will use it
+        return SupabaseRest(url, key, transport=transport)
+
+    def _run(self, coroutine):
+        return self._aio.run(coroutine, timeout=TIMEOUT * 2)
+
+    def _submit(self, coroutine, description: str):
+        """Queue a write without waiting for it"""
+        on_loop = self._aio.in_loop_thread()
+        if not on_loop:
+            # Backpressure; writes queued from the loop itself must not block it
+            self._write_slots.acquire()
+        future = self._aio.submit(coroutine)
+        with self._pending_lock:
+            self._pending.add(future)
+
+        def done(future: Future):
+            with self._pending_lock:
+                self._pending.discard(future)
+            if not on_loop:
+                self._write_slots.release()
+            if not future.cancelled() and future.exception() is not None:
+                self._count("failed_writes")
+                logger.error(f"Error {description}: {str(future.exception())}")
+
+        future.add_done_callback(done)
+
+    def url_exists(self, url: str) -> bool:
+        """Check if URL already exists in database"""
+        try:
+            return bool(self._run(self.rest.select('campsites', 'id', url=f"eq.{url}", limit="1")))
+        except Exception as e:
+            logger.error(f"Error checking URL existence: {str(e)}")
+            return False
+
+    def save_campsite(self, campsite_data: CampsiteData) -> bool:
+        """Queue an insert or field-level update; True once queued"""
+        self._submit(self._save_campsite(campsite_data), f"saving campsite {campsite_data.name}")
+        return True
+
+    async def _save_campsite(self, campsite_data: CampsiteData):
+        rows = await self.rest.select('campsites', f"{', '.join(PERSISTED_FIELDS)}, content_fingerprint",
+                                      url=f"eq.{campsite_data.url}", limit="1")
+        if rows:
+            self._queue_changes(campsite_data, rows[0])
+            return
+
+        await self.rest.insert('campsites', self._new_row(campsite_data))
+        self._count("inserted")
+
+    def flush_updates(self):
+        """Queue the pending field-level changes as one call"""
+        with self._updates_lock:
+            changes, self.pending_updates = self.pending_updates, []
+        if changes:
+            self._submit(self.rest.rpc('apply_campsite_changes', {"changes": changes}),
+                         f"applying changes to {len(changes)} campsites")
+
+    def flush_seen_urls(self):
+        """Queue buffered last-seen times as one update"""
+        with self._seen_lock:
+            urls, self.seen_urls = self.seen_urls, []
+        if urls:
+            self._submit(
+                self.rest.update('campsites', {"last_crawled_at": datetime.now(timezone.utc).isoformat()},
+                                 url=in_filter(urls)),
+                f"updating last crawl time for {len(urls)} URLs"
+            )
+
+    async def upload_screenshot(self, screenshot_bytes: bytes, url: str) -> Optional[str]:
+        """Upload screenshot to Supabase storage, from any event loop"""
+        filename = f"screenshots/{hashlib.md5(url.encode()).hexdigest()}.png"
+        try:
+            await asyncio.wrap_future(self._aio.submit(
+                self.rest.upload('campsites', filename, screenshot_bytes, "image/png")
+            ))
+        except Exception as e:
+            logger.error(f"Error uploading screenshot for {url}: {str(e)}")
+            return None
+
+        public_url = self.rest.public_url('campsites', filename)
+        logger.info(f"Screenshot uploaded successfully: {public_url}")
+        return public_url
+
+    def mark_url_as_failed(self, url: str, error: str, error_type: str = "other",
+                           status_code: Optional[int] = None, permanent: bool = False):
+        """Queue a failed crawl for the retry queue"""
+        self.failed_urls.add(url)
+        self._submit(self._mark_url_as_failed(url, error, error_type, status_code, permanent),
+                     f"marking URL as failed: {url}")
+
+    async def _mark_url_as_failed(self, url: str, error: str, error_type: str,
+                                  status_code: Optional[int], permanent: bool):
+        existing = await self.rest.select('crawl_failures', 'attempts', url=f"eq.{url}")
+        attempts = (existing[0]['attempts'] if existing else 0) + 1
+        row = failure_row(url, error, error_type, status_code, permanent, attempts)
+        await self.rest.upsert('crawl_failures', row, on_conflict='url')
+
+    def clear_failure(self, url: str):
+        """Queue removal of a URL from the retry queue"""
+        if url not in self.failed_urls:
+            return
+        self.failed_urls.discard(url)
+        self._submit(self.rest.delete('crawl_failures', url=f"eq.{url}"), f"clearing failure for {url}")
+
+    def get_failure_states(self, urls: List[str], chunk_size: int = 100) -> Dict[str, dict]:
+        """Fetch retry-queue rows for the given URLs, all chunks in parallel"""
+        async def fetch():
+            chunks = [urls[i:i + chunk_size] for i in range(0, len(urls), chunk_size)]
+            results = await asyncio.gather(*(
+                self.rest.select('crawl_failures', 'url, permanent, next_attempt_at', url=in_filter(chunk))
+                for chunk in chunks
+            ))
+            return {row['url']: row for rows in results for row in rows}
+
+        states = {}
+        try:
+            states = self._run(fetch())
+        except Exception as e:
+            logger.error(f"Error fetching failure states: {str(e)}")
+
+        self.failed_urls.update(states)
+        return states
+
+    def drain(self, timeout: Optional[float] = None):
+        """Wait until every queued write has finished"""
+        # Saves may queue batched changes of their own while we wait
+        while True:
+            with self._pending_lock:
+                pending = [future for future in self._pending if not future.done()]
+            if not pending:
+                return
+            _, not_done = wait(pending, timeout=timeout)
+            if not_done:
+                logger.warning(f"{len(not_done)} database writes still pending")
+                return
+
+    def close(self):
+        """Finish queued and buffered writes and close the connection pool"""
+        if self._aio.loop.is_closed():
+            return
+        self.flush(timeout=TIMEOUT * 2)
+        try:
+            self._run(self.rest.close())
+        except Exception as e:
+            logger.debug("Error closing database client: %s", e)
+        self._aio.stop()
@@ -0,0 +1,108 @@
+import logging
+import re
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+from .config import BUDGET_DRAIN_SECONDS, BUDGET_DEFAULT_URL_SECONDS, BUDGET_RATE_SMOOTHING, BUDGET_DUE_BONUS
+from .frontier import score_link
+
+logger = logging.getLogger(__name__)
+
+DURATION_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([smh]?)\s*$', re.IGNORECASE)
+DURATION_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(value: str) -> float:
+    """Seconds from ``"3000"``, ``"90s"``, ``"50m"`` or ``"1.5h"``"""
+    match = DURATION_PATTERN.match(value)
+    if not match:
+        raise ValueError(f"Invalid duration: {value!r}")
+    return float(match.group(1)) * DURATION_UNITS[match.group(2).lower()]
+
+
+def prioritize(urls: Iterable[str], due: Iterable[str] = ()) -> List[str]:
+    """Order URLs for a budgeted crawl, due retries and likely programs first"""
+    due = set(due)
+    scored = [(score_link(url) + (BUDGET_DUE_BONUS if url in due else 0.0), i, url) for i, url in enumerate(urls)]
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    return [url for _, _, url in scored]
+
+
+class CrawlBudget:
+    """Wall-clock budget for a crawl, with per-host throughput estimates
+
+    Each host's time per URL (request, pacing and extraction) is tracked as
+    an exponential moving average. A URL is only admitted if its host's
+    estimate fits before the deadline minus ``drain_seconds``, the time kept
+    back to finish in-flight work and write results. URLs that are not
+    admitted are kept in ``skipped`` for the checkpoint.
+    """
+
+    def __init__(self, seconds: float, drain_seconds: float = BUDGET_DRAIN_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.seconds = seconds
+        self.drain_seconds = min(drain_seconds, seconds / 2)
+        self.clock = clock
+        self.started_at = clock()
+        self.deadline = self.started_at + seconds
+        self.skipped: List[str] = []
+        self._host_seconds: Dict[str, float] = {}
+        self._average_seconds: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _host(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def remaining(self) -> float:
+        return self.deadline - self.clock()
+
+    def admitting(self) -> bool:
+        """Whether any new work may still start"""
+        return self.remaining() > self.drain_seconds
+
+    def estimate(self, url: str) -> float:
+        """Expected seconds to crawl a URL, from its host's history"""
+        with self._lock:
+            estimate = self._host_seconds.get(self._host(url), self._average_seconds)
+        return BUDGET_DEFAULT_URL_SECONDS if estimate is None else estimate
+
+    def admits(self, url: str, wait: float = 0.0) -> bool:
+        """Whether a URL, after ``wait`` seconds of host pacing, fits the budget"""
+        return self.remaining() - wait - self.estimate(url) > self.drain_seconds
+
+    def record(self, url: str, seconds: float):
+        """Fold a finished URL's duration into its host's estimate"""
+        host = self._host(url)
+        with self._lock:
+            previous = self._host_seconds.get(host)
+            self._host_seconds[host] = seconds if previous is None else \
+                previous + BUDGET_RATE_SMOOTHING * (seconds - previous)
+            average = self._average_seconds
+            self._average_seconds = seconds if average is None else \
+                average + BUDGET_RATE_SMOOTHING * (seconds - average)
+
+    def skip(self, url: str):
+        with self._lock:
+            self.skipped.append(url)
+
+    def write_checkpoint(self, path: str) -> int:
+        """Write the URLs left for a later run, one per line; returns their count"""
+        with self._lock:
+            skipped = list(self.skipped)
+        with open(path, 'w') as f:
+            for url in skipped:
+                f.write(f"{url}\n")
+        if skipped:
+            logger.info(f"Time budget: {len(skipped)} URLs left for a later run, written to {path}")
+        return len(skipped)
+
+    def stats(self) -> dict:
+        return {
+            "seconds": self.seconds,
+            "elapsed": round(self.clock() - self.started_at, 1),
+            "skipped": len(self.skipped),
+            "hosts": len(self._host_seconds),
+            "average_url_seconds": round(self._average_seconds or 0.0, 3),
+        }
@@ -0,0 +1,120 @@
+import codecs
+import re
+from typing import Optional, Tuple
+from .config import ENCODING_SNIFF_BYTES
+
+CONTENT_TYPE_CHARSET_PATTERN = re.compile(r'charset\s*=\s*["\']?\s*([\w.:+-]+)', re.IGNORECASE)
+# <meta charset="x"> and <meta http-equiv="Content-Type" content="text/html; charset=x">
+META_CHARSET_PATTERN = re.compile(rb'<meta[^>]+?charset\s*=\s*["\']?\s*([\w.:+-]+)', re.IGNORECASE)
+
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# Labels browsers decode as windows-1252, which is a superset of them
+WINDOWS_1252_ALIASES = {'ascii', 'latin-1', 'iso8859-1', 'cp1252'}
+
+# Where the encoding of a page came from, in the order they are tried
+ENCODING_SOURCES = ("bom", "header", "meta", "utf8", "detected", "default")
+
+
+def normalize_encoding(label: Optional[str]) -> Optional[str]:
+    """Python codec name for a charset label, or None if it is unknown"""
+    if not label:
+        return None
+    try:
+        name = codecs.lookup(label.strip().lower()).name
+    except LookupError:
+        return None
+    return 'cp1252' if name in WINDOWS_1252_ALIASES else name
+
+
+def is_utf8(encoding: Optional[str]) -> bool:
+    return encoding is None or normalize_encoding(encoding) == 'utf-8'
+
+
+def charset_from_content_type(content_type: Optional[str]) -> Optional[str]:
+    """Encoding named by a Content-Type header, if any and known
+
+    Unlike ``requests``, a text type without a charset gives None rather
+    than ISO-8859-1, so the body itself is looked at next.
+    """
+    if not content_type:
+        return None
+    match = CONTENT_TYPE_CHARSET_PATTERN.search(content_type)
+    return normalize_encoding(match.group(1)) if match else None
+
+
+def _detect(body: bytes) -> Optional[str]:
+    try:
+        from charset_normalizer import from_bytes
+    except ImportError:
+        return None
+    best = from_bytes(body).best()
+    return normalize_encoding(best.encoding) if best is not None else None
+
+
+def _is_utf8_prefix(body: bytes) -> bool:
+    """Whether a body is UTF-8, allowing its last character to be cut off
+
+    A body truncated at ``MAX_BODY_BYTES`` can end partway through a
+    multi-byte character, which must not send it to statistical detection.
+    """
+    try:
+        body.decode('utf-8')
+        return True
+    except UnicodeDecodeError as e:
+        # An incomplete sequence is at most 3 bytes; anything earlier is a real error
+        if e.start < len(body) - 3:
+            return False
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(body, final=False)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def sniff_encoding(body: bytes, content_type: Optional[str] = None, detect: bool = True) -> Tuple[str, str]:
+    """Encoding of an HTML body and where it came from, see ``ENCODING_SOURCES``
+
+    In the order browsers use: a byte order mark, the Content-Type
+    charset, a ``<meta>`` charset in the first ``ENCODING_SNIFF_BYTES``,
+    then a check that the body is valid UTF-8 (a character cut off at the
+    end is allowed). Only if all of these fail does the (slow) statistical
+    detection run, and windows-1252 is the last resort. With ``detect`` False, as for a partial body, UTF-8 is
+    assumed instead of checked or detected.
+    """
+    for bom, encoding in BOMS:
+        if body.startswith(bom):
+            return encoding, "bom"
+
+    encoding = charset_from_content_type(content_type)
+    if encoding:
+        return encoding, "header"
+
+    match = META_CHARSET_PATTERN.search(body, 0, ENCODING_SNIFF_BYTES)
+    encoding = normalize_encoding(match.group(1).decode('ascii')) if match else None
+    if encoding:
+        # A UTF-16 label in the markup cannot be right, since the markup was read as ASCII
+        return ('utf-8' if encoding.startswith('utf-16') else encoding), "meta"
+
+    if not detect:
+        return 'utf-8', "default"
+
+    if _is_utf8_prefix(body):
+        return 'utf-8', "utf8"
+
+    encoding = _detect(body)
+    if encoding:
+        return encoding, "detected"
+    return 'cp1252', "default"
+
+
+def decode_body(body: bytes, encoding: Optional[str]) -> str:
+    """Decode a body, replacing invalid bytes"""
+    try:
+        return body.decode(encoding or 'utf-8', errors='replace')
+    except LookupError:
+        return body.decode('utf-8', errors='replace')
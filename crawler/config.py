@@ -12,6 +12,89 @@ USER_AGENT = "StudyTourBot/1.0 (+https://studytour.com/bot)"
 REQUEST_DELAY = 1  # Delay between requests in seconds
 MAX_RETRIES = 3
 TIMEOUT = 30
+CONNECT_TIMEOUT = 10  # Fail fast on unreachable hosts; TIMEOUT still bounds reads
+
+# Response body limits
+HTML_CONTENT_TYPES = ["text/html", "application/xhtml+xml"]
+MAX_BODY_BYTES = 2 * 1024 * 1024  # Longer bodies are truncated before parsing
+DOWNLOAD_CHUNK_SIZE = 16 * 1024
+EARLY_RELEVANCE_BYTES = 32 * 1024  # Relevance pre-check after <head> and this many bytes (0 disables)
+
+# HTML parsing: "lxml" (native tree, falls back to BeautifulSoup on parse errors) or "soup"
+HTML_PARSER = os.getenv("HTML_PARSER", "lxml").lower()
+ENCODING_SNIFF_BYTES = 4096  # Bytes searched for a <meta> charset when the header has none
+
+# Extraction cache (body hash -> extracted fields)
+EXTRACTION_CACHE_PATH = os.getenv("EXTRACTION_CACHE_PATH", ".crawler_cache/extractions.sqlite3")  # Empty disables
+EXTRACTION_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Least recently used entries are evicted beyond this
+
+# Page store (history of fetched bodies, zstd-compressed with per-host trained dictionaries)
+PAGE_STORE_PATH = os.getenv("PAGE_STORE_PATH", "")  # Empty disables, e.g. ".crawler_cache/pages.sqlite3"
+PAGE_STORE_LEVEL = 9  # zstd compression level
+PAGE_STORE_DICT_SIZE = 112 * 1024  # Upper bound for a trained dictionary
+PAGE_STORE_TRAIN_PAGES = 50  # Pages of a host stored before its first dictionary is trained
+PAGE_STORE_TRAIN_MAX_PAGES = 500  # Most recent pages of a host used as training samples
+PAGE_STORE_RETRAIN_PAGES = 2000  # Pages stored with a dictionary before the next version is trained
+
+# Per-host adaptive rate control (AIMD)
+MIN_REQUEST_DELAY = 0.5  # Floor for the per-host delay after sustained success
+MAX_REQUEST_DELAY = 60  # Ceiling for the per-host delay (and honoured Retry-After)
+DELAY_DECREASE_STEP = 0.1  # Additive delay decrease per successful request
+DELAY_BACKOFF_FACTOR = 2.0  # Multiplicative delay increase on throttling/errors
+MAX_HOST_CONCURRENCY = 4  # Upper bound for the per-host concurrency window
+
+# Connection pooling and DNS
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "8"))  # Requests in flight across all hosts
+POOL_CONNECTIONS = CRAWL_CONCURRENCY * 4  # Hosts whose connection pool is kept alive
+POOL_MAXSIZE = max(MAX_HOST_CONCURRENCY, 1)  # Keep-alive connections kept per host
+DNS_CACHE_TTL = 300  # Seconds a resolved address is reused (0 disables the cache)
+DNS_CACHE_SIZE = 4096  # Resolved (host, port) entries kept
+
+# Streaming pipeline (--stream)
+PIPELINE_QUEUE_SIZE = 100  # Items buffered between two stages; bounds memory and applies backpressure
+EXTRACT_WORKERS = 2  # Threads parsing downloaded pages
+PIPELINE_FILTER_CHUNK = 100  # Input URLs checked against the retry queue per lookup
+PIPELINE_MAX_DEFERRED = 1000  # URLs parked for suspended hosts before input reading pauses
+PIPELINE_DEDUPE_SIZE = 100_000  # Recent distinct URLs remembered to drop repeats (about 90 bytes each)
+
+# Time-budgeted crawls (--time-budget)
+BUDGET_DRAIN_SECONDS = 120  # Kept back from the budget to finish in-flight URLs and write results
+BUDGET_DEFAULT_URL_SECONDS = 5.0  # Assumed time per URL before a host has been measured
+BUDGET_RATE_SMOOTHING = 0.3  # Weight of the latest URL in the per-host time estimate
+BUDGET_DUE_BONUS = 2.0  # Priority boost for retry-queue URLs whose backoff has elapsed
+
+# Per-host circuit breaker
+CIRCUIT_BREAKER_THRESHOLD = 5  # Consecutive failures before a host is suspended
+CIRCUIT_BREAKER_COOLDOWN = 60  # Seconds before a suspended host is probed again
+CIRCUIT_BREAKER_MAX_TRIPS = 3  # Give up on a host for the run after this many trips
+
+# Failed URL retry queue
+FAILURE_RETRY_BASE_DELAY = 60 * 60  # First retry of a transient failure after an hour
+FAILURE_RETRY_MAX_DELAY = 7 * 24 * 60 * 60  # Backoff is capped at a week
+FAILURE_MAX_ATTEMPTS = 8  # Transient failures become permanent after this many attempts
+NXDOMAIN_MAX_ATTEMPTS = 3  # Hosts whose name does not resolve are given up on after this many attempts
+FAILURE_RETRY_LIMIT = 100  # Due failures picked up per run with --retry-failed
+
+# Headless rendering of client-side rendered (SPA) pages
+RENDER_JS_PAGES = os.getenv("RENDER_JS_PAGES", "true").lower() in ("1", "true", "yes")
+SPA_MIN_TEXT_CHARS = 200  # Pages with more visible text are never rendered
+SPA_TINY_TEXT_CHARS = 50  # Below this, any page with scripts counts as a shell
+RENDER_POOL_SIZE = 2  # Browser tabs shared by all renders
+RENDER_TIMEOUT = 20  # Seconds for a page to load in the browser
+RENDER_BLOCKED_RESOURCES = {"image", "font", "media"}
+
+# Thumbnail validation: candidate images are probed with a ranged GET
+PROBE_IMAGES = os.getenv("PROBE_IMAGES", "true").lower() in ("1", "true", "yes")
+IMAGE_MAX_CANDIDATES = 5  # Thumbnail candidates kept per page, in page priority order
+IMAGE_PROBE_BYTES = 16 * 1024  # Bytes read per image to find its format and dimensions
+IMAGE_PROBE_CONCURRENCY = 16  # Image requests in flight
+IMAGE_PROBE_TIMEOUT = 10  # Seconds per image; a page's save waits at most this long for its probes
+IMAGE_PROBE_CACHE_SIZE = 10000  # Probed image URLs remembered for the run
+IMAGE_PROBE_LOOKAHEAD = 8  # Batch mode: pages fetched before an earlier page is saved, so its probes overlap
+IMAGE_MIN_WIDTH = 200  # Smaller images are icons, badges or tracking pixels
+IMAGE_MIN_HEIGHT = 100
+IMAGE_MAX_BYTES = 5 * 1024 * 1024  # Larger files are too heavy for the web UI
+IMAGE_MAX_ASPECT_RATIO = 4.0  # Wider (or taller) images are banners and strips
 
 # Screenshot Configuration
 SCREENSHOT_WIDTH = 1200
@@ -38,9 +121,60 @@ CONTENT_KEYWORDS = [
     "student exchange", "immersion program", "academic program"
 ]
 
+# Relevance scoring: weighted terms (unigrams or bigrams) on top of
+# CONTENT_KEYWORDS, which all weigh 1.0. Negative weights push junk pages down.
+RELEVANCE_TERMS = {
+    "students": 0.15, "program": 0.15, "programs": 0.15, "course": 0.15,
+    "courses": 0.15, "camp": 0.15, "camps": 0.15, "tuition": 0.2,
+    "accommodation": 0.2, "homestay": 0.3, "excursions": 0.2, "immersion": 0.2,
+    "language school": 0.5, "exchange program": 0.5, "host family": 0.3,
+    "shopping cart": -0.8, "checkout": -0.5, "free shipping": -0.8,
+    "casino": -1.0, "coupon": -0.5, "job vacancies": -0.5,
+}
+RELEVANCE_THRESHOLD = 0.6  # Tune with --calibrate-relevance
+RELEVANCE_HASH_BITS = 16  # Hashed term-frequency vectors have 2**bits features
+RELEVANCE_BATCH_SIZE = 32  # Pages vectorized together when scoring many at once (calibration)
+
+# Discovery frontier: links are fetched in descending priority score
+DISCOVERY_MAX_PAGES = 100  # Pages fetched per discovery run
+FRONTIER_URL_TERMS = {
+    "program": 2.0, "programs": 2.0, "camp": 2.5, "camps": 2.5, "course": 1.5,
+    "courses": 1.5, "summer": 1.5, "winter": 1.5, "abroad": 1.5, "study": 1.0,
+    "immersion": 1.5, "exchange": 1.0, "international": 1.0, "school": 0.5,
+    "blog": -1.0, "news": -1.0, "tag": -1.5, "category": -0.5, "page": -0.5,
+    "about": -0.5, "contact": -1.0, "careers": -1.5, "privacy": -2.0, "terms": -2.0,
+}
+FRONTIER_ANCHOR_WEIGHT = 1.0  # Per content keyword in the link text (up to 3)
+FRONTIER_DEPTH_PENALTY = 1.0  # Subtracted per level below the seed
+FRONTIER_PARENT_WEIGHT = 1.5  # Per RELEVANCE_THRESHOLD of the linking page's relevance
+
 # Database Configuration
 BATCH_SIZE = 10  # Number of records to insert at once
 
+# Async database client (per-URL reads and writes off the crawl threads)
+DB_ASYNC = os.getenv("DB_ASYNC", "true").lower() in ("1", "true", "yes")
+DB_MAX_CONNECTIONS = 10  # Pooled connections to PostgREST and Storage (HTTP/2 multiplexes over one)
+DB_MAX_IN_FLIGHT = 16  # Database requests in flight
+DB_MAX_PENDING_WRITES = 200  # Queued writes before crawl threads wait for the database
+DB_KEEPALIVE_SECONDS = 60  # Idle pooled connections are closed after this long
+
+# Retention of stale crawler rows
+CLEANUP_BATCH_SIZE = 200  # Rows examined and removed per batch
+CLEANUP_BATCH_DELAY = 0.5  # Pause between batches so cleanup can run alongside crawls
+
+# Profiling (--profile)
+PROFILE_SAMPLE_INTERVAL = 0.005  # Seconds between stack samples
+PROFILE_TOP_N = 40  # Entries in the text and allocation reports
+PROFILE_TRACEMALLOC_FRAMES = 10  # Stack depth recorded per allocation
+
+# Live status (--status-interval, --status-port)
+STATUS_INTERVAL = 30  # Seconds between status lines in the log (0 disables)
+STATUS_RATE_WINDOW = 60  # Seconds of history behind the current rate and ETA
+STATUS_TOP_HOSTS = 3  # Busiest hosts shown in the status line
+
 # Logging Configuration
 LOG_LEVEL = "INFO"
-LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
\ No newline at end of file
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+LOG_FILE = "crawler.log"
+LOG_JSON = os.getenv("LOG_JSON", "").lower() in ("1", "true", "yes")  # JSON lines instead of LOG_FORMAT
+LOG_URL_SAMPLE_EVERY = 10  # Keep 1 in N per-URL INFO messages (1 keeps all); warnings are never sampled
\ No newline at end of file
@@ -1,50 +1,92 @@
 import asyncio
+import heapq
+import itertools
 import logging
+import re
 import time
-from typing import List, Optional
-from urllib.parse import urlparse, urljoin
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, Iterator, List, Optional, Sequence, Sized, Tuple, Union
+from urllib.parse import urljoin
 import requests
-from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.util.retry import Retry
+from urllib3.util.request import ACCEPT_ENCODING
 from fake_useragent import UserAgent
 from playwright.async_api import async_playwright
 from .config import *
-from .models import CrawlResult, CampsiteData
+from .models import CrawlResult, CampsiteData, FetchedPage
+from .results import ResultBuffer
 from .extractors import ContentExtractor
+from .charset import decode_body, sniff_encoding
 from .database import DatabaseManager
+from .throttle import HostThrottle, HostUnavailableError
+from .network import PooledHTTPAdapter
+from .logging_setup import URL_LOGGER
+from .frontier import HostFrontiers, normalize_url, score_link
+from .renderer import has_spa_markers, is_spa_shell
+from .failures import UnsupportedContentTypeError, classify_failure
+from .pipeline import CrawlPipeline
+from .budget import CrawlBudget
+from .telemetry import CrawlTelemetry
 
 logger = logging.getLogger(__name__)
+url_logger = logging.getLogger(URL_LOGGER)
+
+HEAD_END_PATTERN = re.compile(rb'</head\s*>', re.IGNORECASE)
 
 class WebCrawler:
     """Web crawler for campsite data extraction"""
 
-    def __init__(self):
+    def __init__(self, db_manager=None, extraction_cache=None, renderer=None, refresh_existing: bool = False,
+                 image_prober=None, page_store=None):
         self.session = self._setup_session()
+        self.dns_cache = self.adapter.dns_cache
         self.extractor = ContentExtractor()
-        self.db_manager = DatabaseManager()
+        # Any object with DatabaseManager's interface, e.g. a LocalStore
+        self.db_manager = db_manager if db_manager is not None else DatabaseManager()
+        self.extraction_cache = extraction_cache
+        # Headless browser, only used for pages that are client-side rendered
+        self.renderer = renderer
+        # Recrawl URLs already stored and write only the fields that changed
+        self.refresh_existing = refresh_existing
+        # Validates thumbnail candidates between extraction and saving
+        self.image_prober = image_prober
+        # Keeps a compressed history of every downloaded body
+        self.page_store = page_store
         self.user_agent = UserAgent()
+        self.throttle = HostThrottle()
+        # Running totals for the status line and endpoint
+        self.telemetry = CrawlTelemetry()
+        # How each body's encoding was found, see charset.ENCODING_SOURCES
+        self.encoding_stats = Counter()
 
     def _setup_session(self) -> requests.Session:
         """Setup requests session with retry strategy"""
         session = requests.Session()
 
-        # Retry strategy
+        # Retry strategy: transient 5xx are retried inline, but 429 and
+        # Retry-After are left to the per-host throttle so a slow host does
+        # not block the crawl thread. Dead hosts get a single connect retry.
         retry_strategy = Retry(
             total=MAX_RETRIES,
+            connect=1,
             backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
+            status_forcelist=[500, 502, 503, 504],
+            respect_retry_after_header=False,
+            raise_on_status=False,
         )
 
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
+        # One adapter for both schemes, so pool sizing and reuse metrics are shared
+        self.adapter = PooledHTTPAdapter(max_retries=retry_strategy)
+        session.mount("http://", self.adapter)
+        session.mount("https://", self.adapter)
 
         # Set default headers
         session.headers.update({
             'User-Agent': USER_AGENT,
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
+            'Accept-Encoding': ACCEPT_ENCODING,  # Adds br/zstd when a decoder is installed
             'DNT': '1',
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
@@ -52,16 +94,116 @@ class WebCrawler:
 
         return session
 
+    def connection_stats(self) -> dict:
+        """Connection reuse and DNS cache metrics"""
+        stats = self.adapter.connection_stats()
+        if self.dns_cache is not None:
+            stats["dns"] = self.dns_cache.stats()
+        return stats
+
+    def _get(self, url: str, stream: bool = False) -> requests.Response:
+        """GET a URL through the per-host throttle"""
+        if not self.throttle.acquire(url):
+            raise HostUnavailableError(f"Host suspended by circuit breaker: {self.throttle.host_for(url)}")
+
+        try:
+            response = self.session.get(url, timeout=(CONNECT_TIMEOUT, TIMEOUT), stream=stream)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            self.throttle.release(url, failed=True)
+            raise
+        except Exception:
+            # Not a response from the host; counting it as one would reset its backoff
+            self.throttle.release(url, failed=True)
+            raise
+
+        self.throttle.release(url, response.status_code, response.headers.get('Retry-After'))
+        return response
+
+    def _is_html_response(self, response: requests.Response) -> bool:
+        """Check the Content-Type header before downloading the body"""
+        content_type = response.headers.get('Content-Type')
+        if not content_type:
+            return True
+
+        mime_type = content_type.split(';')[0].strip().lower()
+        return mime_type in HTML_CONTENT_TYPES
+
+    def _read_body(self, response: requests.Response, check_relevance: bool = False) -> Optional[bytes]:
+        """Stream a response body, truncated at MAX_BODY_BYTES
+
+        With ``check_relevance``, a cheap keyword test runs once the
+        ``<head>`` and the first ``EARLY_RELEVANCE_BYTES`` have arrived, and
+        None is returned for irrelevant pages without reading the rest.
+        """
+        body = bytearray()
+        pending_check = check_relevance and EARLY_RELEVANCE_BYTES > 0
+
+        try:
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                body += chunk
+
+                if len(body) >= MAX_BODY_BYTES:
+                    del body[MAX_BODY_BYTES:]
+                    logger.debug("Body truncated at %d bytes: %s", MAX_BODY_BYTES, response.url)
+                    break
+
+                if pending_check and len(body) >= EARLY_RELEVANCE_BYTES and HEAD_END_PATTERN.search(body):
+                    pending_check = False
+                    encoding, _ = sniff_encoding(body, response.headers.get('Content-Type'), detect=False)
+                    prefix = decode_body(body, encoding)
+                    # An app shell has no content until it is rendered
+                    if self.renderer is not None and has_spa_markers(prefix):
+                        continue
+                    if not self.extractor.is_relevant_prefix(prefix):
+                        logger.debug("Dropping irrelevant page after %d bytes: %s", len(body), response.url)
+                        return None
+        finally:
+            response.close()
+
+        return bytes(body)
+
+    @staticmethod
+    def _raise_for_status(response: requests.Response):
+        """``raise_for_status`` that first returns an error response's connection to the pool"""
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError:
+            response.close()
+            raise
+
+    def _sniff_encoding(self, body: bytes, response: requests.Response) -> str:
+        """Encoding of a downloaded body, counting which source gave it"""
+        encoding, source = sniff_encoding(body, response.headers.get('Content-Type'))
+        self.encoding_stats[source] += 1
+        return encoding
+
     def crawl_url(self, url: str) -> CrawlResult:
         """Crawl a single URL and extract campsite data"""
+        page = self.fetch_page(url)
+        if isinstance(page, CrawlResult):
+            return page
+
+        result = self.extract_page(page)
+        self.persist_result(result)
+        return result
+
+    def fetch_page(self, url: str) -> Union[FetchedPage, CrawlResult]:
+        """Download a URL for extraction
+
+        Returns the page, or a finished ``CrawlResult`` when there is nothing
+        to extract: a URL already in the database, an irrelevant page or a
+        failed request.
+        """
         start_time = time.time()
 
         try:
-            logger.info(f"Crawling URL: {url}")
+            # Per-URL messages are lazily formatted and sampled (see logging_setup)
+            url_logger.info("Crawling URL: %s", url, extra={"url": url})
 
             # Check if URL already exists in database
-            if self.db_manager.url_exists(url):
-                logger.info(f"URL already exists in database: {url}")
+            if not self.refresh_existing and self.db_manager.url_exists(url):
+                url_logger.info("URL already exists in database: %s", url, extra={"url": url})
+                self.db_manager.mark_url_as_seen(url)
                 return CrawlResult(
                     url=url,
                     success=False,
@@ -69,63 +211,222 @@ class WebCrawler:
                     processing_time=time.time() - start_time
                 )
 
-            # Make HTTP request
-            response = self.session.get(url, timeout=TIMEOUT)
-            response.raise_for_status()
+            # Make HTTP request, reading only the headers for now
+            response = self._get(url, stream=True)
+            self._raise_for_status(response)
 
-            # Extract campsite data
-            campsite_data = self.extractor.extract_campsite_data(response.text, url)
-
-            if campsite_data:
-                # Save to database
-                success = self.db_manager.save_campsite(campsite_data)
-                if success:
-                    logger.info(f"Successfully saved campsite: {campsite_data.name}")
-                else:
-                    logger.error(f"Failed to save campsite: {campsite_data.name}")
-
-            return CrawlResult(
-                url=url,
-                success=campsite_data is not None,
-                campsite_data=campsite_data,
-                status_code=response.status_code,
-                processing_time=time.time() - start_time
-            )
+            if not self._is_html_response(response):
+                response.close()
+                raise UnsupportedContentTypeError(
+                    f"Unsupported content type: {response.headers.get('Content-Type')}",
+                    response=response
+                )
+
+            body = self._read_body(response, check_relevance=True)
+            self.db_manager.clear_failure(url)
+            if body is not None:
+                self.telemetry.record_bytes(url, len(body))
+            if body is None:
+                return CrawlResult(
+                    url=url,
+                    success=False,
+                    status_code=response.status_code,
+                    processing_time=time.time() - start_time
+                )
+
+            return FetchedPage(url, body, response.status_code, self._sniff_encoding(body, response), start_time)
 
         except requests.exceptions.RequestException as e:
-            logger.error(f"Request error for {url}: {str(e)}")
-            return CrawlResult(
-                url=url,
-                success=False,
-                error=str(e),
-                processing_time=time.time() - start_time
-            )
+            logger.error("Request error for %s: %s", url, e, extra={"url": url})
+            return self._failure_result(url, e, start_time, getattr(e.response, 'status_code', None))
         except Exception as e:
-            logger.error(f"Unexpected error for {url}: {str(e)}")
-            return CrawlResult(
-                url=url,
-                success=False,
-                error=str(e),
-                processing_time=time.time() - start_time
-            )
+            logger.error("Unexpected error for %s: %s", url, e, extra={"url": url})
+            return self._failure_result(url, e, start_time)
 
-    def crawl_urls(self, urls: List[str]) -> List[CrawlResult]:
-        """Crawl multiple URLs"""
-        results = []
+    def extract_page(self, page: FetchedPage) -> CrawlResult:
+        """Extract campsite data from a downloaded page"""
+        if self.page_store is not None:
+            try:
+                self.page_store.put(page.url, page.body)
+            except Exception as e:
+                logger.error("Error storing page %s: %s", page.url, e, extra={"url": page.url})
 
-        for i, url in enumerate(urls):
-            if i > 0:
-                time.sleep(REQUEST_DELAY)  # Rate limiting
+        try:
+            campsite_data = self._extract(page.body, page, page.url)
+        except Exception as e:
+            logger.error("Unexpected error for %s: %s", page.url, e, extra={"url": page.url})
+            return self._failure_result(page.url, e, page.started_at)
+
+        if campsite_data is not None and self.image_prober is not None:
+            # Probed in the background while the page waits to be saved
+            self.image_prober.prefetch(campsite_data.thumbnail_candidates)
+
+        return CrawlResult(
+            url=page.url,
+            success=campsite_data is not None,
+            campsite_data=campsite_data,
+            status_code=page.status_code,
+            processing_time=time.time() - page.started_at
+        )
+
+    def persist_result(self, result: CrawlResult):
+        """Save the campsite found by a crawl, if any"""
+        campsite_data = result.campsite_data
+        if not result.success or campsite_data is None:
+            return
+
+        if self.image_prober is not None and campsite_data.thumbnail_candidates:
+            campsite_data.thumbnail_url = self.image_prober.choose(campsite_data.thumbnail_candidates)
+
+        if self.db_manager.save_campsite(campsite_data):
+            url_logger.info("Successfully saved campsite: %s", campsite_data.name, extra={"url": result.url})
+        else:
+            logger.error("Failed to save campsite: %s", campsite_data.name, extra={"url": result.url})
+
+    def _failure_result(self, url: str, error: BaseException, start_time: float,
+                        status_code: Optional[int] = None) -> CrawlResult:
+        self._record_failure(url, error, status_code)
+        return CrawlResult(
+            url=url,
+            success=False,
+            error=str(error),
+            status_code=status_code,
+            processing_time=time.time() - start_time
+        )
 
-            result = self.crawl_url(url)
-            results.append(result)
+    def _extract(self, body: bytes, response: Union[requests.Response, FetchedPage],
+                 url: str) -> Optional[CampsiteData]:
+        """Extract campsite data, reusing cached fields for a body seen before
+
+        Client-side rendered shells are rendered in the headless browser
+        first, and the rendered DOM is extracted (and cached) instead.
+        """
+        # The raw body goes to the parser; it is only decoded here to look for an app shell
+        markup, encoding = body, response.encoding
+        if self.renderer is not None and is_spa_shell(decode_body(body, encoding)):
+            url_logger.info("Rendering client-side page: %s", url, extra={"url": url})
+            rendered = self.renderer.render(url)
+            if rendered:
+                markup, body, encoding = rendered, rendered.encode('utf-8'), 'utf-8'
+
+        if self.extraction_cache is None:
+            return self.extractor.extract_campsite_data(markup, url, encoding)
+
+        key = self.extraction_cache.key(body, encoding, self.extractor.fingerprint)
+        hit, fields = self.extraction_cache.get(key)
+        if not hit:
+            try:
+                fields = self.extractor.extract_fields(markup, encoding)
+            except Exception as e:
+                logger.error("Error extracting data from %s: %s", url, e, extra={"url": url})
+                return None
+            self.extraction_cache.put(key, fields)
+
+        if fields is None:
+            logger.debug("Content not relevant for URL: %s", url)
+            return None
+        return self.extractor.build_campsite(fields, url)
 
-            # Log progress
-            if (i + 1) % 10 == 0:
-                successful = sum(1 for r in results if r.success)
-                logger.info(f"Progress: {i + 1}/{len(urls)} URLs crawled, {successful} successful")
+    def _record_failure(self, url: str, error: BaseException, status_code: Optional[int] = None):
+        """Classify a failure and store it in the retry queue"""
+        error_type, permanent = classify_failure(error, status_code)
+        self.db_manager.mark_url_as_failed(url, str(error), error_type, status_code, permanent)
 
-        return results
+    def crawl_urls(self, urls: List[str]) -> List[CrawlResult]:
+        """Crawl multiple URLs"""
+        return list(self.iter_crawl(urls))
+
+    def iter_crawl(self, urls: Iterable[str], budget: Optional[CrawlBudget] = None) -> Iterator[CrawlResult]:
+        """Crawl URLs, yielding each result as soon as it is available
+
+        Pacing is per host (see ``HostThrottle``), so URLs on different hosts
+        do not wait for each other: each host's URLs are queued in input
+        order, and the next URL always comes from a host that may be
+        requested now. A host that is pacing, backing off or suspended by the
+        circuit breaker is revisited once its wait is over, and the crawl
+        only sleeps when every host is waiting. Hosts that keep failing are
+        given up on. With a ``budget``, URLs that would not finish in time
+        are skipped and recorded in ``budget.skipped`` instead.
+
+        With an image prober, a page is saved (and yielded) only after the
+        next ``IMAGE_PROBE_LOOKAHEAD`` pages have been fetched, so its
+        thumbnail probes run while the crawl moves on.
+        """
+        lookahead = IMAGE_PROBE_LOOKAHEAD if self.image_prober is not None else 0
+        unsaved = deque()
+        queues = {}
+        for url in urls:
+            queues.setdefault(self.throttle.host_for(url), deque()).append(url)
+        self.telemetry.expect(sum(len(queue) for queue in queues.values()))
+
+        # (ready at, sequence, host): ready hosts in input order, then round robin
+        sequence = itertools.count()
+        ready = [(0.0, next(sequence), host) for host in queues]
+
+        while ready:
+            _, _, host = heapq.heappop(ready)
+            queue = queues[host]
+            url = queue[0]
+            wait = self.throttle.wait_time(url)
+
+            if budget is not None:
+                if not budget.admitting():
+                    left = [url for queue in queues.values() for url in queue]
+                    logger.info(f"Time budget: no longer admitting URLs, {len(left)} left")
+                    self.telemetry.expect(-len(left))
+                    for url in left:
+                        budget.skip(url)
+                    break
+                if not budget.admits(url, wait):
+                    self.telemetry.expect(-1)
+                    budget.skip(queue.popleft())
+                    self._requeue_host(ready, sequence, queues, host)
+                    continue
+
+            if self.throttle.is_abandoned(url):
+                error = HostUnavailableError(f"Host unavailable: {host}")
+                for url in queue:
+                    self._record_failure(url, error)
+                    result = CrawlResult(url=url, success=False, error=str(error), processing_time=0.0)
+                    self.telemetry.record(result)
+                    yield result
+                del queues[host]
+                continue
+
+            if wait > 0 or self.throttle.is_suspended(url):
+                # Crawl other hosts in the meantime; sleep only if none is ready
+                heapq.heappush(ready, (self.throttle.clock() + max(wait, 0.01), next(sequence), host))
+                idle = ready[0][0] - self.throttle.clock()
+                if idle > 0:
+                    time.sleep(idle)
+                continue
+
+            queue.popleft()
+            page = self.fetch_page(url)
+            result = page if isinstance(page, CrawlResult) else self.extract_page(page)
+            if budget is not None:
+                budget.record(url, result.processing_time or 0.0)
+            self._requeue_host(ready, sequence, queues, host)
+            unsaved.append(result)
+            yield from self._persist_oldest(unsaved, lookahead)
+
+        yield from self._persist_oldest(unsaved, 0)
+
+    def _persist_oldest(self, unsaved: deque, keep: int) -> Iterator[CrawlResult]:
+        """Save and yield the extracted results older than the newest ``keep``"""
+        while len(unsaved) > keep:
+            result = unsaved.popleft()
+            self.persist_result(result)
+            self.telemetry.record(result)
+            yield result
+
+    def _requeue_host(self, ready: list, sequence, queues: dict, host: str):
+        """Schedule a host's next URL, or forget the host once its queue is empty"""
+        if queues[host]:
+            ready_at = self.throttle.clock() + self.throttle.wait_time(queues[host][0])
+            heapq.heappush(ready, (ready_at, next(sequence), host))
+        else:
+            del queues[host]
 
     async def take_screenshot(self, url: str) -> Optional[str]:
         """Take a screenshot of a webpage using Playwright"""
@@ -158,47 +459,86 @@ class WebCrawler:
             logger.error(f"Error taking screenshot for {url}: {str(e)}")
             return None
 
-    def discover_urls(self, seed_url: str, max_depth: int = 2) -> List[str]:
-        """Discover relevant URLs from a seed URL"""
-        discovered_urls = set()
-        visited_urls = set()
-
-        def crawl_for_links(url: str, current_depth: int):
-            if current_depth > max_depth or url in visited_urls:
-                return
-
-            visited_urls.add(url)
-
-            try:
-                response = self.session.get(url, timeout=TIMEOUT)
-                response.raise_for_status()
-
-                from bs4 import BeautifulSoup
-                soup = BeautifulSoup(response.text, 'lxml')
-
-                # Find all links
-                for link in soup.find_all('a', href=True):
-                    href = link['href']
-                    full_url = urljoin(url, href)
-
-                    # Filter relevant links
-                    if self._is_relevant_url(full_url) and self._is_same_domain(full_url, seed_url):
-                        discovered_urls.add(full_url)
-
-                        # Recursively crawl (with depth limit)
-                        if current_depth < max_depth:
-                            crawl_for_links(full_url, current_depth + 1)
-
-                time.sleep(REQUEST_DELAY)
-
-            except Exception as e:
-                logger.error(f"Error discovering URLs from {url}: {str(e)}")
+    def discover_urls(self, seed_urls: Union[str, Sequence[str]], max_depth: int = 2,
+                      max_pages: int = DISCOVERY_MAX_PAGES, concurrency: int = CRAWL_CONCURRENCY,
+                      budget: Optional[CrawlBudget] = None) -> List[str]:
+        """Discover relevant URLs from one or more seed URLs
+
+        Links are kept in priority frontiers scored from URL tokens, anchor
+        text, depth and the relevance of the linking page, so the
+        ``max_pages`` fetch budget goes to likely program pages first. With
+        several seeds, their sites are explored concurrently (up to
+        ``concurrency`` at a time, one page per site at a time) and share the
+        budget evenly, along with the visited and discovered URLs; see
+        ``HostFrontiers``. With a ``budget``, no new page is fetched once it
+        stops admitting work. Relevant URLs are returned best first.
+        """
+        if isinstance(seed_urls, str):
+            seed_urls = [seed_urls]
+        frontiers = HostFrontiers(max_depth)
+        for seed_url in seed_urls:
+            frontiers.add_seed(seed_url)
+        discovered = {}
+        fetched = 0
+
+        workers = max(1, min(concurrency, len(frontiers.hosts())))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="crawler-discover") as pool:
+            running = {}
+            while True:
+                while fetched < max_pages and len(running) < workers:
+                    if budget is not None and not budget.admitting():
+                        break
+                    entry = frontiers.pop()
+                    if entry is None:
+                        break
+                    url, depth, _ = entry
+                    fetched += 1
+                    running[pool.submit(self._discover_links, url, depth)] = url
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    frontiers.done(running.pop(future))
+                    # Frontiers are only touched from this thread
+                    for full_url, depth, score in future.result():
+                        if not frontiers.in_scope(full_url):
+                            continue
+                        frontiers.push(full_url, depth, score)
+                        if self._is_relevant_url(full_url):
+                            discovered[full_url] = max(score, discovered.get(full_url, score))
+
+        per_host = ", ".join(f"{host} {count}" for host, count in frontiers.fetched.items())
+        logger.info(f"Discovery fetched {fetched} pages ({per_host}), {frontiers.queued()} links left in the frontier")
+        return sorted(discovered, key=discovered.get, reverse=True)
+
+    def _discover_links(self, url: str, depth: int) -> List[Tuple[str, int, float]]:
+        """Fetch a discovery page and score its crawlable links"""
+        links = []
+        try:
+            response = self._get(url, stream=True)
+            self._raise_for_status(response)
+            if not self._is_html_response(response):
+                response.close()
+                return links
+
+            body = self._read_body(response)
+            soup = self.extractor.parse(body, self._sniff_encoding(body, response))
+            relevance = self.extractor.relevance_scorer.score_texts([self.extractor.relevance_text(soup)])[0]
+
+            for link in soup.find_all('a', href=True):
+                full_url = normalize_url(urljoin(url, link['href']))
+                if not self._is_crawlable_url(full_url):
+                    continue
+                score = score_link(full_url, link.get_text(' ', strip=True), depth + 1, float(relevance))
+                links.append((full_url, depth + 1, score))
 
-        crawl_for_links(seed_url, 0)
-        return list(discovered_urls)
+        except Exception as e:
+            logger.error(f"Error discovering URLs from {url}: {str(e)}")
+        return links
 
-    def _is_relevant_url(self, url: str) -> bool:
-        """Check if URL is relevant for crawling"""
+    def _is_crawlable_url(self, url: str) -> bool:
+        """Check that a URL is an HTML page worth following at all"""
         url_lower = url.lower()
 
         # Skip irrelevant file types
@@ -208,52 +548,109 @@ class WebCrawler:
 
         # Skip admin/private pages
         skip_patterns = ['admin', 'login', 'signup', 'cart', 'checkout', 'account']
-        if any(pattern in url_lower for pattern in skip_patterns):
+        return not any(pattern in url_lower for pattern in skip_patterns)
+
+    def _is_relevant_url(self, url: str) -> bool:
+        """Check if URL is relevant for crawling"""
+        if not self._is_crawlable_url(url):
             return False
 
         # Look for relevant keywords in URL
         relevant_keywords = ['program', 'course', 'study', 'camp', 'abroad', 'international']
-        return any(keyword in url_lower for keyword in relevant_keywords)
-
-    def _is_same_domain(self, url1: str, url2: str) -> bool:
-        """Check if two URLs are from the same domain"""
-        domain1 = urlparse(url1).netloc.lower()
-        domain2 = urlparse(url2).netloc.lower()
+        return any(keyword in url.lower() for keyword in relevant_keywords)
 
-        # Remove www. for comparison
-        domain1 = domain1.replace('www.', '')
-        domain2 = domain2.replace('www.', '')
+    def _run_stats(self, start_time: float, budget: Optional[CrawlBudget]) -> dict:
+        """Summary keys shared by batch and streaming crawls"""
+        return {
+            "total_time": time.time() - start_time,
+            "writes": self.db_manager.write_stats(),
+            "connections": self.connection_stats(),
+            "extraction_cache": self.extraction_cache.stats() if self.extraction_cache else None,
+            "rendering": self.renderer.stats() if self.renderer else None,
+            "images": self.image_prober.stats() if self.image_prober else None,
+            "page_store": self.page_store.stats() if self.page_store else None,
+            "structured_data": dict(self.extractor.structured_stats),
+            "encodings": dict(self.encoding_stats),
+            "hosts": self.throttle.snapshot(),
+            "budget": budget.stats() if budget else None,
+            "telemetry": self.telemetry.snapshot(),
+        }
 
-        return domain1 == domain2
+    def run_batch_crawl(self, urls: List[str] = None, budget: Optional[CrawlBudget] = None) -> dict:
+        """Run a batch crawl operation
 
-    def run_batch_crawl(self, urls: List[str] = None) -> dict:
-        """Run a batch crawl operation"""
+        Results are accumulated in a columnar ``ResultBuffer`` rather than
+        kept as objects, and ``summary["results"]`` is the buffer itself: an
+        iterable of per-URL dicts built on demand when the report is written.
+        """
         if urls is None:
             urls = SEED_URLS
 
-        logger.info(f"Starting batch crawl of {len(urls)} URLs")
-
+        # Leave out permanently dead URLs and failures still backing off
+        urls = self.db_manager.filter_retryable_urls(list(urls))
+        buffer = ResultBuffer()
         start_time = time.time()
-        results = self.crawl_urls(urls)
 
-        # Generate summary
-        successful = [r for r in results if r.success]
-        failed = [r for r in results if not r.success]
+        if urls:
+            logger.info(f"Starting batch crawl of {len(urls)} URLs")
+            for result in self.iter_crawl(urls, budget):
+                buffer.append(result)
+            self.db_manager.flush()
+        else:
+            logger.info("No URLs left to crawl after filtering failed URLs")
 
-        summary = {
-            "total_urls": len(urls),
-            "successful": len(successful),
-            "failed": len(failed),
-            "success_rate": len(successful) / len(urls) * 100,
-            "total_time": time.time() - start_time,
-            "campsites_found": sum(1 for r in successful if r.campsite_data),
-            "results": [r.to_dict() for r in results]
-        }
+        summary = buffer.summary()
+        summary.update(self._run_stats(start_time, budget))
+        summary["results"] = buffer
 
         logger.info(f"Batch crawl completed: {summary['successful']}/{summary['total_urls']} successful")
+        connections = summary["connections"]
+        logger.info(
+            f"Connections: {connections['new_connections']} opened for {connections['requests']} requests "
+            f"({connections['reuse_ratio']:.0%} reused)"
+        )
 
         return summary
 
+    def run_pipeline(self, urls: Iterable[str], sink, budget: Optional[CrawlBudget] = None) -> dict:
+        """Run a streaming crawl, handing each result to ``sink.append``
+
+        Unlike ``run_batch_crawl``, ``urls`` may be any iterable (a file or
+        stdin read lazily) and no result is kept once the sink has it; see
+        ``CrawlPipeline``. The summary has the batch crawl keys except
+        ``results``, plus ``pipeline`` queue statistics.
+        """
+        pipeline = CrawlPipeline(self, budget=budget)
+        start_time = time.time()
+        logger.info(f"Starting streaming crawl with {pipeline.fetch_workers} fetch workers")
+
+        if isinstance(urls, Sized):
+            self.telemetry.expect(len(urls))
+        for result in pipeline.run(urls):
+            self.telemetry.record(result)
+            sink.append(result)
+        self.db_manager.flush()
+
+        summary = sink.summary()
+        summary.update(self._run_stats(start_time, budget))
+        summary["pipeline"] = pipeline.stats()
+
+        logger.info(f"Streaming crawl completed: {summary['successful']}/{summary['total_urls']} successful")
+        return summary
+
+    def close(self):
+        """Release the HTTP sessions, the headless browser and the local stores"""
+        if self.extraction_cache is not None:
+            self.extraction_cache.close()
+        if self.renderer is not None:
+            self.renderer.close()
+        if self.image_prober is not None:
+            self.image_prober.close()
+        if self.page_store is not None:
+            self.page_store.close()
+        self.db_manager.close()
+        self.session.close()
+
     def __del__(self):
         """Cleanup resources"""
         if hasattr(self, 'session'):
@@ -1,9 +1,17 @@
 import logging
 import hashlib
-from typing import Optional
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
 from supabase import create_client, Client
-from .config import SUPABASE_URL, SUPABASE_SERVICE_KEY
-from .models import CampsiteData
+from .config import (
+    SUPABASE_URL, SUPABASE_SERVICE_KEY, FAILURE_RETRY_LIMIT, BATCH_SIZE,
+    CLEANUP_BATCH_SIZE, CLEANUP_BATCH_DELAY,
+)
+from .failures import failure_row
+from .models import CampsiteData, PERSISTED_FIELDS
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +24,23 @@ class DatabaseManager:
 
         self.supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
 
+        # URLs known to have a crawl_failures row, so successes only pay for
+        # a delete when there is something to clear
+        self.failed_urls = set()
+
+        # Existing URLs seen during the run, flushed in batches to
+        # last_crawled_at so retention does not expire rows still online
+        self.seen_urls = []
+        self._seen_lock = threading.Lock()  # Streaming crawls mark URLs from several threads
+
+        # Field-level changes from recrawls, applied in batches
+        self.pending_updates = []
+        self._updates_lock = threading.Lock()
+
+        # Counted from crawl threads and, for queued writes, the event loop thread
+        self.write_counts = Counter()
+        self._counts_lock = threading.Lock()
+
     def url_exists(self, url: str) -> bool:
         """Check if URL already exists in database"""
         try:
@@ -26,21 +51,24 @@ class DatabaseManager:
             return False
 
     def save_campsite(self, campsite_data: CampsiteData) -> bool:
-        """Save campsite data to database"""
-        try:
-            # Check if URL already exists
-            if self.url_exists(campsite_data.url):
-                logger.warning(f"Campsite already exists: {campsite_data.url}")
-                return False
+        """Insert a new campsite, or update only the fields a recrawl changed
 
-            # Convert to database format
-            data = campsite_data.to_dict()
+        Existing rows are compared by the fingerprint of their persisted
+        fields first and field by field only if it differs. Unchanged rows
+        are just marked as seen; changed columns are queued and written in
+        batches by ``flush_updates``, so ``updated_at`` moves only when
+        content did.
+        """
+        try:
+            stored = self._get_stored_fields(campsite_data.url)
+            if stored is not None:
+                return self._queue_changes(campsite_data, stored)
 
             # Insert into database
-            result = self.supabase.table('campsites').insert(data).execute()
+            result = self.supabase.table('campsites').insert(self._new_row(campsite_data)).execute()
 
             if result.data:
-                logger.info(f"Successfully saved campsite: {campsite_data.name}")
+                self._count("inserted")
                 return True
             else:
                 logger.error(f"Failed to save campsite: {campsite_data.name}")
@@ -50,6 +78,113 @@ class DatabaseManager:
             logger.error(f"Error saving campsite {campsite_data.name}: {str(e)}")
             return False
 
+    @staticmethod
+    def _new_row(campsite_data: CampsiteData) -> dict:
+        """A new campsite in database format"""
+        data = campsite_data.to_dict()
+        crawled_at = campsite_data.crawled_at
+        if crawled_at.tzinfo is None:
+            crawled_at = crawled_at.replace(tzinfo=timezone.utc)
+        data["source"] = campsite_data.source
+        data["last_crawled_at"] = crawled_at.isoformat()
+        data["content_fingerprint"] = campsite_data.fingerprint()
+        return data
+
+    def _get_stored_fields(self, url: str) -> Optional[dict]:
+        """Persisted fields and fingerprint of an existing row, or None"""
+        result = self.supabase.table('campsites') \
+            .select(f"{', '.join(PERSISTED_FIELDS)}, content_fingerprint") \
+            .eq('url', url).limit(1).execute()
+        return result.data[0] if result.data else None
+
+    def _queue_changes(self, campsite_data: CampsiteData, stored: dict) -> bool:
+        fingerprint = campsite_data.fingerprint()
+        if stored.get('content_fingerprint') == fingerprint:
+            self._count("unchanged")
+            self.mark_url_as_seen(campsite_data.url)
+            return True
+
+        # Rows saved before fingerprints existed may only need the
+        # fingerprint backfilled, which the updated_at trigger ignores
+        changes = campsite_data.changed_fields(stored)
+        with self._updates_lock:
+            self.pending_updates.append({"url": campsite_data.url, "fields": changes, "fingerprint": fingerprint})
+            full = len(self.pending_updates) >= BATCH_SIZE
+        self._count("updated" if changes else "fingerprinted", fields_updated=len(changes))
+        if full:
+            self.flush_updates()
+        return True
+
+    def flush_updates(self):
+        """Write queued field-level changes in a single call"""
+        with self._updates_lock:
+            changes, self.pending_updates = self.pending_updates, []
+        if not changes:
+            return
+
+        try:
+            self.supabase.rpc('apply_campsite_changes', {"changes": changes}).execute()
+        except Exception as e:
+            logger.error(f"Error applying changes to {len(changes)} campsites: {str(e)}")
+
+    def _count(self, outcome: str, **amounts: int):
+        """Count a write outcome, plus any other amounts, from any thread"""
+        with self._counts_lock:
+            self.write_counts[outcome] += 1
+            self.write_counts.update(amounts)
+
+    def write_stats(self) -> dict:
+        """How campsites saved during the run were written"""
+        with self._counts_lock:
+            return dict(self.write_counts)
+
+    def drain(self, timeout: Optional[float] = None):
+        """Wait for queued writes; writes are synchronous here"""
+
+    def flush(self, timeout: Optional[float] = None):
+        """Write everything buffered, including what queued writes buffer as they finish
+
+        A save still in flight may yet add recrawl changes or a last-seen
+        URL, so queued writes are drained before each flush, until both
+        buffers stay empty.
+        """
+        while True:
+            self.drain(timeout)
+            with self._updates_lock:
+                buffered = bool(self.pending_updates)
+            with self._seen_lock:
+                buffered = buffered or bool(self.seen_urls)
+            if not buffered:
+                return
+            self.flush_seen_urls()
+            self.flush_updates()
+
+    def close(self):
+        """Write buffered changes and release database connections"""
+        self.flush()
+
+    def mark_url_as_seen(self, url: str):
+        """Record that an existing campsite URL was seen by the crawler"""
+        with self._seen_lock:
+            self.seen_urls.append(url)
+            full = len(self.seen_urls) >= BATCH_SIZE
+        if full:
+            self.flush_seen_urls()
+
+    def flush_seen_urls(self):
+        """Write buffered last-seen times in a single update"""
+        with self._seen_lock:
+            urls, self.seen_urls = self.seen_urls, []
+        if not urls:
+            return
+
+        try:
+            self.supabase.table('campsites') \
+                .update({"last_crawled_at": datetime.now(timezone.utc).isoformat()}) \
+                .in_('url', urls).execute()
+        except Exception as e:
+            logger.error(f"Error updating last crawl time for {len(urls)} URLs: {str(e)}")
+
     def update_campsite(self, url: str, updates: dict) -> bool:
         """Update existing campsite data"""
         try:
@@ -92,51 +227,171 @@ class DatabaseManager:
         return None
 
     def get_crawl_statistics(self) -> dict:
-        """Get crawling statistics"""
-        try:
-            # Total campsites
-            total_result = self.supabase.table('campsites').select('id', count='exact').execute()
-            total_campsites = total_result.count
+        """Get crawling statistics
 
-            # By category
-            categories_result = self.supabase.table('campsites').select('category', count='exact').execute()
-
-            # By country
-            countries_result = self.supabase.table('campsites').select('country', count='exact').execute()
-
-            return {
-                "total_campsites": total_campsites,
-                "categories": {},  # Would need to aggregate by category
-                "countries": {},   # Would need to aggregate by country
-                "last_updated": None  # Could track in separate table
-            }
+        Aggregation happens server-side in the ``get_crawl_statistics`` SQL
+        function, so this is a single round trip regardless of table size.
+        """
+        try:
+            result = self.supabase.rpc('get_crawl_statistics').execute()
+            return result.data or {}
 
         except Exception as e:
             logger.error(f"Error getting crawl statistics: {str(e)}")
             return {}
 
-    def cleanup_old_data(self, days_old: int = 30) -> int:
-        """Clean up old/outdated crawl data"""
+    def cleanup_old_data(self, days_old: int = 30, archive: bool = True,
+                         dry_run: bool = False, batch_size: int = CLEANUP_BATCH_SIZE) -> int:
+        """Remove crawler rows not seen by a crawl for ``days_old`` days
+
+        Stale rows are walked with keyset pagination on
+        ``(last_crawled_at, id)``, so each query is a bounded index range scan
+        and only one batch is held in memory. Each batch is optionally copied
+        to ``campsites_archive`` and then deleted, with a pause between
+        batches to keep lock time and load low. Campsites with comments or
+        ratings are kept.
+        """
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=days_old)).isoformat()
+        last_key = None
+        removed = 0
+
+        logger.info(f"Cleanup of crawler data not seen for {days_old} days (cutoff {cutoff})")
+
         try:
-            # This would require tracking crawl dates
-            # For now, just log the intent
-            logger.info(f"Cleanup requested for data older than {days_old} days")
-            return 0
+            while True:
+                query = self.supabase.table('campsites') \
+                    .select('*') \
+                    .eq('source', 'crawler') \
+                    .lt('last_crawled_at', cutoff)
+                if last_key:
+                    crawled_at, row_id = last_key
+                    query = query.or_(
+                        f'last_crawled_at.gt."{crawled_at}",'
+                        f'and(last_crawled_at.eq."{crawled_at}",id.gt.{row_id})'
+                    )
+                rows = query.order('last_crawled_at').order('id').limit(batch_size).execute().data
+
+                if not rows:
+                    break
+                last_key = (rows[-1]['last_crawled_at'], rows[-1]['id'])
+
+                stale = self._without_user_content(rows)
+                if stale and not dry_run:
+                    ids = [row['id'] for row in stale]
+                    if archive:
+                        self.supabase.table('campsites_archive').upsert(stale, on_conflict='id').execute()
+                    self.supabase.table('campsites').delete().in_('id', ids).execute()
+
+                removed += len(stale)
+                logger.info(f"Cleanup: {removed} stale campsites {'found' if dry_run else 'removed'} so far")
+
+                if len(rows) < batch_size:
+                    break
+                time.sleep(CLEANUP_BATCH_DELAY)
+
+            return removed
 
         except Exception as e:
             logger.error(f"Error during cleanup: {str(e)}")
-            return 0
+            return removed
 
-    def mark_url_as_failed(self, url: str, error: str):
-        """Mark URL as failed (could be stored in separate table for monitoring)"""
+    def _without_user_content(self, rows: List[dict]) -> List[dict]:
+        """Drop rows that users have rated or commented on"""
+        rows = [row for row in rows if not row.get('avg_rating')]
+        if not rows:
+            return rows
+
+        ids = [row['id'] for row in rows]
+        result = self.supabase.table('comments').select('campsite_id').in_('campsite_id', ids).execute()
+        commented = {row['campsite_id'] for row in result.data}
+        return [row for row in rows if row['id'] not in commented]
+
+    def mark_url_as_failed(self, url: str, error: str, error_type: str = "other",
+                           status_code: Optional[int] = None, permanent: bool = False):
+        """Record a failed crawl in the retry queue
+
+        Transient failures are scheduled for a retry with exponential backoff;
+        permanent ones (and transient ones that keep failing) are excluded
+        from future runs.
+        """
         try:
-            # For now, just log failed URLs
-            # In production, you might want a separate 'failed_crawls' table
-            logger.warning(f"Failed to crawl URL: {url} - {error}")
+            existing = self.supabase.table('crawl_failures').select('attempts').eq('url', url).execute()
+            attempts = (existing.data[0]['attempts'] if existing.data else 0) + 1
+            row = failure_row(url, error, error_type, status_code, permanent, attempts)
+            self.supabase.table('crawl_failures').upsert(row, on_conflict='url').execute()
+            self.failed_urls.add(url)
 
         except Exception as e:
             logger.error(f"Error marking URL as failed: {str(e)}")
 
+    def clear_failure(self, url: str):
+        """Remove a URL from the retry queue after a successful crawl"""
+        if url not in self.failed_urls:
+            return
+
+        try:
+            self.supabase.table('crawl_failures').delete().eq('url', url).execute()
+            self.failed_urls.discard(url)
+        except Exception as e:
+            logger.error(f"Error clearing failure for {url}: {str(e)}")
+
+    def get_failure_states(self, urls: List[str], chunk_size: int = 100) -> Dict[str, dict]:
+        """Fetch retry-queue rows for the given URLs, keyed by URL"""
+        states = {}
+        try:
+            for i in range(0, len(urls), chunk_size):
+                chunk = urls[i:i + chunk_size]
+                result = self.supabase.table('crawl_failures') \
+                    .select('url, permanent, next_attempt_at') \
+                    .in_('url', chunk).execute()
+                for row in result.data:
+                    states[row['url']] = row
+        except Exception as e:
+            logger.error(f"Error fetching failure states: {str(e)}")
+
+        self.failed_urls.update(states)
+        return states
+
+    def filter_retryable_urls(self, urls: List[str]) -> List[str]:
+        """Drop permanently failed URLs and transient failures not yet due"""
+        states = self.get_failure_states(urls)
+        if not states:
+            return urls
+
+        now = datetime.now(timezone.utc)
+
+        def is_due(url: str) -> bool:
+            state = states.get(url)
+            if state is None:
+                return True
+            if state['permanent']:
+                return False
+            due_at = state.get('next_attempt_at')
+            return due_at is None or datetime.fromisoformat(due_at) <= now
+
+        retryable = [url for url in urls if is_due(url)]
+        skipped = len(urls) - len(retryable)
+        if skipped:
+            logger.info(f"Skipping {skipped} URLs with permanent or not yet due failures")
+        return retryable
+
+    def get_due_failed_urls(self, limit: int = FAILURE_RETRY_LIMIT) -> List[str]:
+        """Get transient failures whose backoff has elapsed"""
+        try:
+            result = self.supabase.table('crawl_failures') \
+                .select('url') \
+                .eq('permanent', False) \
+                .lte('next_attempt_at', datetime.now(timezone.utc).isoformat()) \
+                .order('next_attempt_at') \
+                .limit(limit).execute()
+            urls = [row['url'] for row in result.data]
+            self.failed_urls.update(urls)
+            return urls
+
+        except Exception as e:
+            logger.error(f"Error getting due failed URLs: {str(e)}")
+            return []
+
     def get_urls_to_recrawl(self, days_since_last_crawl: int = 7) -> list:
         """Get URLs that need to be recrawled"""
         try:
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from .config import EXTRACTION_CACHE_PATH, EXTRACTION_CACHE_MAX_BYTES
+from .extractors import EXTRACTOR_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Marks a cached page that was not relevant (a cached negative)
+_IRRELEVANT = "null"
+# Hits whose access times are held in memory before being written
+TOUCH_BATCH = 256
+
+
+class ExtractionCache:
+    """Persistent LRU cache from page body hash to extracted fields
+
+    Entries hold ``ContentExtractor.extract_fields`` output, which depends
+    only on the body, so a body seen before (in an earlier run or under
+    another URL) skips parsing. Irrelevant pages are cached too. Entries
+    from another ``EXTRACTOR_VERSION`` are dropped when the cache is
+    opened, and the least recently used entries are evicted once the
+    stored fields exceed ``max_bytes``. Access times of hits are written in
+    batches (with the next ``put``, eviction or close), not one per hit.
+    """
+
+    def __init__(self, path: str = EXTRACTION_CACHE_PATH, max_bytes: int = EXTRACTION_CACHE_MAX_BYTES,
+                 version: int = EXTRACTOR_VERSION):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._touched: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS extractions (
+                key TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                fields TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS extractions_accessed ON extractions (accessed_at)")
+
+        stale = self._db.execute("DELETE FROM extractions WHERE version != ?", (version,)).rowcount
+        self._db.commit()
+        if stale:
+            logger.info(f"Dropped {stale} cached extractions from other extractor versions")
+
+        self.size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM extractions").fetchone()[0]
+
+    @staticmethod
+    def key(body: bytes, encoding: Optional[str] = None, config: str = "") -> str:
+        """Cache key for a page body as decoded with ``encoding``
+
+        ``config`` is the extractor's ``fingerprint``, so changing its
+        relevance terms, threshold or parser backend misses old entries.
+        """
+        digest = hashlib.sha256(body)
+        digest.update(b"\0" + (encoding or "").lower().encode("ascii", "replace"))
+        digest.update(b"\0" + config.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Return ``(hit, fields)``; ``fields`` is None for irrelevant pages"""
+        with self._lock:
+            row = self._db.execute("SELECT fields FROM extractions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return False, None
+
+            self._touched[key] = time.time()
+            if len(self._touched) >= TOUCH_BATCH:
+                self._write_touches()
+                self._db.commit()
+            self.hits += 1
+            return True, json.loads(row[0])
+
+    def put(self, key: str, fields: Optional[Dict[str, Any]]):
+        """Store extracted fields (None for an irrelevant page)"""
+        value = json.dumps(fields) if fields is not None else _IRRELEVANT
+        size = len(key) + len(value)
+
+        with self._lock:
+            self._write_touches()
+            previous = self._db.execute("SELECT size FROM extractions WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO extractions (key, version, fields, size, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, self.version, value, size, time.time())
+            )
+            self.size += size - (previous[0] if previous else 0)
+            if self.size > self.max_bytes:
+                self._evict()
+            self._db.commit()
+
+    def _write_touches(self):
+        """Write the buffered access times of hits (the caller commits)"""
+        if self._touched:
+            self._db.executemany(
+                "UPDATE extractions SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache is 90% full"""
+        target = self.max_bytes * 0.9
+        evicted = 0
+        while self.size > target:
+            rows = self._db.execute("SELECT key, size FROM extractions ORDER BY accessed_at LIMIT 256").fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if self.size <= target:
+                    break
+                self._db.execute("DELETE FROM extractions WHERE key = ?", (key,))
+                self.size -= size
+                evicted += 1
+        logger.debug("Evicted %d cached extractions", evicted)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self), "bytes": self.size}
+
+    def close(self):
+        with self._lock:
+            if self._touched:
+                self._write_touches()
+                self._db.commit()
+            self._db.close()
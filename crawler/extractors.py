@@ -1,80 +1,184 @@
 import re
 import logging
-from typing import Optional, Dict, Any
+from collections import Counter
+from html import unescape
+from typing import Optional, Dict, Any, List, Union
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
-from .config import CONTENT_KEYWORDS
+from .config import CONTENT_KEYWORDS, HTML_PARSER, IMAGE_MAX_CANDIDATES
 from .models import CampsiteData
+from .parsers import Document, parse_html
+from .relevance import RelevanceScorer
+from .structured import structured_fields
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever extraction output changes, so cached results are discarded
+EXTRACTOR_VERSION = 3
+
+# Markup that is not page text: invisible elements, comments and tags (a tag
+# cut off at the end of a prefix included). Shared with the app shell check.
+INVISIBLE_PATTERN = re.compile(
+    r'<(script|style|noscript|template|svg)\b.*?</\1\s*>|<!--.*?-->', re.IGNORECASE | re.DOTALL
+)
+TAG_PATTERN = re.compile(r'<[^>]*>?')
+META_TAG_PATTERN = re.compile(r'<meta\b[^>]*>', re.IGNORECASE)
+META_NAME_PATTERN = re.compile(r'\bname\s*=\s*["\']?(keywords|description)\b', re.IGNORECASE)
+META_CONTENT_PATTERN = re.compile(r'\bcontent\s*=\s*(?:"([^"]*)"|\'([^\']*)\')', re.IGNORECASE)
+
 class ContentExtractor:
     """Extract structured data from web pages"""
 
-    def __init__(self):
+    def __init__(self, parser: str = HTML_PARSER):
+        # Parser backend, see parsers.py; both produce the same fields
+        self.parser = parser
         self.content_keywords = [kw.lower() for kw in CONTENT_KEYWORDS]
-
-    def extract_campsite_data(self, html: str, url: str) -> Optional[CampsiteData]:
-        """Extract campsite data from HTML content"""
+        self.relevance_scorer = RelevanceScorer()
+        # Settings extraction output depends on besides the body, for cache keys
+        self.fingerprint = f"{parser}:{self.relevance_scorer.fingerprint}:{IMAGE_MAX_CANDIDATES}"
+        # How often JSON-LD/OpenGraph data replaced the text heuristics
+        self.structured_stats = Counter()
+
+    def extract_campsite_data(self, html: Union[str, bytes], url: str,
+                              encoding: Optional[str] = None) -> Optional[CampsiteData]:
+        """Extract campsite data from HTML content (or a raw body in ``encoding``)"""
         try:
-            soup = BeautifulSoup(html, 'lxml')
-
-            # Check if content is relevant
-            if not self._is_relevant_content(soup):
-                logger.debug(f"Content not relevant for URL: {url}")
-                return None
-
-            # Extract basic information
-            name = self._extract_name(soup, url)
-            description = self._extract_description(soup)
-            country = self._extract_country(soup)
-            category = self._extract_category(soup)
-            thumbnail_url = self._extract_thumbnail(soup, url)
-
-            if not name:
-                logger.debug(f"Could not extract name from URL: {url}")
+            fields = self.extract_fields(html, encoding)
+            if fields is None:
+                logger.debug("Content not relevant for URL: %s", url)
                 return None
 
-            return CampsiteData(
-                name=name,
-                url=url,
-                description=description,
-                country=country,
-                category=category,
-                thumbnail_url=thumbnail_url,
-                meta_title=self._extract_meta_title(soup),
-                meta_description=self._extract_meta_description(soup),
-                language=self._extract_language(soup)
-            )
+            return self.build_campsite(fields, url)
 
         except Exception as e:
-            logger.error(f"Error extracting data from {url}: {str(e)}")
+            logger.error("Error extracting data from %s: %s", url, e, extra={"url": url})
             return None
 
-    def _is_relevant_content(self, soup: BeautifulSoup) -> bool:
-        """Check if the page content is relevant to study tours/camps"""
-        text_content = soup.get_text().lower()
+    def parse(self, html: Union[str, bytes], encoding: Optional[str] = None) -> Document:
+        """Parse a page, or a raw body in ``encoding``, with the configured backend"""
+        return parse_html(html, self.parser, encoding)
+
+    def extract_fields(self, html: Union[str, bytes], encoding: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Extract the URL-independent fields of a page
 
-        # Check for keywords in content
-        keyword_count = sum(1 for keyword in self.content_keywords if keyword in text_content)
+        Returns None for irrelevant pages. The result depends only on the
+        page body and ``EXTRACTOR_VERSION``, so it can be cached by body
+        hash; ``build_campsite`` applies the URL-dependent parts.
+        """
+        soup = self.parse(html, encoding)
 
-        # Check for keywords in meta tags
-        meta_keywords = soup.find('meta', attrs={'name': 'keywords'})
-        meta_description = soup.find('meta', attrs={'name': 'description'})
+        # Check if content is relevant
+        if not self._is_relevant_content(soup):
+            return None
 
-        meta_text = ""
-        if meta_keywords:
-            meta_text += (meta_keywords.get('content', '') or '').lower()
-        if meta_description:
-            meta_text += (meta_description.get('content', '') or '').lower()
+        # Fast path: schema.org JSON-LD and OpenGraph fields, with the
+        # full-text heuristics only for whatever they do not provide
+        structured = structured_fields(soup)
+        self._count_structured(structured)
+        name = structured.get("name")
+        candidates = self._thumbnail_candidates(soup)
+        if structured.get("thumbnail_src"):
+            candidates = [structured["thumbnail_src"]] + [src for src in candidates if src != structured["thumbnail_src"]]
+            candidates = candidates[:IMAGE_MAX_CANDIDATES]
+
+        return {
+            "name": self._clean_text(name) if name else self._extract_page_name(soup),
+            "description": self._usable_description(structured.get("description")) or self._extract_description(soup),
+            "country": structured.get("country") or self._extract_country(soup),
+            "category": self._structured_category(structured) or self._extract_category(soup),
+            "thumbnail_src": candidates[0] if candidates else None,
+            "thumbnail_candidates": candidates,
+            "meta_title": self._extract_meta_title(soup),
+            "meta_description": self._extract_meta_description(soup),
+            "language": structured.get("language") or self._extract_language(soup),
+        }
 
-        meta_keyword_count = sum(1 for keyword in self.content_keywords if keyword in meta_text)
+    def _count_structured(self, structured: Dict[str, Any]):
+        stats = self.structured_stats
+        stats["pages"] += 1
+        for source in structured["_sources"]:
+            stats[source] += 1
+        for field in ("name", "description", "country", "thumbnail_src"):
+            if structured.get(field):
+                stats[f"{field}_hits"] += 1
+        if all(structured.get(field) for field in ("name", "description", "country")):
+            stats["full_hits"] += 1
+
+    def _structured_category(self, structured: Dict[str, Any]) -> Optional[str]:
+        """Category from structured data, or None to fall back to the page text"""
+        if structured.get("online"):
+            return 'online'
+        text = f"{structured.get('name', '')} {structured.get('description', '')}".lower()
+        category = self._category_from_text(text) if text.strip() else 'study'
+        return category if category != 'study' else None
 
-        # Consider relevant if we find keywords or relevant URL patterns
-        return keyword_count > 0 or meta_keyword_count > 0
+    def _usable_description(self, text: Optional[str]) -> Optional[str]:
+        """A cleaned description if it is substantial enough to use"""
+        if not text:
+            return None
+        desc = self._clean_text(text)
+        return desc[:500] if len(desc) > 50 else None
+
+    def build_campsite(self, fields: Dict[str, Any], url: str) -> Optional[CampsiteData]:
+        """Build CampsiteData from extracted fields for the page's URL"""
+        name = fields["name"] or self._name_from_url(url)
+        if not name:
+            logger.debug("Could not extract name from URL: %s", url)
+            return None
 
-    def _extract_name(self, soup: BeautifulSoup, url: str) -> Optional[str]:
+        thumbnail_src = fields["thumbnail_src"]
+        candidates = [self._resolve_url(src, url) for src in fields["thumbnail_candidates"]]
+        return CampsiteData(
+            name=name,
+            url=url,
+            description=fields["description"],
+            country=fields["country"],
+            category=fields["category"],
+            thumbnail_url=self._resolve_url(thumbnail_src, url) if thumbnail_src else None,
+            meta_title=fields["meta_title"],
+            meta_description=fields["meta_description"],
+            language=fields["language"],
+            thumbnail_candidates=candidates
+        )
+
+    def is_relevant_prefix(self, html_prefix: str) -> bool:
+        """Cheap relevance pre-check on the first part of a page
+
+        Scores the text of the title and whatever body has arrived so far,
+        plus meta keywords/description, with the same scorer as the full
+        page, but with tags stripped by regex instead of building a parse
+        tree. False means the rest of the page need not be downloaded.
+        """
+        return self.relevance_scorer.is_relevant([self.prefix_relevance_text(html_prefix)])[0]
+
+    @staticmethod
+    def prefix_relevance_text(html_prefix: str) -> str:
+        """Approximation of ``relevance_text`` for a page prefix, without parsing"""
+        parts = [unescape(TAG_PATTERN.sub(' ', INVISIBLE_PATTERN.sub(' ', html_prefix)))]
+        for meta in META_TAG_PATTERN.findall(html_prefix):
+            content = META_CONTENT_PATTERN.search(meta)
+            if content and META_NAME_PATTERN.search(meta):
+                parts.append(unescape(content.group(1) or content.group(2) or ''))
+        return ' '.join(parts)
+
+    def relevance_text(self, soup: Document) -> str:
+        """Page text plus meta keywords/description, as seen by the relevance scorer"""
+        parts = [soup.get_text()]
+        for name in ('keywords', 'description'):
+            meta = soup.find('meta', attrs={'name': name})
+            if meta:
+                parts.append(meta.get('content', '') or '')
+        return ' '.join(parts)
+
+    def _is_relevant_content(self, soup: Document) -> bool:
+        """Check if the page content is relevant to study tours/camps (scored per page)"""
+        return self.relevance_scorer.is_relevant([self.relevance_text(soup)])[0]
+
+    def _extract_name(self, soup: Document, url: str) -> Optional[str]:
         """Extract the program/campsite name"""
+        return self._extract_page_name(soup) or self._name_from_url(url)
+
+    def _extract_page_name(self, soup: Document) -> Optional[str]:
+        """Extract the name from the page itself"""
         # Try different strategies to find the name
 
         # 1. Try h1 tag
@@ -101,7 +205,10 @@ class ContentExtractor:
         if meta_title and meta_title.get('content'):
             return self._clean_text(meta_title['content'])
 
-        # 5. Fallback to domain name
+        return None
+
+    def _name_from_url(self, url: str) -> Optional[str]:
+        """Fallback name derived from the domain"""
         domain = urlparse(url).netloc
         if domain:
             # Remove www. and common TLDs, capitalize
@@ -110,7 +217,7 @@ class ContentExtractor:
 
         return None
 
-    def _extract_description(self, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_description(self, soup: Document) -> Optional[str]:
         """Extract program description"""
         # Try meta description first
         meta_desc = soup.find('meta', attrs={'name': 'description'})
@@ -135,7 +242,7 @@ class ContentExtractor:
 
         return None
 
-    def _extract_country(self, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_country(self, soup: Document) -> Optional[str]:
         """Extract country information"""
         text_content = soup.get_text().lower()
 
@@ -173,14 +280,16 @@ class ContentExtractor:
 
         return None
 
-    def _extract_category(self, soup: BeautifulSoup) -> str:
+    def _extract_category(self, soup: Document) -> str:
         """Extract program category"""
         text_content = soup.get_text().lower()
         title = soup.find('title')
         title_text = title.get_text().lower() if title else ""
 
-        full_text = text_content + " " + title_text
+        return self._category_from_text(text_content + " " + title_text)
 
+    def _category_from_text(self, full_text: str) -> str:
+        """Category from keywords in lower-cased text"""
         # Category detection patterns
         if any(keyword in full_text for keyword in ['summer camp', 'summer program', 'summer school']):
             return 'summer'
@@ -191,19 +300,34 @@ class ContentExtractor:
         else:
             return 'study'  # Default category
 
-    def _extract_thumbnail(self, soup: BeautifulSoup, base_url: str) -> Optional[str]:
+    def _extract_thumbnail(self, soup: Document, base_url: str) -> Optional[str]:
         """Extract thumbnail/hero image URL"""
-        # Try og:image first
+        src = self._extract_thumbnail_src(soup)
+        return self._resolve_url(src, base_url) if src else None
+
+    def _extract_thumbnail_src(self, soup: Document) -> Optional[str]:
+        """Extract the thumbnail/hero image reference as written in the page"""
+        candidates = self._thumbnail_candidates(soup)
+        return candidates[0] if candidates else None
+
+    def _thumbnail_candidates(self, soup: Document) -> List[str]:
+        """Thumbnail/hero image references as written in the page, best first"""
+        candidates = []
+
+        def add(src):
+            if src and src not in candidates:
+                candidates.append(src)
+
+        # og:image first, then twitter:image
         og_image = soup.find('meta', property='og:image')
-        if og_image and og_image.get('content'):
-            return self._resolve_url(og_image['content'], base_url)
+        if og_image:
+            add(og_image.get('content'))
 
-        # Try twitter:image
         twitter_image = soup.find('meta', attrs={'name': 'twitter:image'})
-        if twitter_image and twitter_image.get('content'):
-            return self._resolve_url(twitter_image['content'], base_url)
+        if twitter_image:
+            add(twitter_image.get('content'))
 
-        # Try to find a hero/banner image
+        # Then hero/banner images
         hero_selectors = [
             'img[class*="hero"]',
             'img[class*="banner"]',
@@ -215,33 +339,31 @@ class ContentExtractor:
 
         for selector in hero_selectors:
             img = soup.select_one(selector)
-            if img and img.get('src'):
-                return self._resolve_url(img['src'], base_url)
+            if img:
+                add(img.get('src'))
 
-        # Fallback to first large image
-        images = soup.find_all('img')
-        for img in images:
+        # Then the page's other images
+        for img in soup.find_all('img'):
+            if len(candidates) >= IMAGE_MAX_CANDIDATES:
+                break
             src = img.get('src') or img.get('data-src')
-            if src:
-                # Skip small images, icons, and tracking pixels
-                if any(skip in src.lower() for skip in ['icon', 'logo', 'pixel', 'track']):
-                    continue
-
-                return self._resolve_url(src, base_url)
+            # Skip small images, icons, and tracking pixels
+            if src and not any(skip in src.lower() for skip in ['icon', 'logo', 'pixel', 'track']):
+                add(src)
 
-        return None
+        return candidates[:IMAGE_MAX_CANDIDATES]
 
-    def _extract_meta_title(self, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_meta_title(self, soup: Document) -> Optional[str]:
         """Extract meta title"""
         title = soup.find('title')
         return self._clean_text(title.get_text()) if title else None
 
-    def _extract_meta_description(self, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_meta_description(self, soup: Document) -> Optional[str]:
         """Extract meta description"""
         meta_desc = soup.find('meta', attrs={'name': 'description'})
         return self._clean_text(meta_desc['content']) if meta_desc and meta_desc.get('content') else None
 
-    def _extract_language(self, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_language(self, soup: Document) -> Optional[str]:
         """Extract page language"""
         html_tag = soup.find('html')
         if html_tag and html_tag.get('lang'):
@@ -0,0 +1,127 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, Optional, Tuple
+import requests
+from .config import FAILURE_RETRY_BASE_DELAY, FAILURE_RETRY_MAX_DELAY, FAILURE_MAX_ATTEMPTS, NXDOMAIN_MAX_ATTEMPTS
+from .throttle import HostUnavailableError
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses that will not change on a retry
+PERMANENT_STATUS_CODES = {400, 404, 405, 410, 414, 451}
+
+# Resolver answers that the name does not exist (NXDOMAIN) or has no address
+NXDOMAIN_MARKERS = (
+    'name or service not known',
+    'nodename nor servname',
+    'no address associated with hostname',
+)
+
+# Any other resolver failure, e.g. EAI_AGAIN, which may succeed on a retry
+DNS_ERROR_MARKERS = (
+    'nameresolutionerror',
+    'getaddrinfo failed',
+    'temporary failure in name resolution',
+)
+
+
+class UnsupportedContentTypeError(requests.exceptions.RequestException):
+    """Raised when a URL does not serve an HTML document"""
+
+
+def _iter_causes(error: BaseException, depth: int = 0) -> Iterator[BaseException]:
+    """Walk an exception and the exceptions wrapped inside it"""
+    if error is None or depth > 5:
+        return
+
+    yield error
+    for cause in (getattr(error, 'reason', None), error.__cause__, error.__context__, *error.args):
+        if isinstance(cause, BaseException) and cause is not error:
+            yield from _iter_causes(cause, depth + 1)
+
+
+def _dns_error_type(error: BaseException) -> Optional[str]:
+    """``dns_nxdomain`` for a name that does not resolve, ``dns`` for other resolver errors"""
+    causes = list(_iter_causes(error))
+    messages = [str(cause).lower() for cause in causes]
+    if any(marker in message for message in messages for marker in NXDOMAIN_MARKERS):
+        return 'dns_nxdomain'
+    if any(type(cause).__name__ == 'NameResolutionError' for cause in causes):
+        return 'dns'
+    if any(marker in message for message in messages for marker in DNS_ERROR_MARKERS):
+        return 'dns'
+    return None
+
+
+def classify_failure(error: Optional[BaseException] = None,
+                     status_code: Optional[int] = None) -> Tuple[str, bool]:
+    """Classify a crawl failure as ``(error_type, permanent)``
+
+    Permanent failures (404/410, malformed URLs, non-HTML content) are
+    left out of future runs; everything else is retried on an exponential
+    schedule. DNS failures are never permanent straight away, since a
+    resolver blip looks the same as a dead host; see ``is_permanent``.
+    """
+    if status_code is None and isinstance(error, requests.exceptions.RequestException):
+        status_code = getattr(error.response, 'status_code', None)
+
+    if status_code is not None and status_code >= 400:
+        return f"http_{status_code}", status_code in PERMANENT_STATUS_CODES
+
+    if isinstance(error, UnsupportedContentTypeError):
+        return 'content_type', True
+    if isinstance(error, HostUnavailableError):
+        return 'host_unavailable', False
+    if isinstance(error, (requests.exceptions.InvalidURL, requests.exceptions.MissingSchema,
+                          requests.exceptions.InvalidSchema)):
+        return 'invalid_url', True
+    if isinstance(error, requests.exceptions.TooManyRedirects):
+        return 'too_many_redirects', True
+    if isinstance(error, requests.exceptions.SSLError):
+        return 'ssl', False
+    if isinstance(error, requests.exceptions.Timeout):
+        return 'timeout', False
+    dns_error_type = _dns_error_type(error) if error is not None else None
+    if dns_error_type:
+        return dns_error_type, False
+    if isinstance(error, requests.exceptions.ConnectionError):
+        return 'connection', False
+
+    return 'other', False
+
+
+def next_attempt_at(attempts: int, now: Optional[datetime] = None) -> datetime:
+    """When a URL that has failed ``attempts`` times may be retried"""
+    now = now or datetime.now(timezone.utc)
+    delay = min(FAILURE_RETRY_MAX_DELAY, FAILURE_RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0))
+    return now + timedelta(seconds=delay)
+
+
+def is_permanent(attempts: int, permanent: bool, error_type: Optional[str] = None) -> bool:
+    """Transient failures become permanent after FAILURE_MAX_ATTEMPTS tries
+
+    A name that keeps failing to resolve (NXDOMAIN) is given up on sooner,
+    after NXDOMAIN_MAX_ATTEMPTS.
+    """
+    limit = NXDOMAIN_MAX_ATTEMPTS if error_type == 'dns_nxdomain' else FAILURE_MAX_ATTEMPTS
+    return permanent or attempts >= limit
+
+
+def failure_row(url: str, error: Optional[str], error_type: str, status_code: Optional[int],
+                permanent: bool, attempts: int) -> dict:
+    """The ``crawl_failures`` row for a URL's ``attempts``-th failure, logged as a warning"""
+    permanent = is_permanent(attempts, permanent, error_type)
+    logger.warning(
+        f"Failed to crawl URL: {url} - {error} "
+        f"({error_type}, attempt {attempts}{', permanent' if permanent else ''})"
+    )
+    return {
+        "url": url,
+        "error_type": error_type,
+        "error": error[:1000] if error else None,
+        "status_code": status_code,
+        "permanent": permanent,
+        "attempts": attempts,
+        "last_failed_at": datetime.now(timezone.utc).isoformat(),
+        "next_attempt_at": None if permanent else next_attempt_at(attempts).isoformat(),
+    }
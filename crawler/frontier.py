@@ -0,0 +1,165 @@
+import heapq
+import itertools
+import re
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urldefrag, urlparse, urlunparse
+from .config import (
+    CONTENT_KEYWORDS, RELEVANCE_THRESHOLD, FRONTIER_URL_TERMS, FRONTIER_ANCHOR_WEIGHT,
+    FRONTIER_DEPTH_PENALTY, FRONTIER_PARENT_WEIGHT,
+)
+
+URL_TOKEN_PATTERN = re.compile(r"[a-z]+")
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+ANCHOR_KEYWORDS = [keyword.lower() for keyword in CONTENT_KEYWORDS]
+
+
+def score_link(url: str, anchor_text: str = "", depth: int = 0, parent_relevance: float = 0.0) -> float:
+    """Priority of a discovered link; higher is fetched first
+
+    Combines weighted tokens in the URL path and query
+    (``FRONTIER_URL_TERMS``), content keywords in the anchor text, the
+    relevance score of the page the link was found on, and a penalty per
+    level of depth.
+    """
+    parsed = urlparse(url)
+    tokens = set(URL_TOKEN_PATTERN.findall(f"{parsed.path} {parsed.query}".lower()))
+    score = sum(FRONTIER_URL_TERMS.get(token, 0.0) for token in tokens)
+
+    anchor = anchor_text.lower()
+    if anchor:
+        hits = sum(1 for keyword in ANCHOR_KEYWORDS if keyword in anchor)
+        score += FRONTIER_ANCHOR_WEIGHT * min(hits, 3)
+
+    # Parent relevance is measured in thresholds, capped so one very
+    # keyword-dense hub page does not dominate everything linked from it
+    if RELEVANCE_THRESHOLD > 0:
+        score += FRONTIER_PARENT_WEIGHT * max(-1.0, min(parent_relevance / RELEVANCE_THRESHOLD, 2.0))
+
+    return score - FRONTIER_DEPTH_PENALTY * depth
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL, used as its frontier key
+
+    Fragments never change the fetched page, and scheme and host case, a
+    default port or an empty path do not either.
+    """
+    parsed = urlparse(urldefrag(url)[0])
+    scheme = parsed.scheme.lower()
+    netloc = parsed.netloc.lower()
+    host, _, port = netloc.rpartition(':')
+    if host and port.isdigit() and int(port) == DEFAULT_PORTS.get(scheme) and not netloc.endswith(']'):
+        netloc = host
+    return urlunparse((scheme, netloc, parsed.path or '/', parsed.params, parsed.query, ''))
+
+
+def host_key(url: str) -> str:
+    """Host a URL is budgeted under; ``www.`` and the bare domain are one site"""
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+class Frontier:
+    """Priority queue of URLs to fetch during discovery
+
+    Each URL is queued once (the first time it is seen with an allowed
+    depth, keeping the best score if it is seen again before it is
+    fetched) and popped in descending score order, ties broken first come
+    first served.
+    """
+
+    def __init__(self, max_depth: int, visited: Optional[Set[str]] = None):
+        self.max_depth = max_depth
+        self.scores: Dict[str, float] = {}
+        self._heap = []
+        # May be shared with other frontiers, so a URL is fetched once overall
+        self._popped = visited if visited is not None else set()
+        self._counter = itertools.count()
+
+    def push(self, url: str, depth: int, score: float) -> bool:
+        """Queue a URL; returns False if it was already fetched or is too deep"""
+        url = normalize_url(url)
+        if depth > self.max_depth or url in self._popped:
+            return False
+
+        best = self.scores.get(url)
+        if best is not None and best >= score:
+            return False
+
+        # A better score re-queues the URL; the stale entry is skipped on pop
+        self.scores[url] = score
+        heapq.heappush(self._heap, (-score, next(self._counter), url, depth))
+        return True
+
+    def pop(self) -> Optional[Tuple[str, int, float]]:
+        """Next ``(url, depth, score)`` to fetch, or None when empty"""
+        while self._heap:
+            negative_score, _, url, depth = heapq.heappop(self._heap)
+            if url in self._popped or -negative_score < self.scores[url]:
+                continue
+            self._popped.add(url)
+            return url, depth, -negative_score
+        return None
+
+    def __len__(self) -> int:
+        return sum(1 for url in self.scores if url not in self._popped)
+
+
+class HostFrontiers:
+    """Discovery frontiers of several seed sites sharing one page budget
+
+    Each site (see ``host_key``) has its own priority frontier, and links to
+    any of the seed sites are queued on that site's frontier; all of them
+    share one visited set, so a URL reachable from several seeds is fetched
+    once. ``pop`` only hands out a URL of a site with no fetch in flight
+    (one request at a time per site, and each fetch sees the links the
+    previous one found), choosing the site that has fetched the fewest
+    pages. Stopping after N pops therefore splits N evenly between sites,
+    and the share of a site that runs out of links goes to the others.
+    """
+
+    def __init__(self, max_depth: int):
+        self.max_depth = max_depth
+        self.visited: Set[str] = set()
+        self.frontiers: Dict[str, Frontier] = {}
+        self.fetched: Dict[str, int] = {}
+        self._in_flight: Set[str] = set()
+
+    def add_seed(self, url: str) -> bool:
+        """Add a site to discover, starting at ``url``"""
+        host = host_key(url)
+        if host not in self.frontiers:
+            self.frontiers[host] = Frontier(self.max_depth, self.visited)
+            self.fetched[host] = 0
+        return self.frontiers[host].push(url, 0, 0.0)
+
+    def in_scope(self, url: str) -> bool:
+        return host_key(url) in self.frontiers
+
+    def push(self, url: str, depth: int, score: float) -> bool:
+        """Queue a URL on its site's frontier; False if it is not on a seed site"""
+        frontier = self.frontiers.get(host_key(url))
+        return frontier is not None and frontier.push(url, depth, score)
+
+    def pop(self) -> Optional[Tuple[str, int, float]]:
+        """Next URL of the least-fetched idle site, or None if no idle site has one"""
+        idle = [host for host in self.frontiers if host not in self._in_flight]
+        for host in sorted(idle, key=self.fetched.get):
+            entry = self.frontiers[host].pop()
+            if entry is not None:
+                self._in_flight.add(host)
+                self.fetched[host] += 1
+                return entry
+        return None
+
+    def done(self, url: str):
+        """Mark the fetch of a popped URL finished, so its site can be popped again"""
+        self._in_flight.discard(host_key(url))
+
+    def queued(self) -> int:
+        return sum(len(frontier) for frontier in self.frontiers.values())
+
+    def hosts(self) -> List[str]:
+        return list(self.frontiers)
@@ -0,0 +1,299 @@
+import asyncio
+import logging
+import struct
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, wait
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+from .aio import BackgroundLoop
+from .config import (
+    USER_AGENT, IMAGE_PROBE_BYTES, IMAGE_PROBE_CONCURRENCY, IMAGE_PROBE_TIMEOUT, IMAGE_PROBE_CACHE_SIZE,
+    IMAGE_MIN_WIDTH, IMAGE_MIN_HEIGHT, IMAGE_MAX_BYTES, IMAGE_MAX_ASPECT_RATIO,
+)
+
+logger = logging.getLogger(__name__)
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# JPEG start-of-frame markers, which carry the dimensions (C4, C8 and CC are not frames)
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+JPEG_STANDALONE_MARKERS = set(range(0xD0, 0xDA)) | {0x01}
+
+
+def _jpeg_size(data: bytes) -> Optional[Tuple[int, int]]:
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:
+            i += 1  # Fill byte
+            continue
+        if marker in JPEG_STANDALONE_MARKERS:
+            i += 2
+            continue
+        if marker in JPEG_SOF_MARKERS:
+            height, width = struct.unpack('>HH', data[i + 5:i + 9])
+            return width, height
+        i += 2 + struct.unpack('>H', data[i + 2:i + 4])[0]
+    return None
+
+
+def _webp_size(data: bytes) -> Optional[Tuple[int, int]]:
+    chunk = data[12:16]
+    if chunk == b'VP8 ' and len(data) >= 30:
+        width, height = struct.unpack('<HH', data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L' and len(data) >= 25:
+        bits = struct.unpack('<I', data[21:25])[0]
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X' and len(data) >= 30:
+        return int.from_bytes(data[24:27], 'little') + 1, int.from_bytes(data[27:30], 'little') + 1
+    return None
+
+
+def _isobmff_size(data: bytes) -> Optional[Tuple[int, int]]:
+    # AVIF/HEIF: the first image spatial extents ('ispe') box
+    index = data.find(b'ispe')
+    if index < 0 or len(data) < index + 16:
+        return None
+    return struct.unpack('>II', data[index + 8:index + 16])
+
+
+def image_dimensions(data: bytes) -> Optional[Tuple[str, Optional[int], Optional[int]]]:
+    """Format, width and height of an image from its first bytes
+
+    Returns None if the bytes are not a known image format. Width and height
+    are None for SVG, and when the header is past the bytes given.
+    """
+    size = None
+    if data.startswith(PNG_SIGNATURE):
+        kind = 'png'
+        if len(data) >= 24 and data[12:16] == b'IHDR':
+            size = struct.unpack('>II', data[16:24])
+    elif data[:6] in (b'GIF87a', b'GIF89a'):
+        kind = 'gif'
+        if len(data) >= 10:
+            size = struct.unpack('<HH', data[6:10])
+    elif data.startswith(b'\xff\xd8'):
+        kind, size = 'jpeg', _jpeg_size(data)
+    elif data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        kind, size = 'webp', _webp_size(data)
+    elif data[4:8] == b'ftyp' and data[8:12] in (b'avif', b'avis', b'heic', b'heix', b'mif1'):
+        kind, size = 'avif' if data[8:11] == b'avi' else 'heif', _isobmff_size(data)
+    elif b'<svg' in data[:1024].lower():
+        kind = 'svg'
+    else:
+        return None
+    width, height = size if size else (None, None)
+    return kind, width, height
+
+
+@dataclass(slots=True)
+class ImageProbe:
+    """What the first bytes of an image URL revealed"""
+    url: str
+    status_code: Optional[int] = None
+    format: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    size: Optional[int] = None  # Total bytes, when the server says
+    error: Optional[str] = None
+
+    def rejection(self) -> Optional[str]:
+        """Why the image is unfit for a thumbnail, or None if it is usable"""
+        if self.error or self.status_code not in (200, 206):
+            return "broken"
+        if self.format is None:
+            return "not_image"
+        if self.size is not None and self.size > IMAGE_MAX_BYTES:
+            return "too_large"
+        if self.width is None or self.height is None:
+            return None
+        if self.width < IMAGE_MIN_WIDTH or self.height < IMAGE_MIN_HEIGHT:
+            return "too_small"
+        if max(self.width / self.height, self.height / self.width) > IMAGE_MAX_ASPECT_RATIO:
+            return "bad_aspect"
+        return None
+
+    @property
+    def has_dimensions(self) -> bool:
+        return self.width is not None and self.height is not None
+
+
+def choose_thumbnail(candidates: Sequence[str], probes: Dict[str, ImageProbe]) -> Optional[str]:
+    """Best thumbnail among candidates in page priority order
+
+    The first usable image with known dimensions wins, then the first usable
+    one whose dimensions could not be read (SVG, or a header past the probed
+    bytes), then the first candidate whose probe did not finish. None if
+    every candidate was rejected.
+    """
+    unsized = unprobed = None
+    for url in candidates:
+        probe = probes.get(url)
+        if probe is None:
+            unprobed = unprobed or url
+        elif probe.rejection() is None:
+            if probe.has_dimensions:
+                return url
+            unsized = unsized or url
+    return unsized or unprobed
+
+
+def _total_size(headers, status_code: int) -> Optional[int]:
+    if status_code == 206:
+        # Content-Range: bytes 0-16383/123456
+        total = headers.get('Content-Range', '').rpartition('/')[2]
+        return int(total) if total.isdigit() else None
+    length = headers.get('Content-Length', '')
+    return int(length) if length.isdigit() else None
+
+
+class ImageProber:
+    """Concurrent validation of thumbnail candidates
+
+    Each candidate image is requested with ``Range: bytes=0-N`` on an
+    aiohttp session running in a background event loop, and only the first
+    ``probe_bytes`` are read to find its format and dimensions; a server
+    that ignores the range is cut off after as many bytes. ``prefetch``
+    starts the probes for a page's candidates without waiting, so they run
+    while the crawl moves on; ``choose`` waits for them and picks the best.
+    Probes are cached per image URL, so a logo or hero shared by many pages
+    is fetched once. If aiohttp is unavailable, probing is disabled and the
+    first candidate is used as before.
+    """
+
+    def __init__(self, concurrency: int = IMAGE_PROBE_CONCURRENCY, timeout: float = IMAGE_PROBE_TIMEOUT,
+                 probe_bytes: int = IMAGE_PROBE_BYTES, cache_size: int = IMAGE_PROBE_CACHE_SIZE):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.probe_bytes = probe_bytes
+        self.cache_size = cache_size
+        self.disabled = False
+        self.counts = Counter()
+        self._aio: Optional[BackgroundLoop] = None
+        self._session = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._cache: "OrderedDict[str, Future]" = OrderedDict()
+        # Reentrant: a probe that is already done runs its callback in prefetch
+        self._lock = threading.RLock()
+
+    def _ensure_started(self) -> bool:
+        # Called with self._lock held
+        if self.disabled:
+            return False
+        if self._aio is None:
+            self._aio = BackgroundLoop("crawler-images")
+            try:
+                self._aio.run(self._start(), timeout=self.timeout)
+            except Exception as e:
+                logger.warning(f"Thumbnail probing disabled, could not start HTTP client: {str(e)}")
+                self.disabled = True
+                self._aio.stop()
+                self._aio = None
+                return False
+        return True
+
+    async def _start(self):
+        import aiohttp
+
+        self._session = aiohttp.ClientSession(
+            headers={"User-Agent": USER_AGENT},
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            connector=aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300),
+        )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def _probe(self, url: str) -> ImageProbe:
+        import aiohttp
+
+        async with self._semaphore:
+            try:
+                headers = {"Range": f"bytes=0-{self.probe_bytes - 1}"}
+                async with self._session.get(url, headers=headers) as response:
+                    probe = ImageProbe(url, status_code=response.status)
+                    if response.status not in (200, 206):
+                        return probe
+                    probe.size = _total_size(response.headers, response.status)
+                    data = b''
+                    while len(data) < self.probe_bytes:
+                        chunk = await response.content.read(self.probe_bytes - len(data))
+                        if not chunk:
+                            break
+                        data += chunk
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                return ImageProbe(url, error=str(e) or type(e).__name__)
+
+        detected = image_dimensions(data)
+        if detected:
+            probe.format, probe.width, probe.height = detected
+        return probe
+
+    def prefetch(self, urls: Sequence[str]) -> List[Future]:
+        """Start probing image URLs that are not cached yet; does not wait"""
+        futures = []
+        with self._lock:
+            if not urls or not self._ensure_started():
+                return futures
+            for url in urls:
+                future = self._cache.get(url)
+                if future is None:
+                    future = self._aio.submit(self._probe(url))
+                    future.add_done_callback(self._count_probe)
+                    self._cache[url] = future
+                    self.counts["probed"] += 1
+                    if len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+                else:
+                    self._cache.move_to_end(url)
+                    self.counts["cached"] += 1
+                futures.append(future)
+        return futures
+
+    def _count_probe(self, future: Future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        rejection = future.result().rejection()
+        with self._lock:
+            self.counts[rejection or "usable"] += 1
+
+    def choose(self, candidates: Sequence[str], timeout: Optional[float] = None) -> Optional[str]:
+        """Best of a page's thumbnail candidates, waiting up to ``timeout`` for their probes"""
+        futures = self.prefetch(candidates)
+        if not futures:
+            return candidates[0] if candidates else None
+
+        wait(futures, timeout=self.timeout if timeout is None else timeout)
+        probes = {}
+        for future in futures:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                probe = future.result()
+                probes[probe.url] = probe
+
+        chosen = choose_thumbnail(candidates, probes)
+        with self._lock:
+            self.counts["chosen" if chosen else "none_usable"] += 1
+            if chosen and chosen != candidates[0]:
+                self.counts["replaced_first"] += 1
+        return chosen
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self.counts, "disabled": self.disabled}
+
+    async def _stop(self):
+        if self._session is not None:
+            await self._session.close()
+
+    def close(self):
+        """Close the HTTP session and its event loop"""
+        with self._lock:
+            if self._aio is None:
+                return
+            try:
+                self._aio.run(self._stop(), timeout=self.timeout)
+            except Exception as e:
+                logger.debug("Error closing image prober: %s", e)
+            self._aio.stop()
+            self._aio = None
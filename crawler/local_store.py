@@ -0,0 +1,134 @@
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+from .config import FAILURE_RETRY_LIMIT
+from .failures import failure_row
+from .models import CampsiteData
+
+logger = logging.getLogger(__name__)
+
+class LocalStore:
+    """In-process stand-in for ``DatabaseManager``
+
+    Used by ``--dry-run``: saved campsites, the URL index used for
+    deduplication and the retry queue all live in memory, so fetching and
+    extraction run at full speed without Supabase credentials or network
+    access to the database. The method names and return values mirror
+    ``DatabaseManager``.
+    """
+
+    def __init__(self, known_urls: Optional[Iterable[str]] = None):
+        self.urls = set(known_urls or ())
+        self.campsites: Dict[str, CampsiteData] = {}
+        self.write_counts = Counter()
+        self.failures: Dict[str, dict] = {}
+        self.failed_urls = set()
+        self.seen_count = 0
+
+    def url_exists(self, url: str) -> bool:
+        """Check the local URL index"""
+        return url in self.urls
+
+    def save_campsite(self, campsite_data: CampsiteData) -> bool:
+        """Keep campsite data in memory, applying recrawl changes field by field"""
+        url = campsite_data.url
+        if url not in self.urls:
+            self.urls.add(url)
+            self.campsites[url] = campsite_data
+            self.write_counts["inserted"] += 1
+            return True
+
+        stored = self.campsites.get(url)
+        if stored is not None and stored.fingerprint() == campsite_data.fingerprint():
+            self.write_counts["unchanged"] += 1
+            self.mark_url_as_seen(url)
+            return True
+
+        # Known URLs loaded from --known-urls have no stored fields
+        changes = campsite_data.changed_fields(stored.persisted_fields() if stored else {})
+        self.campsites[url] = campsite_data
+        self.write_counts["updated"] += 1
+        self.write_counts["fields_updated"] += len(changes)
+        return True
+
+    def mark_url_as_seen(self, url: str):
+        self.seen_count += 1
+
+    def flush_seen_urls(self):
+        pass
+
+    def flush_updates(self):
+        pass
+
+    def write_stats(self) -> dict:
+        return dict(self.write_counts)
+
+    def drain(self, timeout: Optional[float] = None):
+        pass
+
+    def flush(self, timeout: Optional[float] = None):
+        pass
+
+    def close(self):
+        pass
+
+    def update_campsite(self, url: str, updates: dict) -> bool:
+        return url in self.urls
+
+    async def upload_screenshot(self, screenshot_bytes: bytes, url: str) -> Optional[str]:
+        logger.info(f"Dry run: not uploading screenshot for {url}")
+        return None
+
+    def get_crawl_statistics(self) -> dict:
+        """Statistics over the campsites stored during this run"""
+        last_crawled = max((c.crawled_at for c in self.campsites.values()), default=None)
+        pending = sum(1 for failure in self.failures.values() if not failure['permanent'])
+        return {
+            "total_campsites": len(self.campsites),
+            "categories": dict(Counter(c.category for c in self.campsites.values() if c.category)),
+            "countries": dict(Counter(c.country for c in self.campsites.values() if c.country)),
+            "last_crawled_at": last_crawled.isoformat() if last_crawled else None,
+            "last_updated": None,
+            "pending_retries": pending,
+            "permanent_failures": len(self.failures) - pending,
+        }
+
+    def cleanup_old_data(self, days_old: int = 30, archive: bool = True,
+                         dry_run: bool = False, batch_size: int = 0) -> int:
+        logger.info("Dry run: nothing to clean up in the local store")
+        return 0
+
+    def mark_url_as_failed(self, url: str, error: str, error_type: str = "other",
+                           status_code: Optional[int] = None, permanent: bool = False):
+        """Record a failed crawl in the in-memory retry queue"""
+        attempts = self.failures.get(url, {}).get('attempts', 0) + 1
+        self.failures[url] = failure_row(url, error, error_type, status_code, permanent, attempts)
+        self.failed_urls.add(url)
+
+    def clear_failure(self, url: str):
+        self.failures.pop(url, None)
+        self.failed_urls.discard(url)
+
+    def get_failure_states(self, urls: List[str], chunk_size: int = 100) -> Dict[str, dict]:
+        return {url: self.failures[url] for url in urls if url in self.failures}
+
+    def filter_retryable_urls(self, urls: List[str]) -> List[str]:
+        """Drop permanently failed URLs and transient failures not yet due"""
+        now = datetime.now(timezone.utc)
+
+        def is_due(url: str) -> bool:
+            state = self.failures.get(url)
+            if state is None:
+                return True
+            if state['permanent']:
+                return False
+            return datetime.fromisoformat(state['next_attempt_at']) <= now
+
+        return [url for url in urls if is_due(url)]
+
+    def get_due_failed_urls(self, limit: int = FAILURE_RETRY_LIMIT) -> List[str]:
+        return self.filter_retryable_urls([url for url, state in self.failures.items() if not state['permanent']])[:limit]
+
+    def get_urls_to_recrawl(self, days_since_last_crawl: int = 7) -> list:
+        return []
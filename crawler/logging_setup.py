@@ -0,0 +1,105 @@
+import atexit
+import itertools
+import json
+import logging
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Optional
+from .config import LOG_LEVEL, LOG_FORMAT, LOG_FILE, LOG_JSON, LOG_URL_SAMPLE_EVERY
+
+# Per-URL progress messages go to this logger so they can be sampled
+URL_LOGGER = "crawler.urls"
+
+# LogRecord attributes that are not user-supplied ``extra`` fields
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves all formatting to the listener thread
+
+    ``QueueHandler.prepare`` formats the message (and any traceback) in the
+    calling thread so the record can be pickled. The queue here is
+    in-process, so the record is enqueued as is and the logging thread
+    only pays for the enqueue.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """Keep one in ``every`` records below WARNING"""
+
+    def __init__(self, every: int = LOG_URL_SAMPLE_EVERY):
+        super().__init__()
+        self.every = max(1, every)
+        self._counter = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.every == 1:
+            return True
+        return next(self._counter) % self.every == 0
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as one JSON object per line
+
+    ``extra`` fields passed to a logging call (e.g. ``url``) become keys.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def setup_logging(log_level: str = LOG_LEVEL, json_lines: bool = LOG_JSON,
+                  sample_every: int = LOG_URL_SAMPLE_EVERY,
+                  log_file: Optional[str] = LOG_FILE) -> QueueListener:
+    """Route all logging through a queue drained by a background thread
+
+    The stdout and file handlers run on the listener thread; callers only
+    enqueue the record. Per-URL INFO messages on ``URL_LOGGER`` are sampled
+    before they are enqueued. The listener is stopped (and the queue
+    flushed) at exit.
+    """
+    formatter = JSONFormatter() if json_lines else logging.Formatter(LOG_FORMAT)
+    handlers: List[logging.Handler] = [logging.StreamHandler(sys.stdout)]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, mode='a'))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(DeferredQueueHandler(log_queue))
+    root.setLevel(getattr(logging, log_level.upper()))
+
+    url_logger = logging.getLogger(URL_LOGGER)
+    for existing in url_logger.filters[:]:
+        if isinstance(existing, SamplingFilter):
+            url_logger.removeFilter(existing)
+    url_logger.addFilter(SamplingFilter(sample_every))
+
+    # Reduce noise from external libraries
+    logging.getLogger('urllib3').setLevel(logging.WARNING)
+    logging.getLogger('requests').setLevel(logging.WARNING)
+
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
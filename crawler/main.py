@@ -1,39 +1,47 @@
 #!/usr/bin/env python3
 
 import argparse
+import atexit
+import itertools
 import logging
 import json
 import sys
+from contextlib import ExitStack
 from pathlib import Path
-from typing import List
-
-from .config import LOG_LEVEL, LOG_FORMAT, SEED_URLS
+from typing import Iterable, Iterator, List, TextIO
+
+from .config import (
+    LOG_LEVEL, LOG_JSON, LOG_URL_SAMPLE_EVERY, SEED_URLS, RELEVANCE_THRESHOLD, EXTRACTION_CACHE_PATH,
+    DISCOVERY_MAX_PAGES, RENDER_JS_PAGES, PROBE_IMAGES, DB_ASYNC, STATUS_INTERVAL, PAGE_STORE_PATH,
+)
+from .async_database import AsyncDatabaseManager
+from .budget import CrawlBudget, parse_duration, prioritize
+from .charset import ENCODING_SOURCES
 from .crawler import WebCrawler
-
-def setup_logging(log_level: str = LOG_LEVEL):
-    """Setup logging configuration"""
-    logging.basicConfig(
-        level=getattr(logging, log_level.upper()),
-        format=LOG_FORMAT,
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-            logging.FileHandler('crawler.log', mode='a')
-        ]
-    )
-
-    # Reduce noise from external libraries
-    logging.getLogger('urllib3').setLevel(logging.WARNING)
-    logging.getLogger('requests').setLevel(logging.WARNING)
-
-def load_urls_from_file(file_path: str) -> List[str]:
-    """Load URLs from a text file"""
-    urls = []
+from .extractors import ContentExtractor
+from .extraction_cache import ExtractionCache
+from .images import ImageProber
+from .local_store import LocalStore
+from .logging_setup import setup_logging
+from .page_store import PageStore
+from .renderer import BrowserRenderer
+from .profiling import Profiler
+from .results import ResultWriter
+from .telemetry import StatusReporter
+
+def iter_urls(lines: Iterable[str]) -> Iterator[str]:
+    """Yield URLs from lines of text, skipping empty lines and comments"""
+    for line in lines:
+        url = line.strip()
+        if url and not url.startswith('#'):
+            yield url
+
+def open_url_file(file_path: str) -> TextIO:
+    """Open a URL file for reading, ``-`` meaning stdin"""
+    if file_path == '-':
+        return sys.stdin
     try:
-        with open(file_path, 'r') as f:
-            for line in f:
-                url = line.strip()
-                if url and not url.startswith('#'):  # Skip empty lines and comments
-                    urls.append(url)
+        return open(file_path, 'r')
     except FileNotFoundError:
         logging.error(f"URL file not found: {file_path}")
         sys.exit(1)
@@ -41,17 +49,144 @@ def load_urls_from_file(file_path: str) -> List[str]:
         logging.error(f"Error reading URL file: {str(e)}")
         sys.exit(1)
 
-    return urls
+def load_urls_from_file(file_path: str) -> List[str]:
+    """Load URLs from a text file"""
+    try:
+        with open_url_file(file_path) as f:
+            return list(iter_urls(f))
+    except Exception as e:
+        logging.error(f"Error reading URL file: {str(e)}")
+        sys.exit(1)
 
 def save_results(results: dict, output_file: str):
-    """Save crawl results to JSON file"""
+    """Save crawl results to JSON file
+
+    The per-URL ``results`` entries are written one at a time, so the report
+    is never materialised as a whole in memory.
+    """
     try:
         with open(output_file, 'w') as f:
-            json.dump(results, f, indent=2, default=str)
+            f.write('{\n')
+            for key, value in results.items():
+                if key == 'results':
+                    continue
+                f.write(f'  {json.dumps(key)}: {json.dumps(value, default=str)},\n')
+
+            f.write('  "results": [')
+            for i, result in enumerate(results.get('results', [])):
+                f.write(',\n    ' if i else '\n    ')
+                f.write(json.dumps(result, default=str))
+            f.write('\n  ]\n}\n')
         logging.info(f"Results saved to: {output_file}")
     except Exception as e:
         logging.error(f"Error saving results: {str(e)}")
 
+def print_statistics(stats: dict):
+    """Print aggregated crawl statistics"""
+    print(f"\nCrawl Statistics:")
+    print(f"Total Campsites: {stats.get('total_campsites', 0)}")
+    print(f"Last Crawled: {stats.get('last_crawled_at') or 'never'}")
+    print(f"Last Updated: {stats.get('last_updated') or 'never'}")
+    print(f"Pending Retries: {stats.get('pending_retries', 0)}")
+    print(f"Permanent Failures: {stats.get('permanent_failures', 0)}")
+
+    for title, key in (("By Category", "categories"), ("By Country", "countries")):
+        counts = stats.get(key) or {}
+        print(f"\n{title}:")
+        for name, count in sorted(counts.items(), key=lambda item: item[1], reverse=True):
+            print(f"  {name}: {count}")
+
+def calibrate_relevance(directory: str):
+    """Suggest a relevance threshold from labelled archived pages
+
+    Expects ``relevant/`` and ``irrelevant/`` subdirectories of saved HTML
+    pages and prints the threshold with the best F1 score.
+    """
+    from bs4 import BeautifulSoup
+
+    extractor = ContentExtractor()
+    texts = {}
+    for label in ('relevant', 'irrelevant'):
+        paths = sorted(Path(directory, label).glob('*.htm*'))
+        texts[label] = [extractor.relevance_text(BeautifulSoup(path.read_bytes(), 'lxml')) for path in paths]
+
+    if not texts['relevant'] or not texts['irrelevant']:
+        logging.error(f"Need HTML pages in both {directory}/relevant and {directory}/irrelevant")
+        sys.exit(1)
+
+    result = extractor.relevance_scorer.calibrate(texts['relevant'], texts['irrelevant'])
+
+    print(f"\nRelevance Calibration ({len(texts['relevant'])} relevant, {len(texts['irrelevant'])} irrelevant pages):")
+    print(f"Current Threshold: {RELEVANCE_THRESHOLD}")
+    print(f"Suggested Threshold: {result['threshold']:.4f}")
+    print(f"Precision: {result['precision']:.3f}")
+    print(f"Recall: {result['recall']:.3f}")
+    print(f"F1: {result['f1']:.3f}")
+
+def benchmark_parsers(directory: str, repeat: int = 20):
+    """Compare the HTML parser backends on saved pages
+
+    Prints per-page extraction time for each backend, the Python heap held
+    by the parsed trees of all pages and the peak while extracting them, and
+    the number of pages whose extracted fields differ between backends.
+    """
+    import time
+    import tracemalloc
+    from .parsers import PARSER_BACKENDS
+
+    pages = [path.read_text(errors='replace') for path in sorted(Path(directory).glob('**/*.htm*'))]
+    if not pages:
+        logging.error(f"No HTML pages found in {directory}")
+        sys.exit(1)
+
+    extractors = {backend: ContentExtractor(parser=backend) for backend in PARSER_BACKENDS}
+    fields = {backend: [extractor.extract_fields(html) for html in pages] for backend, extractor in extractors.items()}
+    mismatches = sum(1 for values in zip(*fields.values()) if any(value != values[0] for value in values))
+
+    print(f"\nParser Benchmark ({len(pages)} pages x {repeat}):")
+    for backend, extractor in extractors.items():
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for html in pages:
+                extractor.extract_fields(html)
+        seconds = (time.perf_counter() - started) / (repeat * len(pages))
+
+        # Separate passes: tracing slows allocation-heavy code down
+        tracemalloc.start()
+        documents = [extractor.parse(html) for html in pages]
+        trees = tracemalloc.get_traced_memory()[0]
+        del documents
+        tracemalloc.reset_peak()
+        for html in pages:
+            extractor.extract_fields(html)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"  {backend}: {seconds * 1000:.2f} ms/page, trees {trees / 1024:.0f} KiB, "
+              f"extraction peak {peak / 1024:.0f} KiB")
+    print(f"Pages with different fields: {mismatches}")
+
+def report_page_store(path: str, sample: int = 500):
+    """Print the compression ratio and decode throughput of a page store"""
+    if not Path(path).exists():
+        logging.error(f"Page store not found: {path}")
+        sys.exit(1)
+
+    store = PageStore(path)
+    try:
+        stats = store.stats()
+        report = store.report(sample)
+    finally:
+        store.close()
+
+    print(f"\nPage Store ({path}):")
+    print(f"Pages: {stats['pages']}, {stats['dictionaries']} dictionaries ({stats['dictionary_bytes'] / 1024:.0f} KiB)")
+    print(f"Stored: {stats['raw_bytes'] / 1e6:.1f} MB in {stats['stored_bytes'] / 1e6:.1f} MB "
+          f"(ratio {stats['ratio'] or 0:.1f}, dictionaries included)")
+    print(f"Latest {report['pages']} pages ({report['with_dictionary']} with a dictionary): "
+          f"ratio {report['ratio'] or 0:.1f}, plain zstd {report['zstd_ratio'] or 0:.1f}, "
+          f"gzip {report['gzip_ratio'] or 0:.1f}")
+    print(f"Decode: {report['decode_mb_per_second'] or 0:.0f} MB/s")
+
 def main():
     """Main crawler entry point"""
     parser = argparse.ArgumentParser(description='StudyTour Campsite Crawler')
@@ -59,7 +194,13 @@ def main():
     parser.add_argument(
         '--urls',
         type=str,
-        help='File containing URLs to crawl (one per line)'
+        help='File containing URLs to crawl (one per line), or - to read them from stdin (implies --stream)'
+    )
+
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Stream URLs through a concurrent pipeline and write results as they complete'
     )
 
     parser.add_argument(
@@ -70,8 +211,10 @@ def main():
 
     parser.add_argument(
         '--discover',
-        type=str,
-        help='Discover URLs from a seed URL'
+        nargs='*',
+        metavar='URL',
+        help='Discover URLs from one or more seed URLs, or from all SEED_URLS if none are given; '
+             'the sites are explored concurrently and share --max-pages'
     )
 
     parser.add_argument(
@@ -81,6 +224,132 @@ def main():
         help='Maximum crawl depth for URL discovery (default: 2)'
     )
 
+    parser.add_argument(
+        '--max-pages',
+        type=int,
+        default=DISCOVERY_MAX_PAGES,
+        help=f'Pages fetched during URL discovery across all seed sites, best-scored links first '
+             f'(default: {DISCOVERY_MAX_PAGES})'
+    )
+
+    parser.add_argument(
+        '--retry-failed',
+        action='store_true',
+        help='Also crawl previously failed URLs whose retry backoff has elapsed'
+    )
+
+    parser.add_argument(
+        '--time-budget',
+        type=parse_duration,
+        metavar='DURATION',
+        help='Finish within this wall-clock time (e.g. 3000, 50m, 1h): URLs that would not complete in time '
+             'are skipped and written to a .remaining.txt checkpoint next to --output'
+    )
+
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='Recrawl URLs that are already stored and update only the fields that changed'
+    )
+
+    parser.add_argument(
+        '--stats',
+        action='store_true',
+        help='Print aggregated crawl statistics and exit'
+    )
+
+    parser.add_argument(
+        '--cleanup-days',
+        type=int,
+        help='Remove crawler campsites not seen by a crawl for this many days, then exit'
+    )
+
+    parser.add_argument(
+        '--cleanup-dry-run',
+        action='store_true',
+        help='With --cleanup-days, only count stale campsites'
+    )
+
+    parser.add_argument(
+        '--no-archive',
+        action='store_true',
+        help='With --cleanup-days, delete without copying rows to campsites_archive'
+    )
+
+    parser.add_argument(
+        '--dry-run', '--no-db',
+        dest='dry_run',
+        action='store_true',
+        help='Crawl without Supabase: results are kept in memory and written to --output only'
+    )
+
+    parser.add_argument(
+        '--known-urls',
+        type=str,
+        help='With --dry-run, file of URLs to treat as already in the database'
+    )
+
+    parser.add_argument(
+        '--extraction-cache',
+        type=str,
+        default=EXTRACTION_CACHE_PATH,
+        metavar='PATH',
+        help=f'SQLite file caching extracted fields by page body hash (default: {EXTRACTION_CACHE_PATH})'
+    )
+
+    parser.add_argument(
+        '--no-extraction-cache',
+        action='store_true',
+        help='Parse every page even if an identical body was extracted before'
+    )
+
+    parser.add_argument(
+        '--page-store',
+        type=str,
+        default=PAGE_STORE_PATH,
+        metavar='PATH',
+        help='SQLite file keeping every downloaded body, compressed with per-host zstd dictionaries '
+             '(default: PAGE_STORE_PATH, disabled if empty)'
+    )
+
+    parser.add_argument(
+        '--page-store-report',
+        type=str,
+        metavar='PATH',
+        help='Print the compression ratio and decode throughput of a page store, then exit'
+    )
+
+    parser.add_argument(
+        '--no-render',
+        action='store_true',
+        default=not RENDER_JS_PAGES,
+        help='Do not render client-side (SPA) pages in a headless browser'
+    )
+
+    parser.add_argument(
+        '--no-probe-images',
+        action='store_true',
+        default=not PROBE_IMAGES,
+        help='Save the first thumbnail candidate without checking that it is a usable image'
+    )
+
+    parser.add_argument(
+        '--calibrate-relevance',
+        type=str,
+        metavar='DIR',
+        help='Suggest RELEVANCE_THRESHOLD from DIR/relevant and DIR/irrelevant HTML pages, then exit'
+    )
+
+    parser.add_argument(
+        '--benchmark-parsers',
+        type=str,
+        nargs='?',
+        const=str(Path(__file__).parent / 'tests' / 'fixtures' / 'pages'),
+        metavar='DIR',
+        help='Compare the speed, memory and output of the HTML parser backends on the pages in DIR '
+             '(default: the test fixture corpus), then exit'
+    )
+
     parser.add_argument(
         '--output',
         type=str,
@@ -102,92 +371,269 @@ def main():
         help=f'Logging level (default: {LOG_LEVEL})'
     )
 
-    args = parser.parse_args()
+    parser.add_argument(
+        '--profile',
+        nargs='?',
+        const='cprofile',
+        choices=['cprofile', 'sample'],
+        help='Profile the run: "cprofile" (default) writes .pstats, a text summary and collapsed stacks; '
+             '"sample" only samples stacks, for low overhead. Reports go next to --output'
+    )
 
-    # Setup logging
-    setup_logging(args.log_level)
+    parser.add_argument(
+        '--profile-memory',
+        action='store_true',
+        help='Trace allocations with tracemalloc and write the top allocation sites next to --output'
+    )
 
-    # Initialize crawler
-    try:
-        crawler = WebCrawler()
-        logging.info("Crawler initialized successfully")
-    except Exception as e:
-        logging.error(f"Failed to initialize crawler: {str(e)}")
-        sys.exit(1)
+    parser.add_argument(
+        '--status-interval',
+        type=float,
+        default=STATUS_INTERVAL,
+        metavar='SECONDS',
+        help=f'Log a one-line progress/throughput status every SECONDS (default: {STATUS_INTERVAL}, 0 disables)'
+    )
 
-    # Determine URLs to crawl
-    urls_to_crawl = []
+    parser.add_argument(
+        '--status-port',
+        type=int,
+        metavar='PORT',
+        help='Serve the live status on http://127.0.0.1:PORT/ (text) and /status (JSON)'
+    )
 
-    if args.discover:
-        logging.info(f"Discovering URLs from: {args.discover}")
-        try:
-            discovered_urls = crawler.discover_urls(args.discover, args.max_depth)
-            urls_to_crawl.extend(discovered_urls)
-            logging.info(f"Discovered {len(discovered_urls)} URLs")
-        except Exception as e:
-            logging.error(f"URL discovery failed: {str(e)}")
-            sys.exit(1)
+    parser.add_argument(
+        '--log-json',
+        action='store_true',
+        default=LOG_JSON,
+        help='Write logs as JSON lines'
+    )
 
-    elif args.urls:
-        logging.info(f"Loading URLs from file: {args.urls}")
-        urls_to_crawl = load_urls_from_file(args.urls)
+    parser.add_argument(
+        '--log-sample',
+        type=int,
+        default=LOG_URL_SAMPLE_EVERY,
+        metavar='N',
+        help=f'Keep 1 in N per-URL INFO messages (default: {LOG_URL_SAMPLE_EVERY}, 1 keeps all)'
+    )
 
-    elif args.seed_only:
-        logging.info("Using seed URLs from configuration")
-        urls_to_crawl = SEED_URLS
+    args = parser.parse_args()
 
-    else:
-        # Default: use seed URLs
-        logging.info("No URL source specified, using seed URLs")
-        urls_to_crawl = SEED_URLS
+    # Setup logging
+    setup_logging(args.log_level, json_lines=args.log_json, sample_every=args.log_sample)
 
-    if not urls_to_crawl:
-        logging.error("No URLs to crawl")
-        sys.exit(1)
+    if args.calibrate_relevance:
+        calibrate_relevance(args.calibrate_relevance)
+        return
 
-    # Remove duplicates while preserving order
-    urls_to_crawl = list(dict.fromkeys(urls_to_crawl))
+    if args.benchmark_parsers:
+        benchmark_parsers(args.benchmark_parsers)
+        return
 
-    logging.info(f"Starting crawl of {len(urls_to_crawl)} URLs")
+    if args.page_store_report:
+        report_page_store(args.page_store_report)
+        return
 
-    # Run the crawl
+    # Started before discovery and setup, so the deadline covers the whole run
+    budget = CrawlBudget(args.time_budget) if args.time_budget else None
+
+    if args.profile or args.profile_memory:
+        # Stopped (and reports written) at exit, including on sys.exit
+        profiler = Profiler(str(Path(args.output).with_suffix('')), mode=args.profile, memory=args.profile_memory)
+        profiler.start()
+        atexit.register(profiler.stop)
+
+    # Initialize crawler
     try:
-        results = crawler.run_batch_crawl(urls_to_crawl)
-
-        # Print summary
-        print(f"\nCrawl Summary:")
-        print(f"Total URLs: {results['total_urls']}")
-        print(f"Successful: {results['successful']}")
-        print(f"Failed: {results['failed']}")
-        print(f"Success Rate: {results['success_rate']:.1f}%")
-        print(f"Campsites Found: {results['campsites_found']}")
-        print(f"Total Time: {results['total_time']:.1f}s")
-
-        # Save results
-        save_results(results, args.output)
-
-        # Screenshots (if requested)
-        if args.screenshot:
-            logging.info("Taking screenshots of successful URLs...")
-            import asyncio
-
-            async def take_screenshots():
-                successful_urls = [r['url'] for r in results['results'] if r['success']]
-                for url in successful_urls[:5]:  # Limit to first 5 for demo
-                    screenshot_url = await crawler.take_screenshot(url)
-                    if screenshot_url:
-                        logging.info(f"Screenshot saved: {screenshot_url}")
-
-            asyncio.run(take_screenshots())
-
-        logging.info("Crawl completed successfully")
-
-    except KeyboardInterrupt:
-        logging.info("Crawl interrupted by user")
-        sys.exit(1)
+        extraction_cache = None
+        if args.extraction_cache and not args.no_extraction_cache:
+            extraction_cache = ExtractionCache(args.extraction_cache)
+        page_store = PageStore(args.page_store) if args.page_store else None
+        renderer = None if args.no_render else BrowserRenderer()
+        image_prober = None if args.no_probe_images else ImageProber()
+
+        if args.dry_run:
+            known_urls = load_urls_from_file(args.known_urls) if args.known_urls else []
+            crawler = WebCrawler(db_manager=LocalStore(known_urls), extraction_cache=extraction_cache,
+                                 renderer=renderer, refresh_existing=args.refresh, image_prober=image_prober,
+                                 page_store=page_store)
+            logging.info(f"Dry run: using a local store with {len(known_urls)} known URLs")
+        else:
+            db_manager = AsyncDatabaseManager() if DB_ASYNC else None
+            crawler = WebCrawler(db_manager=db_manager, extraction_cache=extraction_cache, renderer=renderer,
+                                 refresh_existing=args.refresh, image_prober=image_prober, page_store=page_store)
+        logging.info("Crawler initialized successfully")
     except Exception as e:
-        logging.error(f"Crawl failed: {str(e)}")
+        logging.error(f"Failed to initialize crawler: {str(e)}")
         sys.exit(1)
 
+    if args.stats:
+        stats = crawler.db_manager.get_crawl_statistics()
+        if not stats:
+            logging.error("Could not load crawl statistics")
+            sys.exit(1)
+        print_statistics(stats)
+        return
+
+    if args.cleanup_days is not None:
+        removed = crawler.db_manager.cleanup_old_data(
+            args.cleanup_days,
+            archive=not args.no_archive,
+            dry_run=args.cleanup_dry_run
+        )
+        print(f"Stale campsites {'found' if args.cleanup_dry_run else 'removed'}: {removed}")
+        return
+
+    # A URL file streamed to the pipeline stays open until the crawl is over
+    with ExitStack() as url_files:
+        # Determine URLs to crawl
+        stream = args.stream or args.urls == '-'
+        urls_to_crawl = []
+
+        if args.discover is not None:
+            seeds = args.discover or SEED_URLS
+            logging.info(f"Discovering URLs from {len(seeds)} seeds: {', '.join(seeds)}")
+            try:
+                discovered_urls = crawler.discover_urls(seeds, args.max_depth, args.max_pages, budget=budget)
+                urls_to_crawl.extend(discovered_urls)
+                logging.info(f"Discovered {len(discovered_urls)} URLs")
+            except Exception as e:
+                logging.error(f"URL discovery failed: {str(e)}")
+                sys.exit(1)
+
+        elif args.urls and stream:
+            # Read lazily; the pipeline drops duplicates as they arrive
+            logging.info(f"Streaming URLs from: {'stdin' if args.urls == '-' else args.urls}")
+            urls_to_crawl = iter_urls(url_files.enter_context(open_url_file(args.urls)))
+
+        elif args.urls:
+            logging.info(f"Loading URLs from file: {args.urls}")
+            urls_to_crawl = load_urls_from_file(args.urls)
+
+        elif args.seed_only:
+            logging.info("Using seed URLs from configuration")
+            urls_to_crawl = SEED_URLS
+
+        else:
+            # Default: use seed URLs
+            logging.info("No URL source specified, using seed URLs")
+            urls_to_crawl = SEED_URLS
+
+        due_urls = []
+        if args.retry_failed:
+            due_urls = crawler.db_manager.get_due_failed_urls()
+            logging.info(f"Retrying {len(due_urls)} previously failed URLs")
+            urls_to_crawl = itertools.chain(urls_to_crawl, due_urls) if stream else list(urls_to_crawl) + due_urls
+
+        writer = None
+        if not stream:
+            if not urls_to_crawl:
+                logging.error("No URLs to crawl")
+                sys.exit(1)
+
+            # Remove duplicates while preserving order
+            urls_to_crawl = list(dict.fromkeys(urls_to_crawl))
+            if budget:
+                urls_to_crawl = prioritize(urls_to_crawl, due_urls)
+
+            logging.info(f"Starting crawl of {len(urls_to_crawl)} URLs")
+
+        # Run the crawl
+        reporter = None
+        try:
+            reporter = StatusReporter(crawler.telemetry, args.status_interval, args.status_port)
+            reporter.start()
+            if stream:
+                writer = ResultWriter(args.output)
+                results = crawler.run_pipeline(urls_to_crawl, writer, budget)
+            else:
+                results = crawler.run_batch_crawl(urls_to_crawl, budget)
+
+            # Print summary
+            print(f"\nCrawl Summary:")
+            print(f"Total URLs: {results['total_urls']}")
+            print(f"Successful: {results['successful']}")
+            print(f"Failed: {results['failed']}")
+            print(f"Success Rate: {results['success_rate']:.1f}%")
+            print(f"Campsites Found: {results['campsites_found']}")
+            print(f"Total Time: {results['total_time']:.1f}s")
+            writes = results['writes']
+            if writes:
+                print(f"Campsite Writes: {writes.get('inserted', 0)} inserted, {writes.get('updated', 0)} updated "
+                      f"({writes.get('fields_updated', 0)} fields), {writes.get('unchanged', 0)} unchanged")
+            print(f"Connection Reuse: {results['connections']['reuse_ratio']:.0%}")
+            if results['extraction_cache']:
+                print(f"Extraction Cache Hits: {results['extraction_cache']['hits']}")
+            structured = results['structured_data']
+            if structured.get('pages'):
+                print(f"Structured Data: {structured.get('json_ld', 0)} JSON-LD, "
+                      f"{structured.get('full_hits', 0)} full fast-path hits of {structured['pages']} parsed pages")
+            encodings = results['encodings']
+            if encodings:
+                sources = ", ".join(f"{encodings[source]} {source}" for source in ENCODING_SOURCES if source in encodings)
+                print(f"Encodings Found By: {sources}")
+            if results['rendering']:
+                print(f"Rendered Pages: {results['rendering']['rendered']}")
+            images = results['images']
+            if images and images.get('probed'):
+                print(f"Thumbnails: {images.get('probed', 0)} images probed, {images.get('replaced_first', 0)} "
+                      f"first candidates replaced, {images.get('none_usable', 0)} pages without a usable image")
+            store = results['page_store']
+            if store and store.get('run'):
+                run = store['run']
+                print(f"Page Store: {run.get('stored', 0)} bodies stored ({run.get('unchanged', 0)} unchanged), "
+                      f"{run.get('dictionaries_trained', 0)} dictionaries trained, overall ratio {store['ratio'] or 0:.1f}")
+            if args.dry_run:
+                print(f"Throughput: {results['total_urls'] / max(results['total_time'], 1e-9):.2f} URLs/s")
+
+            if budget:
+                print(f"Time Budget: {results['budget']['elapsed']:.0f}s of {budget.seconds:.0f}s used, "
+                      f"{results['budget']['skipped']} URLs left for a later run")
+            if stream:
+                pipeline = results['pipeline']
+                print(f"Duplicates Dropped: {pipeline['duplicates']}, Peak Deferred: {pipeline['peak_deferred']}")
+
+            # Save results
+            if budget and budget.skipped:
+                budget.write_checkpoint(str(Path(args.output).with_suffix('.remaining.txt')))
+            if writer:
+                writer.close(results)
+                logging.info(f"Results saved to: {args.output}")
+            else:
+                save_results(results, args.output)
+
+            # Screenshots (if requested)
+            if args.screenshot and stream:
+                logging.warning("Screenshots are not taken for streaming crawls, results are not kept in memory")
+            elif args.screenshot:
+                logging.info("Taking screenshots of successful URLs...")
+                import asyncio
+
+                async def take_screenshots():
+                    successful_urls = [r['url'] for r in results['results'] if r['success']]
+                    for url in successful_urls[:5]:  # Limit to first 5 for demo
+                        if budget and budget.remaining() <= 0:
+                            logging.info("Time budget spent, skipping remaining screenshots")
+                            break
+                        screenshot_url = await crawler.take_screenshot(url)
+                        if screenshot_url:
+                            logging.info(f"Screenshot saved: {screenshot_url}")
+
+                asyncio.run(take_screenshots())
+
+            logging.info("Crawl completed successfully")
+
+        except KeyboardInterrupt:
+            logging.info("Crawl interrupted by user")
+            sys.exit(1)
+        except Exception as e:
+            logging.error(f"Crawl failed: {str(e)}")
+            sys.exit(1)
+        finally:
+            if reporter:
+                reporter.stop()
+            if writer:
+                writer.close()
+            crawler.close()
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -1,8 +1,13 @@
-from dataclasses import dataclass
+import hashlib
+import json
+from dataclasses import dataclass, field
 from typing import Optional, List
 from datetime import datetime
 
-@dataclass
+# Columns the crawler writes; recrawls compare and update only these
+PERSISTED_FIELDS = ("name", "description", "country", "category", "thumbnail_url")
+
+@dataclass(slots=True)
 class CampsiteData:
     """Data class for campsite information"""
     name: str
@@ -16,6 +21,8 @@ class CampsiteData:
     meta_title: Optional[str] = None
     meta_description: Optional[str] = None
     language: Optional[str] = None
+    # Absolute thumbnail URLs in page priority order; thumbnail_url is one of them
+    thumbnail_candidates: List[str] = field(default_factory=list)
 
     # Crawling metadata
     crawled_at: Optional[datetime] = None
@@ -36,7 +43,26 @@ class CampsiteData:
             "thumbnail_url": self.thumbnail_url,
         }
 
-@dataclass
+    def persisted_fields(self) -> dict:
+        return {field: getattr(self, field) for field in PERSISTED_FIELDS}
+
+    def fingerprint(self) -> str:
+        """Short hash of the persisted fields, stored with the row"""
+        return fields_fingerprint(self.persisted_fields())
+
+    def changed_fields(self, stored: dict) -> dict:
+        """Persisted fields whose value differs from a stored row"""
+        return {
+            field: value for field, value in self.persisted_fields().items()
+            if stored.get(field) != value
+        }
+
+def fields_fingerprint(fields: dict) -> str:
+    """Fingerprint of a row's persisted fields, independent of key order"""
+    values = [fields.get(field) for field in PERSISTED_FIELDS]
+    return hashlib.blake2b(json.dumps(values).encode('utf-8'), digest_size=16).hexdigest()
+
+@dataclass(slots=True)
 class CrawlResult:
     """Result of a single URL crawl"""
     url: str
@@ -54,4 +80,13 @@ class CrawlResult:
             "status_code": self.status_code,
             "processing_time": self.processing_time,
             "campsite_found": self.campsite_data is not None
-        }
\ No newline at end of file
+        }
+
+@dataclass(slots=True)
+class FetchedPage:
+    """A downloaded page waiting for extraction"""
+    url: str
+    body: bytes
+    status_code: int
+    encoding: Optional[str]  # Sniffed from the header, BOM or markup, see charset.py
+    started_at: float
@@ -0,0 +1,159 @@
+import logging
+import socket
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+from .config import POOL_CONNECTIONS, POOL_MAXSIZE, DNS_CACHE_TTL, DNS_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+class DNSCache:
+    """TTL cache in front of ``socket.getaddrinfo``
+
+    Every new connection to a host otherwise pays a fresh lookup. Lookup
+    failures are not cached, and lookups run outside the lock so one slow
+    resolver call does not hold up other threads.
+    """
+
+    def __init__(self, ttl: float = DNS_CACHE_TTL, max_size: int = DNS_CACHE_SIZE,
+                 resolver: Callable = socket.getaddrinfo, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.resolver = resolver
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        key = (host, port, family, type, proto, flags)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self.clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(entry[1])
+
+        result = self.resolver(host, port, family, type, proto, flags)
+
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (self.clock() + self.ttl, tuple(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+def cached_dns_connection(base: type, cache: DNSCache) -> type:
+    """A urllib3 connection class that resolves its host through ``cache``
+
+    Each resolved address is tried in turn, as urllib3 does, by handing it
+    to the base class in place of the host name; TLS still verifies and
+    sends SNI for the original host.
+    """
+
+    class CachedDNSConnection(base):
+        def _new_conn(self):
+            host = self._dns_host
+            try:
+                addresses = cache.getaddrinfo(host.strip("[]"), self.port, allowed_gai_family(), socket.SOCK_STREAM)
+            except socket.gaierror as e:
+                raise NameResolutionError(self.host, self, e) from e
+
+            error = None
+            for *_, address in addresses:
+                self._dns_host = address[0]
+                try:
+                    return super()._new_conn()
+                except (ConnectTimeoutError, NewConnectionError) as e:
+                    error = e
+                finally:
+                    self._dns_host = host
+            if error is None:
+                raise NewConnectionError(self, f"No addresses for {host}")
+            raise error
+
+    CachedDNSConnection.__name__ = f"CachedDNS{base.__name__}"
+    return CachedDNSConnection
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter with configured pool sizes and connection reuse metrics
+
+    urllib3 counts requests and newly opened connections per host pool; the
+    counts of pools evicted from the pool manager are kept, so the totals
+    cover the whole run. ``reused`` is the number of requests that went over
+    an already open keep-alive connection.
+
+    New connections resolve host names through the adapter's own DNSCache
+    (None when ``dns_cache_ttl`` is 0); ``socket.getaddrinfo`` itself is
+    left alone, so other clients in the process are unaffected.
+    """
+
+    def __init__(self, pool_connections: int = POOL_CONNECTIONS, pool_maxsize: int = POOL_MAXSIZE,
+                 dns_cache_ttl: float = DNS_CACHE_TTL, **kwargs):
+        self.dns_cache = DNSCache(ttl=dns_cache_ttl) if dns_cache_ttl > 0 else None
+        self._stats_lock = threading.Lock()
+        self._retired_requests = 0
+        self._retired_connections = 0
+        super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+
+        if self.dns_cache is not None:
+            self.poolmanager.pool_classes_by_scheme = {
+                "http": type("CachedDNSHTTPConnectionPool", (HTTPConnectionPool,), {
+                    "ConnectionCls": cached_dns_connection(HTTPConnection, self.dns_cache)}),
+                "https": type("CachedDNSHTTPSConnectionPool", (HTTPSConnectionPool,), {
+                    "ConnectionCls": cached_dns_connection(HTTPSConnection, self.dns_cache)}),
+            }
+
+        pools = self.poolmanager.pools
+        dispose = pools.dispose_func
+
+        def retire(pool):
+            self._retire(pool)
+            if dispose:
+                dispose(pool)
+
+        pools.dispose_func = retire
+
+    def _retire(self, pool):
+        with self._stats_lock:
+            self._retired_requests += pool.num_requests
+            self._retired_connections += pool.num_connections
+
+    def connection_stats(self) -> dict:
+        """Requests, new connections and reuse across all host pools"""
+        with self._stats_lock:
+            requests = self._retired_requests
+            connections = self._retired_connections
+
+        pools = self.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                requests += pool.num_requests
+                connections += pool.num_connections
+
+        reused = max(0, requests - connections)
+        return {
+            "requests": requests,
+            "new_connections": connections,
+            "reused": reused,
+            "reuse_ratio": round(reused / requests, 3) if requests else 0.0,
+            "pools": len(pools),
+        }
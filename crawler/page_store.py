@@ -0,0 +1,298 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+import zstandard
+from .config import (
+    PAGE_STORE_PATH, PAGE_STORE_LEVEL, PAGE_STORE_DICT_SIZE, PAGE_STORE_TRAIN_PAGES, PAGE_STORE_TRAIN_MAX_PAGES,
+    PAGE_STORE_RETRAIN_PAGES,
+)
+
+logger = logging.getLogger(__name__)
+
+# Bodies stored before their host has a dictionary
+NO_DICTIONARY = 0
+# Dictionaries kept in memory, with their digested compression tables
+CACHED_DICTIONARIES = 256
+
+
+def host_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+class PageStore:
+    """History of fetched page bodies, compressed with per-host zstd dictionaries
+
+    Pages from one provider share most of their markup, which per-page
+    compression cannot exploit. Once a host has ``train_pages`` stored
+    bodies, a dictionary is trained from them and later bodies of that host
+    are compressed against it; after ``retrain_pages`` more, a new version
+    is trained. Each body records the dictionary version it was compressed
+    with, and dictionaries are never deleted, so every stored body stays
+    readable. A body identical to the URL's latest one is not stored again.
+    """
+
+    def __init__(self, path: str = PAGE_STORE_PATH, level: int = PAGE_STORE_LEVEL,
+                 dict_size: int = PAGE_STORE_DICT_SIZE, train_pages: int = PAGE_STORE_TRAIN_PAGES,
+                 train_max_pages: int = PAGE_STORE_TRAIN_MAX_PAGES, retrain_pages: int = PAGE_STORE_RETRAIN_PAGES):
+        self.path = path
+        self.level = level
+        self.dict_size = dict_size
+        self.train_pages = train_pages
+        self.train_max_pages = train_max_pages
+        self.retrain_pages = retrain_pages
+        self.counts = Counter()
+        self.decoded_bytes = 0
+        self.decode_seconds = 0.0
+        # host -> [current dictionary version, bodies stored with it]
+        self._hosts: Dict[str, List[int]] = {}
+        self._dictionaries: "OrderedDict[Tuple[str, int], zstandard.ZstdCompressionDict]" = OrderedDict()
+        self._plain = zstandard.ZstdCompressor(level=level)
+        self._lock = threading.Lock()
+        # Hosts whose next dictionary is being trained
+        self._training = set()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL,
+                host TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                digest BLOB NOT NULL,
+                raw_size INTEGER NOT NULL,
+                dict_version INTEGER NOT NULL,
+                body BLOB NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS pages_url ON pages (url, id)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS pages_host ON pages (host, dict_version)")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS dictionaries (
+                host TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                data BLOB NOT NULL,
+                samples INTEGER NOT NULL,
+                trained_at REAL NOT NULL,
+                PRIMARY KEY (host, version)
+            )
+        """)
+        self._db.commit()
+
+    def _host_state(self, host: str) -> List[int]:
+        state = self._hosts.get(host)
+        if state is None:
+            version = self._db.execute(
+                "SELECT COALESCE(MAX(version), 0) FROM dictionaries WHERE host = ?", (host,)
+            ).fetchone()[0]
+            pages = self._db.execute(
+                "SELECT COUNT(*) FROM pages WHERE host = ? AND dict_version = ?", (host, version)
+            ).fetchone()[0]
+            state = self._hosts[host] = [version, pages]
+        return state
+
+    def _dictionary(self, host: str, version: int) -> zstandard.ZstdCompressionDict:
+        key = (host, version)
+        dictionary = self._dictionaries.get(key)
+        if dictionary is None:
+            row = self._db.execute(
+                "SELECT data FROM dictionaries WHERE host = ? AND version = ?", key
+            ).fetchone()
+            if row is None:
+                raise KeyError(f"Missing dictionary {version} for {host}")
+            dictionary = zstandard.ZstdCompressionDict(row[0])
+            dictionary.precompute_compress(level=self.level)
+            self._dictionaries[key] = dictionary
+            if len(self._dictionaries) > CACHED_DICTIONARIES:
+                self._dictionaries.popitem(last=False)
+        else:
+            self._dictionaries.move_to_end(key)
+        return dictionary
+
+    def _compress(self, host: str, version: int, body: bytes) -> bytes:
+        if version == NO_DICTIONARY:
+            return self._plain.compress(body)
+        return zstandard.ZstdCompressor(dict_data=self._dictionary(host, version)).compress(body)
+
+    def _decompress(self, host: str, version: int, blob: bytes) -> bytes:
+        started = time.perf_counter()
+        if version == NO_DICTIONARY:
+            body = zstandard.ZstdDecompressor().decompress(blob)
+        else:
+            body = zstandard.ZstdDecompressor(dict_data=self._dictionary(host, version)).decompress(blob)
+        self.decode_seconds += time.perf_counter() - started
+        self.decoded_bytes += len(body)
+        return body
+
+    def put(self, url: str, body: bytes, fetched_at: Optional[float] = None) -> bool:
+        """Store a fetched body; False if it is identical to the URL's latest one"""
+        host = host_of(url)
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        with self._lock:
+            latest = self._db.execute(
+                "SELECT digest FROM pages WHERE url = ? ORDER BY id DESC LIMIT 1", (url,)
+            ).fetchone()
+            if latest is not None and latest[0] == digest:
+                self.counts["unchanged"] += 1
+                return False
+
+            state = self._host_state(host)
+            version = state[0]
+            blob = self._compress(host, version, body)
+            self._db.execute(
+                "INSERT INTO pages (url, host, fetched_at, digest, raw_size, dict_version, body) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, host, fetched_at or time.time(), digest, len(body), version, blob)
+            )
+            state[1] += 1
+            self.counts["stored"] += 1
+            self.counts["raw_bytes"] += len(body)
+            self.counts["stored_bytes"] += len(blob)
+            self._db.commit()
+
+            due = state[1] >= (self.train_pages if version == NO_DICTIONARY else self.retrain_pages)
+            if not due or host in self._training:
+                return True
+            self._training.add(host)
+            samples = self._training_samples(host)
+
+        # Training takes a while; other pages are stored meanwhile
+        try:
+            self._train(host, version, samples)
+        finally:
+            with self._lock:
+                self._training.discard(host)
+        return True
+
+    def _training_samples(self, host: str) -> List[Tuple[bytes, Optional[zstandard.ZstdCompressionDict]]]:
+        """The host's latest compressed bodies, with their dictionaries (called under the lock)"""
+        rows = self._db.execute(
+            "SELECT dict_version, body FROM pages WHERE host = ? ORDER BY id DESC LIMIT ?",
+            (host, self.train_max_pages)
+        ).fetchall()
+        return [
+            (blob, None if version == NO_DICTIONARY else self._dictionary(host, version))
+            for version, blob in rows
+        ]
+
+    def _train(self, host: str, version: int, samples: List[Tuple[bytes, Optional[zstandard.ZstdCompressionDict]]]):
+        """Train the host's next dictionary version, after ``version``, from its latest bodies
+
+        Runs without the lock, which is only taken again to install the result.
+        """
+        bodies = [
+            (zstandard.ZstdDecompressor(dict_data=dictionary) if dictionary else zstandard.ZstdDecompressor()).decompress(blob)
+            for blob, dictionary in samples
+        ]
+        # zstd wants roughly a hundred times the dictionary size in samples
+        size = min(self.dict_size, max(sum(map(len, bodies)) // 100, 1024))
+        try:
+            dictionary = zstandard.train_dictionary(size, bodies, level=self.level)
+        except zstandard.ZstdError as e:
+            # Too few or too uniform samples; try again after as many more pages
+            logger.debug("Could not train a dictionary for %s: %s", host, e)
+            with self._lock:
+                self._host_state(host)[1] = 0
+            return
+
+        with self._lock:
+            state = self._host_state(host)
+            if state[0] != version:
+                return
+            self._db.execute(
+                "INSERT INTO dictionaries (host, version, data, samples, trained_at) VALUES (?, ?, ?, ?, ?)",
+                (host, version + 1, dictionary.as_bytes(), len(bodies), time.time())
+            )
+            self._db.commit()
+            state[0], state[1] = version + 1, 0
+            self.counts["dictionaries_trained"] += 1
+        logger.debug("Trained dictionary %d for %s from %d pages (%d bytes)", version + 1, host, len(bodies), size)
+
+    def get(self, url: str, index: int = -1) -> Optional[bytes]:
+        """A stored body of a URL: the latest by default, or by history index"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT host, dict_version, body FROM pages WHERE url = ? ORDER BY id", (url,)
+            ).fetchall()
+            if not rows:
+                return None
+            try:
+                host, version, blob = rows[index]
+            except IndexError:
+                return None
+            return self._decompress(host, version, blob)
+
+    def history(self, url: str) -> List[Tuple[float, int]]:
+        """``(fetched_at, raw size)`` of every stored body of a URL, oldest first"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT fetched_at, raw_size FROM pages WHERE url = ? ORDER BY id", (url,)
+            ).fetchall()
+
+    def stats(self) -> dict:
+        """Totals for the whole store, plus what this run stored"""
+        with self._lock:
+            pages, raw, stored = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_size), 0), COALESCE(SUM(LENGTH(body)), 0) FROM pages"
+            ).fetchone()
+            dictionaries, dictionary_bytes = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM dictionaries"
+            ).fetchone()
+        return {
+            "pages": pages,
+            "raw_bytes": raw,
+            "stored_bytes": stored,
+            "dictionaries": dictionaries,
+            "dictionary_bytes": dictionary_bytes,
+            "ratio": round(raw / (stored + dictionary_bytes), 2) if stored else None,
+            "run": dict(self.counts),
+            "decode_mb_per_second": round(self.decoded_bytes / self.decode_seconds / 1e6, 1)
+            if self.decode_seconds else None,
+        }
+
+    def report(self, sample: int = 500) -> dict:
+        """Compression ratio and decode throughput over the latest ``sample`` bodies
+
+        Compares the stored (dictionary) size with the same bodies compressed
+        page by page with plain zstd and gzip, and times decoding.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT host, dict_version, body FROM pages ORDER BY id DESC LIMIT ?", (sample,)
+            ).fetchall()
+            self.decoded_bytes = 0
+            self.decode_seconds = 0.0
+            bodies = [self._decompress(host, version, blob) for host, version, blob in rows]
+            decode_rate = self.decoded_bytes / self.decode_seconds / 1e6 if self.decode_seconds else None
+
+        raw = sum(map(len, bodies))
+        stored = sum(len(blob) for _, _, blob in rows)
+        plain = sum(len(self._plain.compress(body)) for body in bodies)
+        gzip = sum(len(zlib.compress(body, 6)) for body in bodies)
+        with_dictionary = sum(version != NO_DICTIONARY for _, version, _ in rows)
+        return {
+            "pages": len(rows),
+            "with_dictionary": with_dictionary,
+            "raw_bytes": raw,
+            "stored_bytes": stored,
+            "ratio": round(raw / stored, 2) if stored else None,
+            "zstd_ratio": round(raw / plain, 2) if plain else None,
+            "gzip_ratio": round(raw / gzip, 2) if gzip else None,
+            "decode_mb_per_second": round(decode_rate, 1) if decode_rate else None,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
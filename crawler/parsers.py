@@ -0,0 +1,184 @@
+import logging
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Union
+from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
+from .charset import decode_body, is_utf8
+from .config import HTML_PARSER
+
+logger = logging.getLogger(__name__)
+
+PARSER_BACKENDS = ("lxml", "soup")
+
+# Text in these elements is not page text (BeautifulSoup's get_text skips it too)
+TEXT_XPATH = etree.XPath(
+    ".//text()[not(ancestor::script or ancestor::style or ancestor::template)]", smart_strings=False
+)
+
+# Compound selectors supported by select_one: tag, .class and [attr*="value"]
+SELECTOR_PATTERN = re.compile(r'^([a-z][a-z0-9]*)?((?:\.[\w-]+)*)((?:\[[\w-]+\*="[^"]*"\])*)$', re.IGNORECASE)
+ATTR_CONTAINS_PATTERN = re.compile(r'\[([\w-]+)\*="([^"]*)"\]')
+
+
+def _xpath_literal(value: str) -> str:
+    if '"' not in value:
+        return f'"{value}"'
+    if "'" not in value:
+        return f"'{value}'"
+    parts = value.split('"')
+    return "concat(" + ", '\"', ".join(f'"{part}"' for part in parts) + ")"
+
+
+@lru_cache(maxsize=128)
+def css_to_xpath(selector: str) -> etree.XPath:
+    """XPath for the small CSS subset the extractor uses
+
+    Descendant combinators of compound selectors made of a tag name,
+    ``.class`` tokens and ``[attr*="value"]`` tests. Anything else raises
+    ValueError, so an unsupported selector fails loudly in tests. The
+    compiled XPath returns the first match only.
+    """
+    steps = []
+    for compound in selector.split():
+        match = SELECTOR_PATTERN.match(compound)
+        if not match:
+            raise ValueError(f"Unsupported selector: {selector!r}")
+        tag, classes, attributes = match.groups()
+        tests = [
+            f"contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')"
+            for cls in classes.split('.') if cls
+        ]
+        tests += [
+            f"contains(@{name}, {_xpath_literal(value)})"
+            for name, value in ATTR_CONTAINS_PATTERN.findall(attributes)
+        ]
+        steps.append((tag.lower() if tag else '*') + ''.join(f'[{test}]' for test in tests))
+    return etree.XPath(f"(.//{'//'.join(steps)})[1]")
+
+
+def _attribute_test(name: str, value) -> str:
+    if value is True:
+        return f"[@{name}]"
+    return f"[@{name}={_xpath_literal(value)}]"
+
+
+@lru_cache(maxsize=256)
+def _find_xpath(name: Optional[str], attrs: tuple, first: bool) -> etree.XPath:
+    path = './/' + (name or '*') + ''.join(_attribute_test(key, value) for key, value in attrs)
+    return etree.XPath(f"({path})[1]" if first else path)
+
+
+_local = threading.local()
+
+
+def _parser() -> lxml_html.HTMLParser:
+    """One parser per thread; lxml parsers must not be shared between threads"""
+    parser = getattr(_local, "parser", None)
+    if parser is None:
+        parser = _local.parser = lxml_html.HTMLParser(encoding='utf-8')
+    return parser
+
+
+class LxmlElement:
+    """An lxml element with the subset of the BeautifulSoup Tag API used by the extractor"""
+
+    __slots__ = ("element",)
+
+    def __init__(self, element):
+        self.element = element
+
+    @property
+    def name(self) -> str:
+        return self.element.tag
+
+    @property
+    def attrs(self) -> Dict[str, str]:
+        return dict(self.element.attrib)
+
+    @property
+    def string(self) -> Optional[str]:
+        return self.element.text if len(self.element) == 0 else None
+
+    def get(self, key: str, default=None):
+        return self.element.get(key, default)
+
+    def __getitem__(self, key: str) -> str:
+        return self.element.attrib[key]
+
+    def get_text(self, separator: str = '', strip: bool = False) -> str:
+        strings = TEXT_XPATH(self.element)
+        if strip:
+            strings = [text.strip() for text in strings]
+            strings = [text for text in strings if text]
+        return separator.join(strings)
+
+    @staticmethod
+    def _query(name: Optional[str], attrs: Optional[dict], kwargs: dict, first: bool) -> etree.XPath:
+        attributes = dict(attrs or {})
+        attributes.update(kwargs)
+        return _find_xpath(name, tuple(attributes.items()), first)
+
+    def find(self, name: Optional[str] = None, attrs: Optional[dict] = None, **kwargs) -> Optional["LxmlElement"]:
+        found = self._query(name, attrs, kwargs, True)(self.element)
+        return LxmlElement(found[0]) if found else None
+
+    def find_all(self, name: Optional[str] = None, attrs: Optional[dict] = None, **kwargs) -> List["LxmlElement"]:
+        return [LxmlElement(element) for element in self._query(name, attrs, kwargs, False)(self.element)]
+
+    def select_one(self, selector: str) -> Optional["LxmlElement"]:
+        found = css_to_xpath(selector)(self.element)
+        return LxmlElement(found[0]) if found else None
+
+
+class LxmlDocument(LxmlElement):
+    """A page parsed with lxml.html, used like a BeautifulSoup object
+
+    Both backends build the tree with libxml2's HTML parser, so the results
+    are the same; this one skips BeautifulSoup's Python object per node,
+    which is where most of its parse time and memory go. UTF-8 bytes are
+    parsed as they are; other encodings are decoded in Python first, since
+    libxml2 stops at the first byte its converter rejects.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, markup: Union[str, bytes], encoding: Optional[str] = None):
+        # Always UTF-8, so an XML declaration or <meta charset> cannot conflict with the input
+        if isinstance(markup, str):
+            markup = markup.encode('utf-8')
+        elif not is_utf8(encoding):
+            markup = decode_body(markup, encoding).encode('utf-8')
+        root = etree.fromstring(markup, _parser())
+        if root is None:
+            raise ValueError("Document is empty")
+        super().__init__(root)
+
+    @property
+    def head(self) -> Optional[LxmlElement]:
+        return self.find('head')
+
+    def find(self, name: Optional[str] = None, attrs: Optional[dict] = None, **kwargs) -> Optional[LxmlElement]:
+        if name == self.element.tag and not attrs and not kwargs:
+            return self
+        return super().find(name, attrs, **kwargs)
+
+
+Document = Union[BeautifulSoup, LxmlDocument]
+
+
+def parse_html(markup: Union[str, bytes], backend: str = HTML_PARSER, encoding: Optional[str] = None) -> Document:
+    """Parse a page with the given backend, falling back to BeautifulSoup
+
+    ``markup`` may be the raw body, with ``encoding`` as sniffed by
+    ``charset.sniff_encoding`` (UTF-8 if None).
+    """
+    if backend == "lxml":
+        try:
+            return LxmlDocument(markup, encoding)
+        except (ValueError, etree.LxmlError) as e:
+            logger.debug("lxml could not parse page, using BeautifulSoup: %s", e)
+    if isinstance(markup, bytes):
+        return BeautifulSoup(markup, 'lxml', from_encoding=encoding or 'utf-8')
+    return BeautifulSoup(markup, 'lxml')
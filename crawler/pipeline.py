@@ -0,0 +1,300 @@
+import hashlib
+import heapq
+import itertools
+import logging
+import queue
+import threading
+import time
+from collections import Counter, deque
+from typing import Iterable, Iterator, List, Optional
+from .config import (
+    CRAWL_CONCURRENCY, EXTRACT_WORKERS, PIPELINE_QUEUE_SIZE, PIPELINE_FILTER_CHUNK, PIPELINE_MAX_DEFERRED,
+    PIPELINE_DEDUPE_SIZE,
+)
+from .budget import CrawlBudget
+from .models import CrawlResult
+from .throttle import HostUnavailableError
+
+logger = logging.getLogger(__name__)
+
+# End of input marker passed down the stages
+DONE = object()
+
+# How often blocked stages recheck for shutdown and parked URLs
+POLL_INTERVAL = 0.1
+
+
+def url_digest(url: str) -> int:
+    """Compact 64-bit key used to remember URLs already read"""
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class CrawlPipeline:
+    """Streaming crawl: source → dedupe → fetch → extract → persist → sink
+
+    Each stage runs in its own thread(s) and hands work to the next through
+    a bounded queue, so memory is set by the queue sizes rather than by the
+    size of the input, and a slow stage (say, database writes) blocks the
+    ones upstream of it until it catches up instead of letting work pile up.
+
+    URLs whose host is suspended by the circuit breaker, or not yet due its
+    next request, are parked until the host is ready so that workers move
+    on to other hosts; once ``max_deferred`` URLs are parked, the fetch
+    workers stop taking new input. Duplicates are dropped using a 64-bit
+    digest of each of the last ``dedupe_size`` distinct URLs, and the retry
+    queue is consulted a chunk of URLs at a time. With a ``budget``, URLs
+    that would not finish in time (and everything once it stops admitting)
+    go to ``budget.skipped``. An error in any stage stops the pipeline and
+    is raised to the consumer.
+    """
+
+    def __init__(self, crawler, fetch_workers: int = CRAWL_CONCURRENCY,
+                 extract_workers: int = EXTRACT_WORKERS, queue_size: int = PIPELINE_QUEUE_SIZE,
+                 filter_chunk: int = PIPELINE_FILTER_CHUNK, max_deferred: int = PIPELINE_MAX_DEFERRED,
+                 dedupe_size: int = PIPELINE_DEDUPE_SIZE, budget: Optional[CrawlBudget] = None):
+        self.crawler = crawler
+        self.budget = budget
+        self.fetch_workers = max(1, fetch_workers)
+        self.extract_workers = max(1, extract_workers)
+        self.queue_size = queue_size
+        self.filter_chunk = max(1, filter_chunk)
+        self.max_deferred = max(1, max_deferred)
+        self.dedupe_size = max(1, dedupe_size)
+        self.counts = Counter()
+
+        self._url_queue = queue.Queue(queue_size)
+        self._page_queue = queue.Queue(queue_size)
+        self._persist_queue = queue.Queue(queue_size)
+        self._result_queue = queue.Queue(queue_size)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._deferred = []  # Heap of (ready_at, sequence, url)
+        self._sequence = itertools.count()
+        self._running = {}
+        self._error: Optional[BaseException] = None
+
+    def run(self, urls: Iterable[str]) -> Iterator[CrawlResult]:
+        """Crawl URLs from any iterable, yielding results as they complete
+
+        Results arrive in completion order, not input order. Closing the
+        generator early shuts the stages down.
+        """
+        stages = [("feed", self._feed, 1, (urls,)), ("fetch", self._fetch, self.fetch_workers, ()),
+                  ("extract", self._extract, self.extract_workers, ()), ("persist", self._persist, 1, ())]
+        threads = []
+        for name, target, count, args in stages:
+            self._running[name] = count
+            for i in range(count):
+                threads.append(threading.Thread(
+                    target=self._run_stage, args=(target, *args), name=f"crawler-{name}-{i}", daemon=True
+                ))
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                result = self._get(self._result_queue)
+                if result is DONE:
+                    break
+                yield result
+        finally:
+            self._stop.set()
+            for thread in threads:
+                # The feed thread may be blocked reading input (stdin) that never ends;
+                # it is a daemon, so it is not waited for
+                thread.join(POLL_INTERVAL if thread.name.startswith("crawler-feed") else None)
+        if self._error is not None:
+            raise self._error
+
+    def _run_stage(self, target, *args):
+        """Run a stage thread, stopping the pipeline if it fails"""
+        try:
+            target(*args)
+        except Exception as e:
+            logger.error(f"Error in {threading.current_thread().name}: {str(e)}")
+            with self._lock:
+                if self._error is None:
+                    self._error = e
+            self._stop.set()
+
+    def stats(self) -> dict:
+        return {
+            "read": self.counts["read"],
+            "duplicates": self.counts["duplicates"],
+            "filtered": self.counts["filtered"],
+            "deferred": self.counts["deferred"],
+            "peak_deferred": self.counts["peak_deferred"],
+            "queue_size": self.queue_size,
+        }
+
+    def _put(self, target: queue.Queue, item) -> bool:
+        """Blocking put that gives up once the pipeline is shutting down"""
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue):
+        """Blocking get that returns DONE once the pipeline is shutting down"""
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+        return DONE
+
+    def _finish(self, stage: str, downstream: queue.Queue, consumers: int):
+        """Signal end of input downstream once a stage's last thread is done"""
+        with self._lock:
+            self._running[stage] -= 1
+            last = self._running[stage] == 0
+        if last:
+            for _ in range(consumers):
+                self._put(downstream, DONE)
+
+    def _feed(self, urls: Iterable[str]):
+        """Source and dedupe stages: read input, drop repeats and dead URLs"""
+        seen = set()
+        recent = deque()  # The digests in ``seen``, oldest first
+        chunk: List[str] = []
+        try:
+            for url in urls:
+                if self._stop.is_set():
+                    return
+                url = url.strip()
+                if not url:
+                    continue
+                self.counts["read"] += 1
+                digest = url_digest(url)
+                if digest in seen:
+                    self.counts["duplicates"] += 1
+                    continue
+                if len(recent) >= self.dedupe_size:
+                    seen.discard(recent.popleft())
+                seen.add(digest)
+                recent.append(digest)
+
+                chunk.append(url)
+                if len(chunk) >= self.filter_chunk:
+                    self._feed_chunk(chunk)
+                    chunk = []
+            self._feed_chunk(chunk)
+        finally:
+            self._finish("feed", self._url_queue, self.fetch_workers)
+
+    def _feed_chunk(self, chunk: List[str]):
+        if not chunk:
+            return
+        # Leave out permanently dead URLs and failures still backing off
+        retryable = self.crawler.db_manager.filter_retryable_urls(chunk)
+        self.counts["filtered"] += len(chunk) - len(retryable)
+        for url in retryable:
+            if not self._put(self._url_queue, url):
+                return
+
+    def _next_deferred(self):
+        """Pop a parked URL whose host may be tried again, if any"""
+        with self._lock:
+            if self._deferred and self._deferred[0][0] <= time.monotonic():
+                return heapq.heappop(self._deferred)[2]
+            return None
+
+    def _defer(self, url: str):
+        wait = max(self.crawler.throttle.wait_time(url), POLL_INTERVAL)
+        with self._lock:
+            heapq.heappush(self._deferred, (time.monotonic() + wait, next(self._sequence), url))
+            self.counts["deferred"] += 1
+            self.counts["peak_deferred"] = max(self.counts["peak_deferred"], len(self._deferred))
+
+    def _skip_deferred(self):
+        """Hand every parked URL to the budget's checkpoint"""
+        with self._lock:
+            parked, self._deferred = self._deferred, []
+        for _, _, url in parked:
+            self.budget.skip(url)
+
+    def _deferred_count(self) -> int:
+        with self._lock:
+            return len(self._deferred)
+
+    def _fetch(self):
+        """Fetch stage: download pages, parking URLs of suspended hosts"""
+        throttle = self.crawler.throttle
+        input_done = False
+        try:
+            while not self._stop.is_set():
+                if self.budget is not None and not self.budget.admitting():
+                    self._skip_deferred()
+                url = self._next_deferred()
+                if url is None:
+                    if input_done or self._deferred_count() >= self.max_deferred:
+                        # Backpressure: wait for parked URLs instead of reading more
+                        if input_done and not self._deferred_count():
+                            return
+                        time.sleep(POLL_INTERVAL)
+                        continue
+                    try:
+                        url = self._url_queue.get(timeout=POLL_INTERVAL)
+                    except queue.Empty:
+                        continue
+                    if url is DONE:
+                        input_done = True
+                        continue
+
+                if self.budget is not None and not self.budget.admits(url, throttle.wait_time(url)):
+                    self.budget.skip(url)
+                    continue
+
+                if throttle.is_suspended(url):
+                    if throttle.is_abandoned(url):
+                        error = HostUnavailableError(f"Host unavailable: {throttle.host_for(url)}")
+                        self.crawler._record_failure(url, error)
+                        self._put(self._page_queue, CrawlResult(
+                            url=url,
+                            success=False,
+                            error=str(error),
+                            processing_time=0.0
+                        ))
+                    else:
+                        self._defer(url)
+                    continue
+                if throttle.wait_time(url) > 0:
+                    # Host is still pacing; fetch other hosts in the meantime
+                    self._defer(url)
+                    continue
+
+                self._put(self._page_queue, self.crawler.fetch_page(url))
+        finally:
+            self._finish("fetch", self._page_queue, self.extract_workers)
+
+    def _extract(self):
+        """Extract stage: parse pages; finished results pass straight through"""
+        try:
+            while True:
+                item = self._get(self._page_queue)
+                if item is DONE:
+                    return
+                if not isinstance(item, CrawlResult):
+                    item = self.crawler.extract_page(item)
+                if not self._put(self._persist_queue, item):
+                    return
+        finally:
+            self._finish("extract", self._persist_queue, 1)
+
+    def _persist(self):
+        """Persist stage: save campsites, then hand results to the sink"""
+        try:
+            while True:
+                result = self._get(self._persist_queue)
+                if result is DONE:
+                    return
+                self.crawler.persist_result(result)
+                if self.budget is not None:
+                    self.budget.record(result.url, result.processing_time or 0.0)
+                if not self._put(self._result_queue, result):
+                    return
+        finally:
+            self._finish("persist", self._result_queue, 1)
@@ -0,0 +1,175 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Optional
+from .config import PROFILE_SAMPLE_INTERVAL, PROFILE_TOP_N, PROFILE_TRACEMALLOC_FRAMES
+
+logger = logging.getLogger(__name__)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{code.co_name}".replace(';', ':').replace(' ', '_')
+
+
+class StackSampler:
+    """Low-overhead sampling profiler for all threads
+
+    A daemon thread snapshots every thread's stack each ``interval``
+    seconds and counts identical stacks, which is written in the collapsed
+    format read by flamegraph.pl and speedscope (``a;b;c count``).
+    """
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="crawler-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                labels.append(names.get(thread_id, str(thread_id)).replace(' ', '_'))
+                self.stacks[';'.join(reversed(labels))] += 1
+            self.samples += 1
+
+    def write_collapsed(self, path: str):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Profiler:
+    """Profile a crawl and write reports next to the results file
+
+    ``mode`` is ``"cprofile"`` (deterministic, writes ``.pstats`` and a
+    text summary, plus collapsed stacks from the sampler) or ``"sample"``
+    (collapsed stacks only, for low overhead on production-sized runs).
+    cProfile only sees the thread that enables it, so each thread started
+    while profiling gets its own profiler, and their stats are merged.
+    With ``memory``, tracemalloc records allocations and the top
+    ``top_n`` allocation sites are written to ``.alloc.txt``.
+    """
+
+    def __init__(self, output_prefix: str, mode: Optional[str] = "cprofile", memory: bool = False,
+                 interval: float = PROFILE_SAMPLE_INTERVAL, top_n: int = PROFILE_TOP_N):
+        self.output_prefix = output_prefix
+        self.mode = mode
+        self.memory = memory
+        self.top_n = top_n
+        self.sampler = StackSampler(interval) if mode else None
+        self.profile = cProfile.Profile() if mode == "cprofile" else None
+        self.thread_profiles = []
+        self._lock = threading.Lock()
+        self.started_at = None
+        self._stopped = False
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        if self.memory:
+            tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+        if self.sampler:
+            self.sampler.start()
+        if self.profile:
+            threading.setprofile(self._profile_thread)
+            self.profile.enable()
+        logger.info(f"Profiling enabled (mode: {self.mode or 'off'}, memory: {self.memory})")
+
+    def stop(self):
+        """Stop profiling and write the reports; safe to call twice"""
+        if self._stopped or self.started_at is None:
+            return
+        self._stopped = True
+
+        if self.profile:
+            threading.setprofile(None)
+            self.profile.disable()
+        if self.sampler:
+            self.sampler.stop()
+
+        elapsed = time.perf_counter() - self.started_at
+        written = []
+        directory = os.path.dirname(self.output_prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Snapshot allocations before writing the other reports allocates
+        if self.memory:
+            self._write_allocations(f"{self.output_prefix}.alloc.txt")
+            tracemalloc.stop()
+            written.append(f"{self.output_prefix}.alloc.txt")
+
+        if self.profile:
+            summary = io.StringIO()
+            stats = pstats.Stats(self.profile, stream=summary)
+            with self._lock:
+                thread_profiles = list(self.thread_profiles)
+            for profile in thread_profiles:
+                stats.add(profile)
+            stats.dump_stats(f"{self.output_prefix}.pstats")
+            stats.sort_stats('cumulative').print_stats(self.top_n)
+            with open(f"{self.output_prefix}.profile.txt", 'w') as f:
+                f.write(summary.getvalue())
+            written += [f"{self.output_prefix}.pstats", f"{self.output_prefix}.profile.txt"]
+
+        if self.sampler:
+            self.sampler.write_collapsed(f"{self.output_prefix}.collapsed.txt")
+            written.append(f"{self.output_prefix}.collapsed.txt")
+
+        logger.info(f"Profile of {elapsed:.1f}s written to: {', '.join(written)}")
+
+    def _profile_thread(self, frame, event, arg):
+        """First profile event of a new thread: give the thread its own profiler"""
+        profile = cProfile.Profile()
+        with self._lock:
+            if self._stopped:
+                return
+            self.thread_profiles.append(profile)
+        # Replaces this hook for the rest of the thread
+        profile.enable()
+
+    def _write_allocations(self, path: str):
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+
+        with open(path, 'w') as f:
+            f.write(f"Current: {current / 1024 / 1024:.1f} MiB, peak: {peak / 1024 / 1024:.1f} MiB\n")
+            f.write(f"\nTop {self.top_n} allocation sites (live at the end of the run):\n")
+            for stat in snapshot.statistics('lineno')[:self.top_n]:
+                frame = stat.traceback[0]
+                f.write(f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  {frame.filename}:{frame.lineno}\n")
+
+            f.write(f"\nTop {min(self.top_n, 10)} allocation tracebacks:\n")
+            for stat in snapshot.statistics('traceback')[:min(self.top_n, 10)]:
+                f.write(f"\n{stat.size / 1024:.1f} KiB in {stat.count} blocks\n")
+                for line in stat.traceback.format():
+                    f.write(f"{line}\n")
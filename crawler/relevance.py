@@ -0,0 +1,151 @@
+import hashlib
+import itertools
+import re
+import zlib
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .config import (
+    CONTENT_KEYWORDS, RELEVANCE_TERMS, RELEVANCE_THRESHOLD, RELEVANCE_HASH_BITS,
+    RELEVANCE_BATCH_SIZE,
+)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+@lru_cache(maxsize=1 << 16)
+def _hash_token(token: str) -> int:
+    """Stable 32-bit hash of a token (Python's hash() is salted per process)"""
+    return zlib.crc32(token.encode('utf-8'))
+
+
+def _hash_bigrams(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Combine token hashes into bigram hashes without building strings"""
+    mixed = (first.astype(np.uint64) * np.uint64(0x9E3779B1) + second.astype(np.uint64)) & np.uint64(0xFFFFFFFF)
+    mixed ^= mixed >> np.uint64(15)
+    mixed = (mixed * np.uint64(0x2C1B3C6D)) & np.uint64(0xFFFFFFFF)
+    mixed ^= mixed >> np.uint64(12)
+    return mixed.astype(np.uint32)
+
+
+def _hash_term(term: str) -> int:
+    """Hash of a unigram or bigram profile term, matching ``vectorize``"""
+    tokens = TOKEN_PATTERN.findall(term.lower())
+    hashes = np.array([_hash_token(token) for token in tokens], dtype=np.uint32)
+    if len(hashes) == 1:
+        return int(hashes[0])
+    if len(hashes) == 2:
+        return int(_hash_bigrams(hashes[:1], hashes[1:])[0])
+    raise ValueError(f"Relevance terms must be one or two words: {term!r}")
+
+
+class RelevanceScorer:
+    """Score pages against a weighted term profile
+
+    Pages become signed, hashed term-frequency vectors (unigrams and
+    bigrams, sublinear ``log1p`` counts), scored with a sparse product
+    against the profile built from ``CONTENT_KEYWORDS`` and
+    ``RELEVANCE_TERMS``. Pages scoring at least ``threshold`` are relevant.
+    The crawl scores each page on its own as it is extracted; only
+    ``calibrate`` scores many pages per call, ``RELEVANCE_BATCH_SIZE`` at
+    a time.
+    """
+
+    def __init__(self, terms: Optional[Dict[str, float]] = None,
+                 threshold: float = RELEVANCE_THRESHOLD, hash_bits: int = RELEVANCE_HASH_BITS):
+        if terms is None:
+            terms = {keyword.lower(): 1.0 for keyword in CONTENT_KEYWORDS}
+            terms.update(RELEVANCE_TERMS)
+
+        self.threshold = threshold
+        self.n_features = 1 << hash_bits
+        self.profile = np.zeros(self.n_features, dtype=np.float32)
+        for term, weight in terms.items():
+            index, sign = self._feature(term)
+            self.profile[index] += sign * weight
+        # Identifies the profile and threshold, e.g. for cache keys
+        self.fingerprint = hashlib.blake2b(
+            self.profile.tobytes() + repr(threshold).encode('ascii'), digest_size=8
+        ).hexdigest()
+
+    def _feature(self, term: str):
+        """Bucket and sign of a term (the sign bit cancels collision noise)"""
+        hashed = _hash_term(term)
+        return hashed & (self.n_features - 1), 1.0 if hashed & 0x80000000 else -1.0
+
+    def vectorize(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Hashed term frequencies of a batch as sparse ``(rows, columns, values)``
+
+        Only distinct tokens of the batch are hashed in Python; bigram hashes
+        and the per-page counts are computed with array operations, and only
+        the features a page actually has are kept, so scoring one page does
+        not allocate ``n_features``-sized arrays.
+        """
+        documents = [TOKEN_PATTERN.findall(text.lower()) for text in texts]
+        lengths = np.fromiter((len(tokens) for tokens in documents), dtype=np.int64, count=len(documents))
+        rows = np.repeat(np.arange(len(documents), dtype=np.int64), lengths)
+
+        vocabulary = {}
+        token_ids = np.array(
+            [vocabulary.setdefault(token, len(vocabulary)) for token in itertools.chain.from_iterable(documents)],
+            dtype=np.int64
+        )
+        vocabulary_hashes = np.fromiter(map(_hash_token, vocabulary), dtype=np.uint32, count=len(vocabulary))
+        unigrams = vocabulary_hashes[token_ids]
+
+        # Bigrams never span two pages
+        same_page = rows[1:] == rows[:-1]
+        bigrams = _hash_bigrams(unigrams[:-1][same_page], unigrams[1:][same_page])
+
+        hashes = np.concatenate([unigrams, bigrams])
+        term_rows = np.concatenate([rows, rows[:-1][same_page]])
+        columns = (hashes & np.uint32(self.n_features - 1)).astype(np.int64)
+        signs = np.where(hashes & np.uint32(0x80000000), 1.0, -1.0)
+
+        # Signed counts per (page, feature), over the features present only
+        keys, inverse = np.unique(term_rows * self.n_features + columns, return_inverse=True)
+        counts = np.bincount(inverse, weights=signs, minlength=len(keys))
+        values = np.sign(counts) * np.log1p(np.abs(counts))
+        return keys // self.n_features, keys % self.n_features, values
+
+    def score_texts(self, texts: Sequence[str]) -> np.ndarray:
+        """Relevance scores for a batch of page texts"""
+        scores = []
+        for i in range(0, len(texts), RELEVANCE_BATCH_SIZE):
+            batch = texts[i:i + RELEVANCE_BATCH_SIZE]
+            rows, columns, values = self.vectorize(batch)
+            scores.append(np.bincount(rows, weights=values * self.profile[columns], minlength=len(batch)))
+        return np.concatenate(scores).astype(np.float32) if scores else np.zeros(0, dtype=np.float32)
+
+    def is_relevant(self, texts: Sequence[str]) -> List[bool]:
+        """Relevance decisions for a batch of page texts"""
+        return (self.score_texts(texts) >= self.threshold).tolist()
+
+    def calibrate(self, relevant_texts: Sequence[str], irrelevant_texts: Sequence[str]) -> dict:
+        """Pick the threshold with the best F1 on labelled pages"""
+        scores = self.score_texts(list(relevant_texts) + list(irrelevant_texts))
+        labels = np.concatenate([np.ones(len(relevant_texts)), np.zeros(len(irrelevant_texts))])
+        if not len(scores) or not len(relevant_texts):
+            return {"threshold": self.threshold, "precision": 0.0, "recall": 0.0, "f1": 0.0, "pages": len(scores)}
+
+        # Every distinct score is a candidate threshold: sorting once gives
+        # the true positives and predictions for all of them as prefix sums
+        order = np.argsort(-scores, kind='stable')
+        sorted_scores = scores[order]
+        true_positives = np.cumsum(labels[order])
+        predicted = np.arange(1, len(scores) + 1)
+        run_ends = np.r_[sorted_scores[1:] != sorted_scores[:-1], True]
+        candidates = sorted_scores[run_ends]
+        true_positives = true_positives[run_ends]
+        precision = true_positives / predicted[run_ends]
+        recall = true_positives / len(relevant_texts)
+        f1 = 2 * precision * recall / np.maximum(precision + recall, 1e-12)
+
+        best = int(np.argmax(f1))
+        return {
+            "threshold": float(candidates[best]),
+            "precision": float(precision[best]),
+            "recall": float(recall[best]),
+            "f1": float(f1[best]),
+            "pages": len(scores),
+        }
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import re
+import threading
+from typing import Optional
+from .aio import BackgroundLoop
+from .config import (
+    USER_AGENT, SPA_MIN_TEXT_CHARS, SPA_TINY_TEXT_CHARS, RENDER_POOL_SIZE, RENDER_TIMEOUT,
+    RENDER_BLOCKED_RESOURCES,
+)
+from .extractors import INVISIBLE_PATTERN, TAG_PATTERN
+
+logger = logging.getLogger(__name__)
+
+BODY_PATTERN = re.compile(r'<body\b[^>]*>(.*)', re.IGNORECASE | re.DOTALL)
+
+# Mount points of client-side frameworks and "JavaScript required" notices
+SPA_MARKER_PATTERN = re.compile(
+    r'<div[^>]+id=["\'](?:root|app|__next|__nuxt|___gatsby|svelte)["\'][^>]*>\s*</div>'
+    r'|<app-root\b|\bng-app\b|\bdata-reactroot\b|\bdata-server-rendered\b'
+    r'|<noscript[^>]*>[^<]*(?:enable|requires?|need)[^<]*javascript',
+    re.IGNORECASE
+)
+SCRIPT_PATTERN = re.compile(r'<script\b', re.IGNORECASE)
+
+
+def visible_text_length(html: str) -> int:
+    """Approximate length of a page's visible body text, without parsing"""
+    match = BODY_PATTERN.search(html)
+    body = match.group(1) if match else html
+    text = TAG_PATTERN.sub(' ', INVISIBLE_PATTERN.sub(' ', body))
+    return len(' '.join(text.split()))
+
+
+def has_spa_markers(html: str) -> bool:
+    """Check for framework mount points or a "JavaScript required" notice"""
+    return SPA_MARKER_PATTERN.search(html) is not None
+
+
+def is_spa_shell(html: str) -> bool:
+    """Check whether a page needs a browser to render its content
+
+    A page is a shell if it has little visible text and either a framework
+    mount point / ``<noscript>`` notice, or almost no text at all alongside
+    scripts. Pages with real server-rendered text never are.
+    """
+    text_length = visible_text_length(html)
+    if text_length >= SPA_MIN_TEXT_CHARS:
+        return False
+    if has_spa_markers(html):
+        return True
+    return text_length < SPA_TINY_TEXT_CHARS and SCRIPT_PATTERN.search(html) is not None
+
+
+class BrowserRenderer:
+    """Pooled headless Chromium for pages rendered client-side
+
+    The browser starts on first use and is shared by a pool of
+    ``RENDER_POOL_SIZE`` pages, so concurrent renders reuse warm tabs.
+    Images, fonts and media are blocked. If the browser cannot start,
+    rendering is disabled for the rest of the run and callers fall back
+    to the raw HTML.
+    """
+
+    def __init__(self, pool_size: int = RENDER_POOL_SIZE, timeout: float = RENDER_TIMEOUT):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.rendered = 0
+        self.failed = 0
+        self.disabled = False
+        self._aio: Optional[BackgroundLoop] = None
+        self._start_lock = threading.Lock()
+        self._playwright = None
+        self._browser = None
+        self._pages: Optional[asyncio.Queue] = None
+
+    def _ensure_started(self) -> bool:
+        with self._start_lock:
+            if self.disabled:
+                return False
+            if self._aio is None:
+                self._aio = BackgroundLoop("crawler-renderer")
+                try:
+                    self._aio.run(self._start(), timeout=self.timeout * 2)
+                except Exception as e:
+                    logger.warning(f"Headless rendering disabled, browser failed to start: {str(e)}")
+                    self.disabled = True
+                    try:
+                        self._aio.run(self._stop(), timeout=self.timeout)
+                    except Exception:
+                        pass
+                    self._aio.stop()
+                    self._aio = None
+                    return False
+            return True
+
+    async def _start(self):
+        from playwright.async_api import async_playwright
+
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=True)
+        context = await self._browser.new_context(user_agent=USER_AGENT)
+        await context.route("**/*", self._route)
+
+        self._pages = asyncio.Queue()
+        for _ in range(self.pool_size):
+            self._pages.put_nowait(await context.new_page())
+        logger.info(f"Headless browser started with {self.pool_size} pages")
+
+    @staticmethod
+    async def _route(route):
+        if route.request.resource_type in RENDER_BLOCKED_RESOURCES:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _render(self, url: str) -> str:
+        page = await self._pages.get()
+        try:
+            await page.goto(url, wait_until='domcontentloaded', timeout=self.timeout * 1000)
+            try:
+                await page.wait_for_load_state('networkidle', timeout=self.timeout * 500)
+            except Exception:
+                pass  # Long-polling pages never go idle; take what has rendered
+            return await page.content()
+        finally:
+            self._pages.put_nowait(page)
+
+    def render(self, url: str) -> Optional[str]:
+        """Rendered DOM of a URL, or None if rendering is unavailable or fails"""
+        if not self._ensure_started():
+            return None
+
+        try:
+            html = self._aio.run(self._render(url), timeout=self.timeout * 2)
+            self.rendered += 1
+            return html
+        except Exception as e:
+            self.failed += 1
+            logger.warning(f"Rendering failed for {url}: {str(e)}")
+            return None
+
+    def stats(self) -> dict:
+        return {"rendered": self.rendered, "failed": self.failed, "disabled": self.disabled}
+
+    async def _stop(self):
+        if self._browser:
+            await self._browser.close()
+        if self._playwright:
+            await self._playwright.stop()
+
+    def close(self):
+        """Shut the browser and its event loop down"""
+        with self._start_lock:
+            if self._aio is None:
+                return
+            try:
+                self._aio.run(self._stop(), timeout=self.timeout)
+            except Exception as e:
+                logger.debug("Error closing headless browser: %s", e)
+            self._aio.stop()
+            self._aio = None
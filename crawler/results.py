@@ -0,0 +1,135 @@
+import json
+import math
+from array import array
+from typing import Dict, Iterator, List, Optional
+from .models import CrawlResult
+
+SUCCESS_FLAG = 1
+CAMPSITE_FLAG = 2
+
+
+def summarize(total: int, successful: int, campsites_found: int) -> dict:
+    """Summary counters for the crawl report"""
+    return {
+        "total_urls": total,
+        "successful": successful,
+        "failed": total - successful,
+        "success_rate": successful / total * 100 if total else 0.0,
+        "campsites_found": campsites_found,
+    }
+
+
+class ResultBuffer:
+    """Columnar accumulator for crawl results
+
+    Keeps one compact column per field instead of a ``CrawlResult`` (and its
+    ``CampsiteData``) per URL: status codes and timings live in typed arrays,
+    success/campsite flags in a bytearray and error messages are interned.
+    Summary counters are maintained on append, so producing the summary is
+    O(1) and the per-URL dicts are only built while iterating for output.
+    """
+
+    def __init__(self):
+        self.urls: List[str] = []
+        self.status_codes = array('h')  # -1 when there was no response
+        self.processing_times = array('d')  # NaN when not measured
+        self.flags = bytearray()
+        self.error_ids = array('i')  # Index into self.errors, -1 for none
+        self.errors: List[str] = []
+        self._error_index: Dict[str, int] = {}
+
+        self.successful = 0
+        self.campsites_found = 0
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    def _intern_error(self, error: Optional[str]) -> int:
+        if error is None:
+            return -1
+
+        error_id = self._error_index.get(error)
+        if error_id is None:
+            error_id = self._error_index[error] = len(self.errors)
+            self.errors.append(error)
+        return error_id
+
+    def append(self, result: CrawlResult):
+        """Add a result; the result object itself is not retained"""
+        flags = 0
+        if result.success:
+            flags |= SUCCESS_FLAG
+            self.successful += 1
+        if result.campsite_data is not None:
+            flags |= CAMPSITE_FLAG
+            if result.success:
+                self.campsites_found += 1
+
+        self.urls.append(result.url)
+        self.status_codes.append(-1 if result.status_code is None else result.status_code)
+        self.processing_times.append(math.nan if result.processing_time is None else result.processing_time)
+        self.flags.append(flags)
+        self.error_ids.append(self._intern_error(result.error))
+
+    def __iter__(self) -> Iterator[dict]:
+        """Yield results in the ``CrawlResult.to_dict`` format"""
+        for i, url in enumerate(self.urls):
+            status_code = self.status_codes[i]
+            processing_time = self.processing_times[i]
+            error_id = self.error_ids[i]
+            yield {
+                "url": url,
+                "success": bool(self.flags[i] & SUCCESS_FLAG),
+                "error": self.errors[error_id] if error_id >= 0 else None,
+                "status_code": None if status_code < 0 else status_code,
+                "processing_time": None if math.isnan(processing_time) else processing_time,
+                "campsite_found": bool(self.flags[i] & CAMPSITE_FLAG),
+            }
+
+    @property
+    def failed(self) -> int:
+        return len(self.urls) - self.successful
+
+    def summary(self) -> dict:
+        """Summary counters for the batch crawl report"""
+        return summarize(len(self.urls), self.successful, self.campsites_found)
+
+
+class ResultWriter:
+    """Write crawl results to the JSON report as they arrive
+
+    The streaming counterpart of ``ResultBuffer`` for pipelined crawls:
+    nothing per URL is kept in memory. The ``results`` array is written
+    first and the summary keys are appended by ``close``, so the file has
+    the same keys as a batch crawl report.
+    """
+
+    def __init__(self, output_file: str):
+        self.output_file = output_file
+        self.total = 0
+        self.successful = 0
+        self.campsites_found = 0
+        self._file = open(output_file, 'w')
+        self._file.write('{\n  "results": [')
+
+    def append(self, result: CrawlResult):
+        self._file.write(',\n    ' if self.total else '\n    ')
+        self._file.write(json.dumps(result.to_dict(), default=str))
+        self.total += 1
+        if result.success:
+            self.successful += 1
+            if result.campsite_data is not None:
+                self.campsites_found += 1
+
+    def summary(self) -> dict:
+        return summarize(self.total, self.successful, self.campsites_found)
+
+    def close(self, summary: Optional[dict] = None):
+        """Finish the report with the summary keys"""
+        if self._file.closed:
+            return
+        self._file.write('\n  ]')
+        for key, value in (summary or self.summary()).items():
+            self._file.write(f',\n  {json.dumps(key)}: {json.dumps(value, default=str)}')
+        self._file.write('\n}\n')
+        self._file.close()
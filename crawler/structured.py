@@ -0,0 +1,144 @@
+import json
+import logging
+from typing import Any, Dict, Iterator, List, Optional
+from .parsers import Document
+
+logger = logging.getLogger(__name__)
+
+# schema.org types that describe a program or its provider
+PROGRAM_TYPES = {
+    "Course", "CourseInstance", "EducationEvent", "Event", "EducationalOccupationalProgram",
+    "EducationalOrganization", "CollegeOrUniversity", "School", "LodgingBusiness", "Campground",
+}
+
+# Provider types, ranked after the programs they run
+ORGANIZATION_TYPES = {"EducationalOrganization", "CollegeOrUniversity", "School", "Organization"}
+
+# ISO 3166 codes of the countries the extractor knows about
+COUNTRY_CODES = {
+    "GB": "United Kingdom", "UK": "United Kingdom", "US": "United States", "CA": "Canada",
+    "AU": "Australia", "NZ": "New Zealand", "FR": "France", "DE": "Germany", "ES": "Spain",
+    "IT": "Italy", "JP": "Japan", "CN": "China", "KR": "South Korea", "IE": "Ireland",
+    "NL": "Netherlands", "CH": "Switzerland", "AT": "Austria", "BE": "Belgium",
+    "CZ": "Czech Republic", "DK": "Denmark", "FI": "Finland", "NO": "Norway", "SE": "Sweden",
+    "PL": "Poland", "PT": "Portugal",
+}
+
+
+def _iter_entities(data: Any) -> Iterator[dict]:
+    """Flatten JSON-LD lists and ``@graph`` containers into entities"""
+    if isinstance(data, list):
+        for item in data:
+            yield from _iter_entities(item)
+    elif isinstance(data, dict):
+        if "@graph" in data:
+            yield from _iter_entities(data["@graph"])
+        if "@type" in data:
+            yield data
+
+
+def _types(entity: dict) -> List[str]:
+    types = entity.get("@type")
+    types = types if isinstance(types, list) else [types]
+    return [t.rsplit("/", 1)[-1] for t in types if isinstance(t, str)]
+
+
+def _text(value: Any) -> Optional[str]:
+    """A plain string from a JSON-LD value (string, list or ``{"name": ...}``)"""
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        value = value.get("name") or value.get("@value")
+    return value.strip() if isinstance(value, str) and value.strip() else None
+
+
+def _image(value: Any) -> Optional[str]:
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        value = value.get("url") or value.get("contentUrl")
+    return value if isinstance(value, str) and value else None
+
+
+def _country(entity: dict) -> Optional[str]:
+    """addressCountry from the entity, its location or its provider"""
+    for holder in (entity, entity.get("location"), entity.get("provider"), entity.get("organizer")):
+        if isinstance(holder, list):
+            holder = holder[0] if holder else None
+        if not isinstance(holder, dict):
+            continue
+        address = holder.get("address")
+        if isinstance(address, list):
+            address = address[0] if address else None
+        if isinstance(address, dict):
+            country = _text(address.get("addressCountry"))
+            if country:
+                return COUNTRY_CODES.get(country.upper(), country)
+    return None
+
+
+def parse_json_ld(soup: Document) -> List[dict]:
+    """schema.org program/provider entities, from ``<head>`` scripts first"""
+    scripts = []
+    if soup.head is not None:
+        scripts = soup.head.find_all('script', attrs={'type': 'application/ld+json'})
+    if not scripts:
+        scripts = soup.find_all('script', attrs={'type': 'application/ld+json'})
+
+    entities = []
+    for script in scripts:
+        try:
+            data = json.loads(script.string or "")
+        except (TypeError, ValueError):
+            logger.debug("Skipping malformed JSON-LD block")
+            continue
+        entities.extend(e for e in _iter_entities(data) if PROGRAM_TYPES.intersection(_types(e)))
+
+    # Programs before the organisations that run them
+    entities.sort(key=lambda e: bool(ORGANIZATION_TYPES.intersection(_types(e))))
+    return entities
+
+
+def parse_open_graph(soup: Document) -> Dict[str, str]:
+    """OpenGraph ``og:*`` properties from the ``<head>``"""
+    root = soup.head if soup.head is not None else soup
+    return {
+        meta['property'][3:]: meta['content']
+        for meta in root.find_all('meta', attrs={'property': True, 'content': True})
+        if meta['property'].startswith('og:') and meta['content']
+    }
+
+
+def structured_fields(soup: Document) -> Dict[str, Any]:
+    """Campsite fields found in JSON-LD and OpenGraph data
+
+    Only fields actually present are returned. ``_sources`` records which
+    kinds of structured data the page had.
+    """
+    fields: Dict[str, Any] = {}
+    entities = parse_json_ld(soup)
+    open_graph = parse_open_graph(soup)
+
+    # The first entity with a value wins, programs before organisations
+    for entity in entities:
+        mode = _text(entity.get("eventAttendanceMode")) or _text(entity.get("courseMode"))
+        candidates = {
+            "name": _text(entity.get("name")),
+            "description": _text(entity.get("description")),
+            "thumbnail_src": _image(entity.get("image")),
+            "country": _country(entity),
+            "language": _text(entity.get("inLanguage")),
+            "online": True if mode and "online" in mode.lower() else None,
+        }
+        for key, value in candidates.items():
+            if value is not None:
+                fields.setdefault(key, value)
+
+    # OpenGraph only for what JSON-LD did not provide
+    for key, og_name in (("name", "title"), ("description", "description"), ("thumbnail_src", "image")):
+        value = open_graph.get(og_name, "").strip()
+        if key not in fields and value:
+            fields[key] = value
+
+    fields["_sources"] = [name for name, found in (("json_ld", entities), ("open_graph", open_graph)) if found]
+    return fields
@@ -0,0 +1,245 @@
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+from .config import STATUS_INTERVAL, STATUS_RATE_WINDOW, STATUS_TOP_HOSTS
+from .models import CrawlResult
+
+logger = logging.getLogger(__name__)
+
+
+def format_duration(seconds: float) -> str:
+    """``"1h02m"``, ``"7m40s"`` or ``"12s"``"""
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class HostCounters:
+    __slots__ = ("urls", "successful", "bytes", "first_seen")
+
+    def __init__(self, now: float):
+        self.urls = 0
+        self.successful = 0
+        self.bytes = 0
+        self.first_seen = now
+
+
+class CrawlTelemetry:
+    """Running totals of a crawl, updated in O(1) per URL
+
+    Counts, bytes and per-host counters are incremented as results arrive;
+    the recent rate comes from a ring of one-second buckets covering the
+    last ``window`` seconds, so reading it costs O(window) regardless of
+    how many URLs were crawled. Safe to update from several threads.
+    """
+
+    def __init__(self, window: int = STATUS_RATE_WINDOW, clock: Callable[[], float] = time.monotonic):
+        self.window = window
+        self.clock = clock
+        self.started_at = clock()
+        self.total: Optional[int] = None
+        self.crawled = 0
+        self.successful = 0
+        self.failed = 0
+        self.campsites = 0
+        self.bytes = 0
+        self.hosts: Dict[str, HostCounters] = {}
+        self._bucket_counts = [0] * window
+        self._bucket_seconds = [-1] * window
+        self._lock = threading.Lock()
+
+    def expect(self, urls: int):
+        """Add URLs to the expected total, for progress and ETA"""
+        with self._lock:
+            self.total = (self.total or 0) + urls
+
+    def _host(self, url: str) -> HostCounters:
+        host = urlparse(url).netloc.lower()
+        counters = self.hosts.get(host)
+        if counters is None:
+            counters = self.hosts[host] = HostCounters(self.clock())
+        return counters
+
+    def record_bytes(self, url: str, size: int):
+        """Count a downloaded body"""
+        with self._lock:
+            self.bytes += size
+            self._host(url).bytes += size
+
+    def record(self, result: CrawlResult):
+        """Count a finished URL"""
+        second = int(self.clock())
+        with self._lock:
+            self.crawled += 1
+            host = self._host(result.url)
+            host.urls += 1
+            if result.success:
+                self.successful += 1
+                host.successful += 1
+            else:
+                self.failed += 1
+            if result.campsite_data is not None:
+                self.campsites += 1
+
+            slot = second % self.window
+            if self._bucket_seconds[slot] != second:
+                self._bucket_seconds[slot] = second
+                self._bucket_counts[slot] = 0
+            self._bucket_counts[slot] += 1
+
+    def elapsed(self) -> float:
+        return self.clock() - self.started_at
+
+    def rate(self) -> float:
+        """URLs per second over the last ``window`` seconds (or since the start)"""
+        now = self.clock()
+        second = int(now)
+        with self._lock:
+            recent = sum(count for count, stamp in zip(self._bucket_counts, self._bucket_seconds)
+                         if second - stamp < self.window)
+        return recent / max(min(self.window, now - self.started_at), 1e-9)
+
+    def eta(self) -> Optional[float]:
+        """Seconds until the expected total is crawled at the current rate"""
+        if self.total is None:
+            return None
+        rate = self.rate()
+        remaining = max(self.total - self.crawled, 0)
+        if not remaining:
+            return 0.0
+        return remaining / rate if rate > 0 else None
+
+    def top_hosts(self, count: int = STATUS_TOP_HOSTS) -> List[dict]:
+        """The busiest hosts with their crawl rate since first seen"""
+        now = self.clock()
+        with self._lock:
+            busiest = sorted(self.hosts.items(), key=lambda item: item[1].urls, reverse=True)[:count]
+            return [{
+                "host": host,
+                "urls": counters.urls,
+                "successful": counters.successful,
+                "bytes": counters.bytes,
+                "rate": round(counters.urls / max(now - counters.first_seen, 1.0), 2),
+            } for host, counters in busiest]
+
+    def snapshot(self, hosts: int = 10) -> dict:
+        eta = self.eta()
+        return {
+            "elapsed": round(self.elapsed(), 1),
+            "total": self.total,
+            "crawled": self.crawled,
+            "successful": self.successful,
+            "failed": self.failed,
+            "campsites": self.campsites,
+            "bytes": self.bytes,
+            "rate": round(self.rate(), 2),
+            "eta": None if eta is None else round(eta, 1),
+            "hosts": len(self.hosts),
+            "top_hosts": self.top_hosts(hosts),
+        }
+
+    def status_line(self) -> str:
+        """One compact line of progress, rates and ETA"""
+        progress = f"{self.crawled}"
+        if self.total:
+            progress += f"/{self.total} ({100 * self.crawled / self.total:.1f}%)"
+        eta = self.eta()
+        parts = [
+            f"{progress} URLs",
+            f"{self.successful} ok, {self.failed} failed",
+            f"{self.campsites} campsites",
+            format_bytes(self.bytes),
+            f"{self.rate():.1f} URLs/s",
+        ]
+        if eta is not None:
+            parts.append(f"ETA {format_duration(eta)}")
+        hosts = ", ".join(f"{host['host']} {host['rate']:.1f}/s" for host in self.top_hosts())
+        if hosts:
+            parts.append(f"top: {hosts}")
+        return " | ".join(parts)
+
+
+class StatusReporter:
+    """Logs the status line periodically and optionally serves it over HTTP
+
+    With a ``port``, a local server answers ``/status`` with the JSON
+    snapshot and any other path with the status line. Port 0 picks a free
+    port, see ``address``.
+    """
+
+    def __init__(self, telemetry: CrawlTelemetry, interval: float = STATUS_INTERVAL,
+                 port: Optional[int] = None, host: str = "127.0.0.1"):
+        self.telemetry = telemetry
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+        if port is not None:
+            self._server = ThreadingHTTPServer((host, port), self._handler())
+            self._server.daemon_threads = True
+
+    @property
+    def address(self) -> Optional[str]:
+        if self._server is None:
+            return None
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        telemetry = self.telemetry
+
+        class StatusHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] == '/status':
+                    body = json.dumps(telemetry.snapshot()).encode('utf-8')
+                    content_type = "application/json"
+                else:
+                    body = (telemetry.status_line() + "\n").encode('utf-8')
+                    content_type = "text/plain; charset=utf-8"
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return StatusHandler
+
+    def _report(self):
+        while not self._stop.wait(self.interval):
+            logger.info(f"Status: {self.telemetry.status_line()}")
+
+    def start(self):
+        if self.interval > 0:
+            self._thread = threading.Thread(target=self._report, name="crawler-status", daemon=True)
+            self._thread.start()
+        if self._server is not None:
+            threading.Thread(target=self._server.serve_forever, name="crawler-status-http", daemon=True).start()
+            logger.info(f"Status endpoint: {self.address}/status")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
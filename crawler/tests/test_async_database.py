@@ -0,0 +1,153 @@
+import json
+import threading
+import httpx
+import pytest
+import crawler.database
+from crawler.async_database import AsyncDatabaseManager, in_filter
+from crawler.models import CampsiteData
+
+
+class FakePostgrest:
+    """PostgREST endpoints the crawler uses, over an in-memory table"""
+
+    def __init__(self):
+        self.rows = {}
+        self.requests = []
+        self.fail = False
+        self._lock = threading.Lock()
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        with self._lock:
+            self.requests.append((request.method, request.url.path, dict(request.url.params)))
+        if self.fail:
+            return httpx.Response(500, json={"message": "unavailable"})
+
+        path = request.url.path
+        if request.method == "GET" and path == "/rest/v1/campsites":
+            url = request.url.params["url"].removeprefix("eq.")
+            return httpx.Response(200, json=[self.rows[url]] if url in self.rows else [])
+        if request.method == "POST" and path == "/rest/v1/campsites":
+            row = json.loads(request.content)
+            self.rows[row["url"]] = row
+            return httpx.Response(201)
+        if request.method == "GET" and path == "/rest/v1/crawl_failures":
+            urls = json.loads("[" + request.url.params["url"][4:-1] + "]")
+            return httpx.Response(200, json=[
+                {"url": url, "permanent": True, "next_attempt_at": None} for url in urls if "dead" in url
+            ])
+        return httpx.Response(200, json=None)
+
+    def paths(self, method):
+        return [path for m, path, _ in self.requests if m == method]
+
+
+@pytest.fixture
+def postgrest():
+    return FakePostgrest()
+
+
+@pytest.fixture
+def db(monkeypatch, postgrest):
+    # The synchronous client is only used for maintenance operations
+    monkeypatch.setattr(crawler.database, "SUPABASE_URL", "https://db.example.com")
+    monkeypatch.setattr(crawler.database, "SUPABASE_SERVICE_KEY", "key")
+    monkeypatch.setattr(crawler.database, "create_client", lambda url, key: None)
+    manager = AsyncDatabaseManager("https://db.example.com", "key", transport=httpx.MockTransport(postgrest))
+    yield manager
+    manager.close()
+
+
+def campsite(url="https://a.example.com/camp", name="Camp"):
+    return CampsiteData(name=name, url=url, description="Summer camp", country="Spain")
+
+
+class TestInFilter:
+    def test_values_are_quoted(self):
+        """Test that commas and quotes in URLs cannot break the filter"""
+        assert in_filter(['https://a.example.com/?a=1,2', 'say "hi"']) == \
+            'in.("https://a.example.com/?a=1,2","say \\"hi\\"")'
+
+
+class TestAsyncDatabaseManager:
+    def test_new_campsite_is_inserted_in_the_background(self, db, postgrest):
+        """Test that saving returns at once and the insert completes on drain"""
+        assert db.save_campsite(campsite()) is True
+        db.drain()
+
+        assert postgrest.rows["https://a.example.com/camp"]["content_fingerprint"] == campsite().fingerprint()
+        assert db.write_stats()["inserted"] == 1
+        assert db.url_exists("https://a.example.com/camp") is True
+        assert db.url_exists("https://a.example.com/other") is False
+
+    def test_recrawl_writes_only_changes(self, db, postgrest):
+        """Test unchanged rows are marked as seen and changed ones batched into one call"""
+        db.save_campsite(campsite())
+        db.drain()
+        db.save_campsite(campsite())
+        db.save_campsite(campsite(name="Renamed Camp"))
+        db.drain()
+        db.flush_seen_urls()
+        db.flush_updates()
+        db.drain()
+
+        assert db.write_stats()["unchanged"] == 1
+        assert db.write_stats()["updated"] == 1
+        assert postgrest.paths("POST").count("/rest/v1/rpc/apply_campsite_changes") == 1
+        assert postgrest.paths("PATCH") == ["/rest/v1/campsites"]
+
+    def test_flush_writes_changes_buffered_by_saves_in_flight(self, db, postgrest):
+        """Test that flushing right after saves, as the crawler does, loses no buffered change"""
+        db.save_campsite(campsite())
+        db.save_campsite(campsite(url="https://a.example.com/other"))
+        db.drain()
+        db.save_campsite(campsite())
+        db.save_campsite(campsite(url="https://a.example.com/other", name="Renamed Camp"))
+        db.flush()
+
+        assert db.pending_updates == [] and db.seen_urls == []
+        assert postgrest.paths("POST").count("/rest/v1/rpc/apply_campsite_changes") == 1
+        assert postgrest.paths("PATCH") == ["/rest/v1/campsites"]
+
+    def test_close_writes_buffered_changes(self, db, postgrest):
+        """Test that closing without a flush still writes what in-flight saves buffer"""
+        db.save_campsite(campsite())
+        db.drain()
+        db.save_campsite(campsite())
+        db.close()
+
+        assert postgrest.paths("PATCH") == ["/rest/v1/campsites"]
+
+    def test_failure_lookups_run_per_chunk(self, db, postgrest):
+        """Test that retry-queue states are fetched for every chunk and merged"""
+        urls = [f"https://a.example.com/{i}" for i in range(4)] + ["https://dead.example.com/"]
+
+        states = db.get_failure_states(urls, chunk_size=2)
+
+        assert list(states) == ["https://dead.example.com/"]
+        assert len(postgrest.paths("GET")) == 3
+        assert db.filter_retryable_urls(urls) == urls[:4]
+
+    def test_failed_writes_are_counted_not_raised(self, db, postgrest):
+        """Test that a database error during a queued write does not reach the crawl thread"""
+        postgrest.fail = True
+
+        db.mark_url_as_failed("https://a.example.com/", "timeout", "timeout")
+        db.drain()
+
+        assert db.write_stats()["failed_writes"] == 1
+
+    def test_write_counts_from_several_threads_add_up(self, db, postgrest):
+        """Test that outcomes counted on the loop thread and crawl threads are not lost"""
+        def save(worker: int):
+            for number in range(50):
+                db.save_campsite(campsite(url=f"https://a.example.com/{worker}/{number}"))
+                db._count("unchanged")
+
+        workers = [threading.Thread(target=save, args=(worker,)) for worker in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        db.drain()
+
+        assert db.write_stats() == {"inserted": 200, "unchanged": 200}
@@ -0,0 +1,93 @@
+import pytest
+from crawler.budget import CrawlBudget, parse_duration, prioritize
+from crawler.config import BUDGET_DEFAULT_URL_SECONDS
+from crawler.crawler import WebCrawler
+from crawler.local_store import LocalStore
+from crawler.tests.test_throttle import FakeClock
+
+
+class TestParseDuration:
+    def test_units(self):
+        """Test plain seconds and s/m/h suffixes"""
+        assert parse_duration("3000") == 3000
+        assert parse_duration("90s") == 90
+        assert parse_duration("50m") == 3000
+        assert parse_duration("1.5h") == 5400
+
+    def test_invalid(self):
+        """Test that malformed durations are rejected"""
+        with pytest.raises(ValueError):
+            parse_duration("ten minutes")
+
+
+class TestPrioritize:
+    def test_due_and_program_urls_first(self):
+        """Test that due retries and program-like URLs are crawled first"""
+        urls = ["https://a.example.com/about", "https://a.example.com/summer-camp",
+                "https://a.example.com/contact", "https://a.example.com/blog"]
+
+        ordered = prioritize(urls, due=["https://a.example.com/contact"])
+
+        assert ordered == ["https://a.example.com/summer-camp", "https://a.example.com/contact",
+                           "https://a.example.com/about", "https://a.example.com/blog"]
+
+
+class TestCrawlBudget:
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    def test_admission_stops_before_the_drain_margin(self, clock):
+        """Test that work is admitted only while it can finish before draining"""
+        budget = CrawlBudget(600, drain_seconds=100, clock=clock)
+
+        assert budget.admits("https://a.example.com/")
+        clock.advance(500 - BUDGET_DEFAULT_URL_SECONDS + 1)
+        assert budget.admitting()
+        assert not budget.admits("https://a.example.com/")
+        clock.advance(BUDGET_DEFAULT_URL_SECONDS)
+        assert not budget.admitting()
+
+    def test_estimates_are_per_host(self, clock):
+        """Test that a slow host stops being admitted before a fast one"""
+        budget = CrawlBudget(600, drain_seconds=100, clock=clock)
+        budget.record("https://slow.example.com/a", 60.0)
+        budget.record("https://fast.example.com/a", 1.0)
+        clock.advance(450)
+
+        assert budget.admits("https://fast.example.com/b")
+        assert not budget.admits("https://slow.example.com/b")
+        assert not budget.admits("https://fast.example.com/b", wait=60.0)
+
+    def test_unmeasured_hosts_use_the_average(self, clock):
+        """Test that new hosts are estimated from the hosts seen so far"""
+        budget = CrawlBudget(600, clock=clock)
+        budget.record("https://a.example.com/", 2.0)
+
+        assert budget.estimate("https://new.example.com/") == 2.0
+
+    def test_checkpoint(self, clock, tmp_path):
+        """Test that skipped URLs are written one per line"""
+        budget = CrawlBudget(600, clock=clock)
+        budget.skip("https://a.example.com/")
+        budget.skip("https://b.example.com/")
+        path = tmp_path / "results.remaining.txt"
+
+        assert budget.write_checkpoint(str(path)) == 2
+        assert path.read_text().splitlines() == ["https://a.example.com/", "https://b.example.com/"]
+
+    def test_exhausted_budget_skips_remaining_urls(self, clock):
+        """Test that a batch crawl stops admitting URLs once the budget is spent"""
+        urls = ["https://known.example.com/a", "https://known.example.com/b"]
+        crawler = WebCrawler(db_manager=LocalStore(known_urls=urls))
+        budget = CrawlBudget(600, drain_seconds=100, clock=clock)
+
+        first = next(crawler.iter_crawl(urls, budget))
+        clock.advance(600)
+
+        summary = crawler.run_batch_crawl(urls, budget)
+
+        assert first.error == "URL already exists"
+        assert summary["total_urls"] == 0
+        assert budget.skipped == urls
+        assert summary["budget"]["skipped"] == 2
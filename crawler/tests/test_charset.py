@@ -0,0 +1,88 @@
+import codecs
+import pytest
+from crawler.charset import charset_from_content_type, normalize_encoding, sniff_encoding
+from crawler.parsers import PARSER_BACKENDS, parse_html
+
+PAGE = "<html><head>{meta}<title>Café Camp</title></head><body><p>Sommercamp für Schüler</p></body></html>"
+
+
+class TestSniffEncoding:
+    def test_header_charset(self):
+        """Test that the Content-Type charset is used first"""
+        body = PAGE.format(meta='<meta charset="utf-8">').encode('cp1252')
+
+        assert sniff_encoding(body, 'text/html; charset="Windows-1252"') == ('cp1252', 'header')
+
+    def test_missing_header_charset_is_not_latin1(self):
+        """Test that text/html without a charset does not default to ISO-8859-1"""
+        assert charset_from_content_type('text/html') is None
+        assert sniff_encoding(PAGE.format(meta='').encode('utf-8'), 'text/html') == ('utf-8', 'utf8')
+
+    def test_bom_beats_header(self):
+        """Test that a byte order mark overrides the header, as in browsers"""
+        body = codecs.BOM_UTF8 + PAGE.format(meta='').encode('utf-8')
+
+        assert sniff_encoding(body, 'text/html; charset=iso-8859-1') == ('utf-8', 'bom')
+
+    @pytest.mark.parametrize("meta", [
+        '<meta charset="ISO-8859-15">',
+        "<meta http-equiv='Content-Type' content='text/html; charset=iso-8859-15'>",
+    ])
+    def test_meta_charset(self, meta):
+        """Test both forms of <meta> charset declaration"""
+        body = PAGE.format(meta=meta).encode('iso-8859-15')
+
+        assert sniff_encoding(body, 'text/html') == ('iso8859-15', 'meta')
+
+    def test_unknown_labels_fall_through(self):
+        """Test that an unknown charset label is ignored rather than trusted"""
+        body = PAGE.format(meta='<meta charset="no-such-charset">').encode('utf-8')
+
+        assert sniff_encoding(body, 'text/html; charset=bogus') == ('utf-8', 'utf8')
+
+    def test_detection_only_without_declaration(self):
+        """Test that undeclared, non-UTF-8 bodies go to statistical detection"""
+        text = "Sommercamp für Schüler in Österreich, Übernachtung und Verpflegung inklusive. " * 20
+        encoding, source = sniff_encoding(f"<html><body><p>{text}</p></body></html>".encode('cp1252'))
+
+        assert source in ("detected", "default")
+        assert normalize_encoding(encoding) is not None
+
+    def test_partial_body_skips_detection(self):
+        """Test that detect=False assumes UTF-8 for a prefix cut mid-character"""
+        assert sniff_encoding("<p>für".encode('utf-8')[:-2], detect=False) == ('utf-8', 'default')
+
+    @pytest.mark.parametrize("cut", [1, 2, 3])
+    def test_truncated_utf8_is_utf8(self, cut):
+        """Test that a body cut off mid-character is still recognised as UTF-8"""
+        body = (PAGE.format(meta='') + "Zelt 🏕").encode('utf-8')[:-cut]
+
+        assert sniff_encoding(body) == ('utf-8', 'utf8')
+
+    def test_invalid_byte_before_end_is_not_utf8(self):
+        """Test that only an incomplete final character is forgiven"""
+        body = PAGE.format(meta='').encode('utf-8') + b"\xe9 fin"
+
+        assert sniff_encoding(body)[1] != 'utf8'
+
+    def test_latin1_labels_are_windows_1252(self):
+        """Test that latin-1 and ASCII labels decode as windows-1252, like browsers do"""
+        assert normalize_encoding('ISO-8859-1') == normalize_encoding('us-ascii') == 'cp1252'
+
+
+class TestParseBytes:
+    @pytest.mark.parametrize("backend", PARSER_BACKENDS)
+    @pytest.mark.parametrize("encoding", ['utf-8', 'cp1252', 'iso8859-15'])
+    def test_bytes_parse_like_text(self, backend, encoding):
+        """Test that a raw body and its sniffed encoding give the same tree as decoded text"""
+        html = PAGE.format(meta='')
+        document = parse_html(html.encode(encoding), backend, encoding)
+
+        assert document.find('title').get_text() == "Café Camp"
+        assert document.find('p').get_text() == parse_html(html, backend).find('p').get_text()
+
+    def test_invalid_bytes_do_not_truncate(self):
+        """Test that an undefined byte is replaced without losing the rest of the page"""
+        body = b"<html><body><p>caf\xe9 \x81</p><p>after</p></body></html>"
+
+        assert [p.get_text() for p in parse_html(body, "lxml", 'cp1252').find_all('p')][1] == "after"
@@ -0,0 +1,137 @@
+import pytest
+from crawler.extraction_cache import ExtractionCache
+from crawler.extractors import ContentExtractor
+
+PAGE = b"""
+<html><head><title>Summer Camp Abroad</title></head>
+<body><p>Our summer camp offers study abroad programs for international students.</p>
+<img src="/images/camp.jpg"></body></html>
+"""
+
+
+class FakeResponse:
+    encoding = "utf-8"
+
+
+class TestExtractionCache:
+    @pytest.fixture
+    def path(self, tmp_path):
+        return str(tmp_path / "cache" / "extractions.sqlite3")
+
+    @pytest.fixture
+    def cache(self, path):
+        cache = ExtractionCache(path)
+        yield cache
+        cache.close()
+
+    def test_hit_and_miss(self, cache):
+        """Test that stored fields are returned for the same body"""
+        key = cache.key(PAGE, "utf-8")
+
+        assert cache.get(key) == (False, None)
+        cache.put(key, {"name": "Camp"})
+
+        assert cache.get(key) == (True, {"name": "Camp"})
+        assert cache.stats()["hits"] == 1
+
+    def test_irrelevant_pages_are_cached(self, cache):
+        """Test that a negative result is a hit, not a miss"""
+        key = cache.key(b"<html>shop</html>")
+        cache.put(key, None)
+
+        assert cache.get(key) == (True, None)
+
+    def test_key_depends_on_encoding(self, cache):
+        """Test that the same bytes decoded differently are different entries"""
+        assert cache.key(PAGE, "utf-8") != cache.key(PAGE, "iso-8859-1")
+
+    def test_key_depends_on_extractor_config(self, cache):
+        """Test that other relevance settings or parser backends do not share entries"""
+        from crawler.relevance import RelevanceScorer
+
+        default = ContentExtractor()
+        stricter = ContentExtractor()
+        stricter.relevance_scorer = RelevanceScorer(threshold=100.0)
+        stricter.fingerprint = ContentExtractor().fingerprint.replace(
+            default.relevance_scorer.fingerprint, stricter.relevance_scorer.fingerprint
+        )
+
+        assert cache.key(PAGE, "utf-8", default.fingerprint) == cache.key(PAGE, "utf-8", ContentExtractor().fingerprint)
+        assert cache.key(PAGE, "utf-8", default.fingerprint) != cache.key(PAGE, "utf-8", stricter.fingerprint)
+        assert ContentExtractor("lxml").fingerprint != ContentExtractor("soup").fingerprint
+
+    def test_hits_do_not_write_until_batched(self, cache, path, monkeypatch):
+        """Test that access times of hits are buffered and written on close"""
+        import sqlite3
+
+        def accessed_at():
+            return sqlite3.connect(path).execute("SELECT accessed_at FROM extractions").fetchone()[0]
+
+        key = cache.key(PAGE)
+        monkeypatch.setattr("crawler.extraction_cache.time.time", lambda: 100.0)
+        cache.put(key, {"name": "Camp"})
+        monkeypatch.setattr("crawler.extraction_cache.time.time", lambda: 200.0)
+        cache.get(key)
+
+        assert accessed_at() == 100.0
+        cache.close()
+        assert accessed_at() == 200.0
+
+    def test_version_change_invalidates(self, path):
+        """Test that entries from another extractor version are dropped"""
+        cache = ExtractionCache(path, version=1)
+        cache.put(cache.key(PAGE), {"name": "Camp"})
+        cache.close()
+
+        cache = ExtractionCache(path, version=2)
+
+        assert len(cache) == 0
+        cache.close()
+
+    def test_least_recently_used_evicted(self, path):
+        """Test size-based eviction of the least recently used entries"""
+        cache = ExtractionCache(path, max_bytes=600)
+        keys = [cache.key(bytes([i])) for i in range(5)]
+        for key in keys[:4]:
+            cache.put(key, {"description": "x" * 50})
+        cache.get(keys[0])
+
+        cache.put(keys[4], {"description": "x" * 50})
+
+        assert cache.size <= 600
+        assert cache.get(keys[0])[0] is True
+        assert cache.get(keys[1])[0] is False
+        cache.close()
+
+
+class TestCachedExtraction:
+    def test_same_body_parsed_once_for_two_urls(self, tmp_path, monkeypatch):
+        """Test that a duplicate body skips parsing but keeps URL-dependent fields"""
+        from crawler.crawler import WebCrawler
+        from crawler.local_store import LocalStore
+
+        crawler = WebCrawler(db_manager=LocalStore(), extraction_cache=ExtractionCache(str(tmp_path / "c.db")))
+        calls = []
+        extract_fields = ContentExtractor.extract_fields
+        monkeypatch.setattr(crawler.extractor, "extract_fields",
+                            lambda html, encoding=None: calls.append(1) or extract_fields(crawler.extractor, html, encoding))
+
+        first = crawler._extract(PAGE, FakeResponse(), "https://a.example.com/camp")
+        second = crawler._extract(PAGE, FakeResponse(), "https://b.example.org/camp")
+
+        assert len(calls) == 1
+        assert first.name == second.name == "Summer Camp Abroad"
+        assert first.thumbnail_url == "https://a.example.com/images/camp.jpg"
+        assert second.thumbnail_url == "https://b.example.org/images/camp.jpg"
+
+    def test_crawler_close_closes_the_cache(self, tmp_path):
+        """Test that closing the crawler releases the cache database"""
+        from crawler.crawler import WebCrawler
+        from crawler.local_store import LocalStore
+
+        cache = ExtractionCache(str(tmp_path / "c.db"))
+        WebCrawler(db_manager=LocalStore(), extraction_cache=cache).close()
+
+        with pytest.raises(Exception, match="closed"):
+            len(cache)
+
@@ -2,6 +2,7 @@ import pytest
 from bs4 import BeautifulSoup
 from crawler.extractors import ContentExtractor
 from crawler.models import CampsiteData
+from crawler.tests.test_parsers import PAGES
 
 
 class TestContentExtractor:
@@ -81,6 +82,34 @@ class TestContentExtractor:
 
         assert extractor._is_relevant_content(soup) is False
 
+    def test_is_relevant_prefix_uses_head(self, extractor):
+        """Test the early relevance check on a page prefix"""
+        prefix = '<html><head><title>Summer Camp in Spain</title>'
+        prefix += '<meta name="keywords" content="language camp, study abroad"></head><body>'
+
+        assert extractor.is_relevant_prefix(prefix) is True
+
+    def test_is_relevant_prefix_rejects_irrelevant(self, extractor):
+        """Test that a prefix without keywords is rejected"""
+        prefix = '<html><head><title>Online Shopping Store</title></head><body><p>Free shipping'
+
+        assert extractor.is_relevant_prefix(prefix) is False
+
+    def test_is_relevant_prefix_ignores_markup(self, extractor):
+        """Test that keywords in attributes, scripts and comments do not count"""
+        prefix = ('<html><head><link rel="stylesheet" href="/summer-camp/study-abroad.css">'
+                  '<script>var page = "language school summer camp";</script>'
+                  '<!-- study abroad --></head><body><p>Online Shopping Store')
+
+        assert extractor.is_relevant_prefix(prefix) is False
+
+    @pytest.mark.parametrize("page", PAGES, ids=lambda path: path.stem)
+    def test_is_relevant_prefix_agrees_with_full_check(self, extractor, page):
+        """Test that the prefix check on a whole page matches the parsed decision"""
+        html = page.read_text(encoding="utf-8")
+
+        assert extractor.is_relevant_prefix(html) == extractor._is_relevant_content(extractor.parse(html))
+
     def test_extract_name_from_h1(self, extractor):
         """Test name extraction from h1 tag"""
         html = "<html><body><h1>Test Camp Name</h1></body></html>"
@@ -176,6 +205,18 @@ class TestContentExtractor:
 
         assert thumbnail == "https://example.com/images/hero.jpg"
 
+    def test_thumbnail_candidates_in_priority_order(self, extractor):
+        """Test that meta images come first, then hero and page images, without icons or duplicates"""
+        html = '''<html><head>
+        <meta property="og:image" content="/og.jpg">
+        </head><body>
+        <img src="/logo.png"><img src="/gallery.jpg"><div class="hero"><img src="/hero.jpg"></div>
+        <img src="/og.jpg">
+        </body></html>'''
+        soup = BeautifulSoup(html, 'lxml')
+
+        assert extractor._thumbnail_candidates(soup) == ["/og.jpg", "/hero.jpg", "/gallery.jpg"]
+
     def test_clean_text_normalization(self, extractor):
         """Test text cleaning and normalization"""
         dirty_text = "  Multiple    spaces\n\nand   newlines\t\ttabs  "
@@ -0,0 +1,96 @@
+import pytest
+import requests
+from datetime import datetime, timedelta, timezone
+from urllib3.exceptions import MaxRetryError, NameResolutionError
+from crawler.config import FAILURE_RETRY_BASE_DELAY, FAILURE_RETRY_MAX_DELAY, FAILURE_MAX_ATTEMPTS, NXDOMAIN_MAX_ATTEMPTS
+from crawler.failures import (
+    UnsupportedContentTypeError, classify_failure, failure_row, is_permanent, next_attempt_at,
+)
+from crawler.throttle import HostUnavailableError
+
+
+def http_error(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.exceptions.HTTPError(f"{status_code} error", response=response)
+
+
+class TestClassifyFailure:
+    def test_not_found_is_permanent(self):
+        """Test that 404/410 responses are permanent failures"""
+        assert classify_failure(http_error(404)) == ("http_404", True)
+        assert classify_failure(http_error(410)) == ("http_410", True)
+
+    def test_server_errors_are_transient(self):
+        """Test that 5xx and 429 responses are retried"""
+        assert classify_failure(http_error(503)) == ("http_503", False)
+        assert classify_failure(status_code=429) == ("http_429", False)
+
+    def test_nxdomain_is_transient(self):
+        """Test that a name that does not resolve is detected through wrapping but retried"""
+        reason = NameResolutionError("nosuchhost.invalid", None, "Name or service not known")
+        error = requests.exceptions.ConnectionError(MaxRetryError(None, "/", reason))
+
+        assert classify_failure(error) == ("dns_nxdomain", False)
+
+    def test_temporary_dns_failure_is_transient(self):
+        """Test that EAI_AGAIN is an ordinary transient DNS failure"""
+        reason = NameResolutionError("camps.example", None, "[Errno -3] Temporary failure in name resolution")
+        error = requests.exceptions.ConnectionError(MaxRetryError(None, "/", reason))
+
+        assert classify_failure(error) == ("dns", False)
+
+    def test_generic_name_resolution_error_is_transient(self):
+        """Test that a resolver error without an NXDOMAIN answer is retried"""
+        reason = NameResolutionError("camps.example", None, "resolver timed out")
+        error = requests.exceptions.ConnectionError(MaxRetryError(None, "/", reason))
+
+        assert classify_failure(error) == ("dns", False)
+
+    def test_connection_and_timeout_are_transient(self):
+        """Test that network errors are retried"""
+        assert classify_failure(requests.exceptions.ConnectionError("reset")) == ("connection", False)
+        assert classify_failure(requests.exceptions.ReadTimeout("slow")) == ("timeout", False)
+
+    def test_other_failure_types(self):
+        """Test classification of crawler-specific failures"""
+        assert classify_failure(UnsupportedContentTypeError("pdf")) == ("content_type", True)
+        assert classify_failure(HostUnavailableError("down")) == ("host_unavailable", False)
+        assert classify_failure(requests.exceptions.MissingSchema("no scheme")) == ("invalid_url", True)
+        assert classify_failure(ValueError("boom")) == ("other", False)
+
+
+class TestRetrySchedule:
+    def test_backoff_is_exponential(self):
+        """Test that the retry delay doubles with each attempt"""
+        now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+        assert next_attempt_at(1, now) == now + timedelta(seconds=FAILURE_RETRY_BASE_DELAY)
+        assert next_attempt_at(3, now) == now + timedelta(seconds=FAILURE_RETRY_BASE_DELAY * 4)
+
+    def test_backoff_is_capped(self):
+        """Test that the retry delay never exceeds the maximum"""
+        now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+        assert next_attempt_at(50, now) == now + timedelta(seconds=FAILURE_RETRY_MAX_DELAY)
+
+    def test_transient_failures_become_permanent(self):
+        """Test that repeated transient failures are eventually given up"""
+        assert is_permanent(1, False) is False
+        assert is_permanent(FAILURE_MAX_ATTEMPTS, False) is True
+        assert is_permanent(1, True) is True
+
+    def test_nxdomain_becomes_permanent_after_repeated_attempts(self):
+        """Test that only a repeated NXDOMAIN is given up on early"""
+        assert is_permanent(NXDOMAIN_MAX_ATTEMPTS - 1, False, "dns_nxdomain") is False
+        assert is_permanent(NXDOMAIN_MAX_ATTEMPTS, False, "dns_nxdomain") is True
+        assert is_permanent(NXDOMAIN_MAX_ATTEMPTS, False, "dns") is False
+
+    def test_failure_row(self):
+        """Test the retry-queue row shared by all stores"""
+        row = failure_row("https://example.com/a", "x" * 2000, "timeout", None, False, 1)
+        last = failure_row("https://example.com/a", None, "timeout", None, False, FAILURE_MAX_ATTEMPTS)
+
+        assert len(row["error"]) == 1000
+        assert row["permanent"] is False and row["next_attempt_at"] is not None
+        assert last["permanent"] is True and last["next_attempt_at"] is None
@@ -0,0 +1,210 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from crawler.frontier import Frontier, HostFrontiers, normalize_url, score_link
+
+SITE = {
+    "/": """<html><body><h1>Study abroad summer camp programs</h1>
+        <a href="/blog/2023/news">Latest news</a>
+        <a href="/privacy">Privacy</a>
+        <a href="/programs/summer-camp#dates">Summer camp in England</a>
+        <a href="/courses">Courses</a></body></html>""",
+    "/programs/summer-camp": """<html><body>Summer camp program
+        <a href="/programs/summer-camp/oxford">Oxford summer camp</a></body></html>""",
+}
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        page = SITE.get(self.path)
+        body = (page or "<html><body>nothing here</body></html>").encode()
+        self.send_response(200 if page else 404)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestScoreLink:
+    def test_program_urls_beat_boilerplate(self):
+        """Test that URL tokens order program pages before blog/legal pages"""
+        assert score_link("https://a.com/programs/summer-camp") > score_link("https://a.com/blog/2023/news")
+        assert score_link("https://a.com/blog/2023/news") > score_link("https://a.com/privacy-terms")
+
+    def test_anchor_text_and_parent_relevance_raise_score(self):
+        """Test that anchor keywords and a relevant parent page add priority"""
+        url = "https://a.com/p/123"
+
+        assert score_link(url, "Summer camp and study abroad") > score_link(url, "Read more")
+        assert score_link(url, parent_relevance=2.0) > score_link(url, parent_relevance=0.0)
+
+    def test_depth_is_penalised(self):
+        """Test that deeper links rank lower"""
+        url = "https://a.com/programs"
+
+        assert score_link(url, depth=1) > score_link(url, depth=2)
+
+
+class TestFrontier:
+    def test_pops_best_first(self):
+        """Test priority order with first-come tie breaking"""
+        frontier = Frontier(max_depth=3)
+        frontier.push("https://a.com/low", 1, 0.5)
+        frontier.push("https://a.com/high", 1, 3.0)
+        frontier.push("https://a.com/tie", 1, 0.5)
+
+        order = [frontier.pop()[0] for _ in range(3)]
+
+        assert order == ["https://a.com/high", "https://a.com/low", "https://a.com/tie"]
+        assert frontier.pop() is None
+
+    def test_urls_are_fetched_once(self):
+        """Test that re-discovered and fragment URLs are not queued again"""
+        frontier = Frontier(max_depth=3)
+        frontier.push("https://a.com/page", 1, 1.0)
+        frontier.pop()
+
+        assert frontier.push("https://a.com/page#top", 2, 5.0) is False
+        assert frontier.push("https://a.com/deep", 4, 5.0) is False
+        assert len(frontier) == 0
+
+    def test_better_score_requeues(self):
+        """Test that a URL found again with a better score moves up"""
+        frontier = Frontier(max_depth=3)
+        frontier.push("https://a.com/a", 1, 1.0)
+        frontier.push("https://a.com/b", 1, 2.0)
+        frontier.push("https://a.com/a", 1, 3.0)
+
+        assert [frontier.pop()[0] for _ in range(2)] == ["https://a.com/a", "https://a.com/b"]
+        assert frontier.pop() is None
+
+
+class TestNormalizeUrl:
+    def test_equivalent_urls_share_a_key(self):
+        """Test that fragment, case, default port and empty path are canonicalised"""
+        assert normalize_url("HTTPS://WWW.A.com:443#top") == "https://www.a.com/"
+        assert normalize_url("http://a.com:80/Programs?x=1") == "http://a.com/Programs?x=1"
+        assert normalize_url("http://a.com:8080/p") == "http://a.com:8080/p"
+
+
+class TestHostFrontiers:
+    def test_budget_is_shared_evenly(self):
+        """Test that the least-fetched idle site is popped next"""
+        frontiers = HostFrontiers(max_depth=2)
+        frontiers.add_seed("https://a.com/")
+        frontiers.add_seed("https://www.b.com/")
+        links = {
+            "https://a.com/": [f"https://a.com/{i}" for i in range(5)],
+            "https://www.b.com/": ["https://b.com/only"],
+        }
+
+        order = []
+        while (entry := frontiers.pop()) is not None:
+            url = entry[0]
+            order.append(url)
+            for link in links.get(url, []):
+                frontiers.push(link, 1, 1.0)
+            frontiers.done(url)
+
+        assert order[:4] == ["https://a.com/", "https://www.b.com/", "https://a.com/0", "https://b.com/only"]
+        # b ran out of links, so its share goes to a
+        assert frontiers.fetched == {"a.com": 6, "b.com": 2}
+
+    def test_one_fetch_in_flight_per_site(self):
+        """Test that a site is not popped again until its fetch is done"""
+        frontiers = HostFrontiers(max_depth=2)
+        frontiers.add_seed("https://a.com/")
+
+        assert frontiers.pop()[0] == "https://a.com/"
+        frontiers.push("https://a.com/next", 1, 1.0)
+        assert frontiers.pop() is None
+        frontiers.done("https://a.com/")
+        assert frontiers.pop()[0] == "https://a.com/next"
+
+    def test_links_outside_seed_sites_are_dropped(self):
+        """Test that only seed sites are in scope and each URL is queued once"""
+        frontiers = HostFrontiers(max_depth=2)
+        frontiers.add_seed("https://a.com/")
+
+        assert frontiers.push("https://other.com/programs", 1, 5.0) is False
+        assert frontiers.add_seed("https://a.com/#again") is False
+        assert frontiers.queued() == 1
+
+
+class TestDiscovery:
+    @pytest.fixture
+    def site(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), SiteHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{server.server_port}"
+        server.shutdown()
+        server.server_close()
+
+    def test_budget_goes_to_program_pages(self, site):
+        """Test that a two-page budget fetches the program page, not the blog"""
+        from crawler.crawler import WebCrawler
+        from crawler.local_store import LocalStore
+
+        crawler = WebCrawler(db_manager=LocalStore())
+        fetched = []
+        get = crawler._get
+        crawler._get = lambda url, stream=False: fetched.append(url) or get(url, stream)
+
+        urls = crawler.discover_urls(f"{site}/", max_depth=2, max_pages=2)
+
+        assert fetched == [f"{site}/", f"{site}/programs/summer-camp"]
+        assert set(urls[:2]) == {f"{site}/programs/summer-camp", f"{site}/programs/summer-camp/oxford"}
+        assert f"{site}/privacy" not in urls
+
+    def test_time_budget_stops_discovery(self, site):
+        """Test that no page is fetched once the time budget stops admitting work"""
+        from crawler.budget import CrawlBudget
+        from crawler.crawler import WebCrawler
+        from crawler.local_store import LocalStore
+        from crawler.tests.test_throttle import FakeClock
+
+        clock = FakeClock()
+        budget = CrawlBudget(600, drain_seconds=100, clock=clock)
+        crawler = WebCrawler(db_manager=LocalStore())
+        fetched = []
+        get = crawler._get
+
+        def timed_get(url, stream=False):
+            fetched.append(url)
+            clock.advance(600)
+            return get(url, stream)
+
+        crawler._get = timed_get
+
+        crawler.discover_urls(f"{site}/", max_depth=2, max_pages=10, budget=budget)
+
+        assert fetched == [f"{site}/"]
+
+    def test_seeds_share_the_budget(self, site):
+        """Test that several seed sites are explored under one page budget"""
+        from crawler.crawler import WebCrawler
+        from crawler.local_store import LocalStore
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), SiteHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        other = f"http://localhost:{server.server_port}"
+        try:
+            crawler = WebCrawler(db_manager=LocalStore())
+            fetched = []
+            get = crawler._get
+            crawler._get = lambda url, stream=False: fetched.append(url) or get(url, stream)
+
+            urls = crawler.discover_urls([f"{site}/", other], max_depth=2, max_pages=4)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert len(fetched) == 4
+        assert sorted(fetched) == sorted([f"{site}/", f"{site}/programs/summer-camp",
+                                          f"{other}/", f"{other}/programs/summer-camp"])
+        assert f"{other}/programs/summer-camp/oxford" in urls
+        assert f"{site}/programs/summer-camp/oxford" in urls
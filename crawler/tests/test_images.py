@@ -0,0 +1,182 @@
+import struct
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from crawler.crawler import WebCrawler
+from crawler.images import ImageProbe, ImageProber, choose_thumbnail, image_dimensions
+from crawler.local_store import LocalStore
+from crawler.models import CampsiteData, CrawlResult
+
+
+def png(width, height):
+    return b'\x89PNG\r\n\x1a\n' + struct.pack('>I', 13) + b'IHDR' + struct.pack('>II', width, height) + b'\x08\x02'
+
+
+def jpeg(width, height):
+    # SOI, an APP0 segment, then a baseline start-of-frame
+    app0 = b'\xff\xe0' + struct.pack('>H', 16) + b'JFIF\x00' + b'\x00' * 9
+    sof = b'\xff\xc0' + struct.pack('>HBHH', 17, 8, height, width) + b'\x03'
+    return b'\xff\xd8' + app0 + sof
+
+
+class TestImageDimensions:
+    @pytest.mark.parametrize("data, expected", [
+        (png(640, 480), ('png', 640, 480)),
+        (b'GIF89a' + struct.pack('<HH', 300, 200), ('gif', 300, 200)),
+        (jpeg(1200, 630), ('jpeg', 1200, 630)),
+        (b'RIFF\x00\x00\x00\x00WEBPVP8X' + b'\x00' * 8 + (799).to_bytes(3, 'little') + (599).to_bytes(3, 'little'),
+         ('webp', 800, 600)),
+        (b'<?xml version="1.0"?><svg xmlns="http://www.w3.org/2000/svg"></svg>', ('svg', None, None)),
+    ])
+    def test_formats(self, data, expected):
+        """Test format and size detection from the first bytes"""
+        assert image_dimensions(data) == expected
+
+    def test_truncated_jpeg_header(self):
+        """Test that a JPEG whose frame header is past the probed bytes has unknown size"""
+        assert image_dimensions(jpeg(1200, 630)[:12]) == ('jpeg', None, None)
+
+    def test_not_an_image(self):
+        """Test that HTML error pages are not images"""
+        assert image_dimensions(b'<html><body>Not found</body></html>') is None
+
+
+class TestChooseThumbnail:
+    def probe(self, url, **kwargs):
+        return ImageProbe(url, status_code=200, format='jpeg', **kwargs)
+
+    def test_skips_broken_tiny_and_huge_images(self):
+        """Test that the first usable candidate wins over rejected ones"""
+        candidates = ["/404.jpg", "/pixel.gif", "/huge.jpg", "/strip.jpg", "/hero.jpg"]
+        probes = {
+            "/404.jpg": ImageProbe("/404.jpg", status_code=404),
+            "/pixel.gif": self.probe("/pixel.gif", width=1, height=1),
+            "/huge.jpg": self.probe("/huge.jpg", width=6000, height=4000, size=40 * 1024 * 1024),
+            "/strip.jpg": self.probe("/strip.jpg", width=2000, height=100),
+            "/hero.jpg": self.probe("/hero.jpg", width=1200, height=630),
+        }
+
+        assert choose_thumbnail(candidates, probes) == "/hero.jpg"
+
+    def test_known_size_preferred_over_unknown(self):
+        """Test that an image of unknown size is only used if no sized image is usable"""
+        probes = {"/a.svg": ImageProbe("/a.svg", status_code=200, format='svg'),
+                  "/b.jpg": self.probe("/b.jpg", width=800, height=600)}
+
+        assert choose_thumbnail(["/a.svg", "/b.jpg"], probes) == "/b.jpg"
+        assert choose_thumbnail(["/a.svg"], probes) == "/a.svg"
+
+    def test_unfinished_probes_and_all_rejected(self):
+        """Test the fallback to unprobed candidates, and None when everything was rejected"""
+        probes = {"/404.jpg": ImageProbe("/404.jpg", status_code=404)}
+
+        assert choose_thumbnail(["/404.jpg", "/slow.jpg"], probes) == "/slow.jpg"
+        assert choose_thumbnail(["/404.jpg"], probes) is None
+
+
+class TestImageProber:
+    def test_disabled_prober_keeps_the_first_candidate(self):
+        """Test the fallback when the HTTP client is unavailable"""
+        prober = ImageProber()
+        prober.disabled = True
+
+        assert prober.choose(["https://a.example.com/1.jpg", "https://a.example.com/2.jpg"]) == \
+            "https://a.example.com/1.jpg"
+
+    @pytest.fixture
+    def server_url(self):
+        requests = []
+
+        class ImageHandler(BaseHTTPRequestHandler):
+            images = {"/small.png": png(16, 16), "/photo.png": png(1200, 800) + b'\x00' * 100000}
+
+            def do_GET(self):
+                requests.append((self.path, self.headers.get("Range")))
+                body = self.images.get(self.path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(206)
+                self.send_header("Content-Type", "image/png")
+                self.send_header("Content-Range", f"bytes 0-{min(len(body), 1024) - 1}/{len(body)}")
+                self.send_header("Content-Length", str(min(len(body), 1024)))
+                self.end_headers()
+                self.wfile.write(body[:1024])
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), ImageHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{server.server_address[1]}", requests
+        server.shutdown()
+        server.server_close()
+
+    def test_probes_candidates_once(self, server_url):
+        """Test ranged probing against a local server, with results cached per image URL"""
+        pytest.importorskip("aiohttp")
+        base, requests = server_url
+        candidates = [f"{base}/missing.png", f"{base}/small.png", f"{base}/photo.png"]
+        prober = ImageProber(probe_bytes=1024)
+
+        try:
+            prober.prefetch(candidates)
+            assert prober.choose(candidates) == f"{base}/photo.png"
+            assert prober.choose(candidates) == f"{base}/photo.png"
+        finally:
+            prober.close()
+
+        assert len(requests) == 3
+        assert all(header == "bytes=0-1023" for _, header in requests)
+        assert prober.stats()["too_small"] == 1
+
+
+class FakeProber:
+    def __init__(self, best):
+        self.best = best
+        self.prefetched = []
+
+    def prefetch(self, urls):
+        self.prefetched.extend(urls)
+
+    def choose(self, candidates):
+        return self.best
+
+
+class TestCrawlerThumbnails:
+    def test_saved_thumbnail_is_the_chosen_candidate(self):
+        """Test that the prober's choice replaces the first candidate before saving"""
+        store = LocalStore()
+        crawler = WebCrawler(db_manager=store, image_prober=FakeProber("https://a.example.com/hero.jpg"))
+        campsite = CampsiteData(
+            name="Camp", url="https://a.example.com/", thumbnail_url="https://a.example.com/404.jpg",
+            thumbnail_candidates=["https://a.example.com/404.jpg", "https://a.example.com/hero.jpg"],
+        )
+
+        crawler.persist_result(CrawlResult(url=campsite.url, success=True, campsite_data=campsite))
+
+        assert store.campsites[campsite.url].thumbnail_url == "https://a.example.com/hero.jpg"
+
+    def test_batch_crawl_saves_pages_after_later_fetches(self, monkeypatch):
+        """Test that batch mode chooses a page's thumbnail only after the next pages are fetched"""
+        monkeypatch.setattr("crawler.crawler.IMAGE_PROBE_LOOKAHEAD", 2)
+        events = []
+        prober = FakeProber(None)
+        prober.choose = lambda candidates: events.append(("choose", candidates[0])) or candidates[0]
+        crawler = WebCrawler(db_manager=LocalStore(), image_prober=prober)
+        crawler.throttle.wait_time = lambda url: 0.0
+
+        def fetch_page(url):
+            events.append(("fetch", url))
+            campsite = CampsiteData(name="Camp", url=url, thumbnail_candidates=[f"{url}/hero.jpg"])
+            return CrawlResult(url=url, success=True, campsite_data=campsite, processing_time=0.0)
+
+        crawler.fetch_page = fetch_page
+        urls = [f"https://{host}.example.com" for host in "abc"]
+
+        assert [result.url for result in crawler.iter_crawl(urls)] == urls
+        assert events == [
+            ("fetch", urls[0]), ("fetch", urls[1]), ("fetch", urls[2]),
+            ("choose", f"{urls[0]}/hero.jpg"), ("choose", f"{urls[1]}/hero.jpg"), ("choose", f"{urls[2]}/hero.jpg"),
+        ]
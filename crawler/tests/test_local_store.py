@@ -0,0 +1,69 @@
+import pytest
+from crawler.crawler import WebCrawler
+from crawler.local_store import LocalStore
+from crawler.models import CampsiteData
+
+
+class TestLocalStore:
+    @pytest.fixture
+    def store(self):
+        return LocalStore(known_urls=["https://known.example.com/"])
+
+    def test_known_urls_are_indexed(self, store):
+        """Test that preloaded URLs count as existing"""
+        assert store.url_exists("https://known.example.com/") is True
+        assert store.url_exists("https://new.example.com/") is False
+
+    def test_save_campsite_dedupes(self, store):
+        """Test that a URL is only stored once"""
+        campsite = CampsiteData(name="Camp", url="https://new.example.com/", country="Japan")
+
+        assert store.save_campsite(campsite) is True
+        assert store.save_campsite(campsite) is True
+        assert store.url_exists(campsite.url) is True
+        assert store.write_stats() == {"inserted": 1, "unchanged": 1}
+
+        stats = store.get_crawl_statistics()
+        assert stats["total_campsites"] == 1
+        assert stats["countries"] == {"Japan": 1}
+
+    def test_retry_queue(self, store):
+        """Test that failures are scheduled and cleared like the database queue"""
+        store.mark_url_as_failed("https://a.example.com/", "timeout", "timeout")
+        store.mark_url_as_failed("https://b.example.com/", "gone", "http_404", 404, permanent=True)
+
+        urls = ["https://a.example.com/", "https://b.example.com/", "https://c.example.com/"]
+        assert store.filter_retryable_urls(urls) == ["https://c.example.com/"]
+        assert store.get_crawl_statistics()["pending_retries"] == 1
+
+        store.clear_failure("https://a.example.com/")
+        assert "https://a.example.com/" in store.filter_retryable_urls(urls)
+
+    def test_crawler_uses_local_store(self, store):
+        """Test that the crawler dedupes against the local index without a database"""
+        crawler = WebCrawler(db_manager=store)
+
+        result = crawler.crawl_url("https://known.example.com/")
+
+        assert result.success is False
+        assert result.error == "URL already exists"
+        assert store.seen_count == 1
+
+    def test_recrawl_updates_changed_fields(self, store):
+        """Test that a recrawl with new content counts only the changed fields"""
+        store.save_campsite(CampsiteData(name="Camp", url="https://new.example.com/", country="Japan"))
+
+        store.save_campsite(CampsiteData(name="Camp", url="https://new.example.com/", country="Spain"))
+
+        assert store.write_stats()["fields_updated"] == 1
+        assert store.get_crawl_statistics()["countries"] == {"Spain": 1}
+
+    def test_refresh_recrawls_known_urls(self, store):
+        """Test that refresh mode fetches URLs that are already stored"""
+        crawler = WebCrawler(db_manager=store, refresh_existing=True)
+        crawler.throttle.acquire = lambda url: False  # Stop before any network access
+
+        result = crawler.crawl_url("https://known.example.com/")
+
+        assert result.error != "URL already exists"
+        assert store.seen_count == 0
@@ -0,0 +1,53 @@
+import json
+import logging
+import queue
+from crawler.logging_setup import DeferredQueueHandler, JSONFormatter, SamplingFilter
+
+
+def make_record(level=logging.INFO, msg="Crawling URL: %s", args=("https://camp.example.com/",), **extra):
+    record = logging.LogRecord("crawler.urls", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestSamplingFilter:
+    def test_keeps_one_in_n(self):
+        """Test that INFO records are sampled"""
+        sampler = SamplingFilter(every=10)
+
+        kept = sum(sampler.filter(make_record()) for _ in range(100))
+
+        assert kept == 10
+
+    def test_warnings_are_never_sampled(self):
+        """Test that warnings and errors always pass"""
+        sampler = SamplingFilter(every=10)
+
+        assert all(sampler.filter(make_record(logging.WARNING)) for _ in range(20))
+
+
+class TestDeferredQueueHandler:
+    def test_record_is_enqueued_unformatted(self):
+        """Test that formatting is left to the listener"""
+        log_queue = queue.SimpleQueue()
+        handler = DeferredQueueHandler(log_queue)
+        record = make_record()
+
+        handler.handle(record)
+
+        queued = log_queue.get_nowait()
+        assert queued is record
+        assert queued.msg == "Crawling URL: %s"
+        assert queued.args == ("https://camp.example.com/",)
+
+
+class TestJSONFormatter:
+    def test_formats_json_line_with_extra_fields(self):
+        """Test that extra fields become JSON keys"""
+        line = JSONFormatter().format(make_record(url="https://camp.example.com/"))
+
+        entry = json.loads(line)
+        assert entry["message"] == "Crawling URL: https://camp.example.com/"
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "crawler.urls"
+        assert entry["url"] == "https://camp.example.com/"
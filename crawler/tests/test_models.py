@@ -1,6 +1,6 @@
 import pytest
 from datetime import datetime
-from crawler.models import CampsiteData, CrawlResult
+from crawler.models import CampsiteData, CrawlResult, fields_fingerprint
 
 
 class TestCampsiteData:
@@ -79,6 +79,24 @@ class TestCampsiteData:
         assert campsite2.crawled_at is not None
         assert isinstance(campsite2.crawled_at, datetime)
 
+    def test_fingerprint_ignores_crawl_metadata(self):
+        """Test that only persisted fields feed the fingerprint"""
+        first = CampsiteData(name="Camp", url="https://a.com", country="Japan", meta_title="Old")
+        second = CampsiteData(name="Camp", url="https://a.com", country="Japan", meta_title="New",
+                              crawled_at=datetime(2023, 1, 1))
+
+        assert first.fingerprint() == second.fingerprint()
+        assert first.fingerprint() != CampsiteData(name="Camp", url="https://a.com", country="Spain").fingerprint()
+        assert first.fingerprint() == fields_fingerprint(first.to_dict())
+
+    def test_changed_fields(self):
+        """Test that only differing persisted columns are reported"""
+        campsite = CampsiteData(name="Camp", url="https://a.com", description="New text", country="Japan")
+        stored = {"name": "Camp", "description": "Old text", "country": "Japan",
+                  "category": "study", "thumbnail_url": None}
+
+        assert campsite.changed_fields(stored) == {"description": "New text"}
+
 
 class TestCrawlResult:
     def test_crawl_result_success(self):
@@ -209,6 +227,14 @@ class TestDataValidation:
         )
         assert result_truthy.success == 1  # dataclass doesn't auto-convert
 
+    def test_models_are_slotted(self):
+        """Test that models do not carry a per-instance __dict__"""
+        campsite = CampsiteData(name="Slot Camp", url="https://slot.com")
+        result = CrawlResult(url="https://slot.com", success=True, campsite_data=campsite)
+
+        assert not hasattr(campsite, "__dict__")
+        assert not hasattr(result, "__dict__")
+
     def test_category_values(self):
         """Test that category accepts valid values"""
         valid_categories = ["summer", "winter", "study", "online"]
@@ -0,0 +1,207 @@
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from crawler.network import DNSCache, PooledHTTPAdapter
+from crawler.tests.test_throttle import FakeClock
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"<html></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class NotFoundHandler(KeepAliveHandler):
+    def do_GET(self):
+        body = b"<html>Not found</html>"
+        self.send_response(404)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestDNSCache:
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def lookups(self):
+        return []
+
+    @pytest.fixture
+    def cache(self, clock, lookups):
+        def resolver(host, port, *args):
+            lookups.append(host)
+            if host == "missing.invalid":
+                raise socket.gaierror("not found")
+            return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("10.0.0.1", port))]
+
+        return DNSCache(ttl=300, max_size=2, resolver=resolver, clock=clock)
+
+    def test_lookups_are_cached_until_ttl(self, cache, clock, lookups):
+        """Test that a host is resolved once per TTL"""
+        cache.getaddrinfo("camp.example.com", 443)
+        cache.getaddrinfo("camp.example.com", 443)
+        assert lookups == ["camp.example.com"]
+
+        clock.advance(301)
+        cache.getaddrinfo("camp.example.com", 443)
+        assert lookups == ["camp.example.com"] * 2
+        assert cache.stats()["hits"] == 1
+
+    def test_failures_are_not_cached(self, cache, lookups):
+        """Test that a failed lookup is retried next time"""
+        for _ in range(2):
+            with pytest.raises(socket.gaierror):
+                cache.getaddrinfo("missing.invalid", 80)
+
+        assert lookups == ["missing.invalid"] * 2
+
+    def test_oldest_entries_evicted(self, cache, lookups):
+        """Test that the cache is bounded"""
+        for host in ("a.example.com", "b.example.com", "c.example.com", "a.example.com"):
+            cache.getaddrinfo(host, 80)
+
+        assert cache.stats()["entries"] == 2
+        assert lookups.count("a.example.com") == 2
+
+
+class TestPooledHTTPAdapter:
+    @pytest.fixture
+    def server(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{server.server_port}/"
+        server.shutdown()
+        server.server_close()
+
+    def test_keep_alive_connections_are_reused(self, server):
+        """Test that sequential requests to one host share a connection"""
+        session = requests.Session()
+        adapter = PooledHTTPAdapter(pool_connections=2, pool_maxsize=2)
+        session.mount("http://", adapter)
+
+        for _ in range(5):
+            assert session.get(server).status_code == 200
+        session.close()
+
+        stats = adapter.connection_stats()
+        assert stats["requests"] == 5
+        assert stats["new_connections"] == 1
+        assert stats["reused"] == 4
+
+    def test_stats_survive_pool_eviction(self, server):
+        """Test that counts of closed pools are kept"""
+        session = requests.Session()
+        adapter = PooledHTTPAdapter()
+        session.mount("http://", adapter)
+        session.get(server)
+
+        adapter.close()
+
+        assert adapter.connection_stats()["requests"] == 1
+
+    def test_new_connections_resolve_through_the_adapter_cache(self, server):
+        """Test that the adapter's DNS cache serves repeated connections to a host"""
+        port = int(server.rsplit(":", 1)[1].strip("/"))
+        lookups = []
+
+        def resolver(host, *args):
+            lookups.append(host)
+            return socket.getaddrinfo("127.0.0.1", *args)
+
+        session = requests.Session()
+        adapter = PooledHTTPAdapter()
+        adapter.dns_cache.resolver = resolver
+        session.mount("http://", adapter)
+        for _ in range(3):
+            response = session.get(f"http://camp.example:{port}/", headers={"Connection": "close"})
+            assert response.status_code == 200
+        session.close()
+
+        assert lookups == ["camp.example"]
+        assert adapter.dns_cache.stats()["hits"] == 2
+
+    def test_unresolvable_host_raises_connection_error(self):
+        """Test that a failed cached lookup surfaces as urllib3's name resolution error"""
+        def resolver(host, *args):
+            raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+
+        session = requests.Session()
+        adapter = PooledHTTPAdapter(max_retries=0)
+        adapter.dns_cache.resolver = resolver
+        session.mount("http://", adapter)
+
+        with pytest.raises(requests.ConnectionError, match="NameResolutionError"):
+            session.get("http://missing.invalid/")
+
+    def test_disabled_cache_uses_default_connections(self, server):
+        """Test that a zero TTL leaves resolution to urllib3"""
+        session = requests.Session()
+        adapter = PooledHTTPAdapter(dns_cache_ttl=0)
+        session.mount("http://", adapter)
+
+        assert session.get(server).status_code == 200
+        assert adapter.dns_cache is None
+
+    def test_global_resolver_is_untouched(self):
+        """Test that building a crawler does not replace socket.getaddrinfo for the process"""
+        from crawler.crawler import WebCrawler
+        from crawler.local_store import LocalStore
+
+        getaddrinfo = socket.getaddrinfo
+        crawler = WebCrawler(db_manager=LocalStore())
+        try:
+            assert socket.getaddrinfo is getaddrinfo
+            assert "dns" in crawler.connection_stats()
+        finally:
+            crawler.close()
+
+
+class TestErrorResponses:
+    @pytest.fixture
+    def server(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), NotFoundHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{server.server_port}/missing"
+        server.shutdown()
+        server.server_close()
+
+    @pytest.fixture
+    def crawler(self):
+        from crawler.crawler import WebCrawler
+        from crawler.local_store import LocalStore
+
+        crawler = WebCrawler(db_manager=LocalStore())
+        crawler.responses = []
+        get = crawler._get
+        crawler._get = lambda url, stream=False: crawler.responses.append(get(url, stream)) or crawler.responses[-1]
+        yield crawler
+        crawler.close()
+
+    def test_fetch_closes_error_responses(self, crawler, server):
+        """Test that a 404 does not keep its pooled connection checked out"""
+        result = crawler.fetch_page(server)
+
+        assert result.status_code == 404
+        assert crawler.responses[0].raw.closed
+
+    def test_discovery_closes_error_responses(self, crawler, server):
+        """Test that discovery releases the connection of an error page"""
+        assert crawler._discover_links(server, 0) == []
+        assert crawler.responses[0].raw.closed
@@ -0,0 +1,119 @@
+import random
+import threading
+import pytest
+import zstandard
+from crawler import page_store
+from crawler.page_store import NO_DICTIONARY, PageStore
+
+WORDS = ["summer", "camp", "abroad", "students", "language", "course", "hiking", "lake", "weeks", "ages"]
+
+
+def page(host: str, number: int) -> bytes:
+    """A provider page: shared boilerplate around a few varying paragraphs"""
+    rng = random.Random(f"{host}-{number}")
+    text = " ".join(rng.choice(WORDS) for _ in range(60))
+    return (
+        f"<!DOCTYPE html><html><head><title>Program {number} | {host}</title>"
+        f'<link rel="stylesheet" href="https://{host}/assets/site.css">'
+        f'<script src="https://{host}/assets/analytics.js"></script></head>'
+        f'<body><header class="site-header"><nav class="main-nav"><a href="/">Home</a>'
+        f'<a href="/programs">Programs</a><a href="/about">About us</a><a href="/contact">Contact</a></nav>'
+        f'</header><main class="program-detail"><h1>Program {number}</h1><p>{text}</p>'
+        f'<p class="price">EUR {rng.randint(500, 3000)}</p></main>'
+        f'<footer class="site-footer"><p>Copyright {host}. All rights reserved.</p>'
+        f'<ul class="footer-links"><li><a href="/privacy">Privacy policy</a></li>'
+        f'<li><a href="/terms">Terms and conditions</a></li></ul></footer></body></html>'
+    ).encode("utf-8")
+
+
+class TestPageStore:
+    @pytest.fixture
+    def path(self, tmp_path):
+        return str(tmp_path / "store" / "pages.sqlite3")
+
+    @pytest.fixture
+    def store(self, path):
+        store = PageStore(path, train_pages=20, retrain_pages=20, dict_size=8 * 1024)
+        yield store
+        store.close()
+
+    def fill(self, store, host: str, pages: int, start: int = 0):
+        for number in range(start, start + pages):
+            store.put(f"https://{host}/programs/{number}", page(host, number))
+
+    def test_roundtrip_and_history(self, store):
+        """Test that every stored version of a URL can be read back"""
+        url = "https://camps.example/programs/1"
+        store.put(url, b"<html>first</html>", fetched_at=100.0)
+        store.put(url, b"<html>second</html>", fetched_at=200.0)
+
+        assert store.get(url) == b"<html>second</html>"
+        assert store.get(url, 0) == b"<html>first</html>"
+        assert store.get(url, 5) is None
+        assert store.get("https://camps.example/missing") is None
+        assert store.history(url) == [(100.0, 18), (200.0, 19)]
+
+    def test_unchanged_body_is_not_stored_again(self, store):
+        """Test that a body identical to the latest one is skipped"""
+        url = "https://camps.example/programs/1"
+
+        assert store.put(url, b"<html>same</html>")
+        assert not store.put(url, b"<html>same</html>")
+        assert len(store.history(url)) == 1
+        assert store.stats()["run"]["unchanged"] == 1
+
+    def test_dictionary_is_trained_per_host(self, store):
+        """Test that a host's later pages use its dictionary and compress better"""
+        self.fill(store, "camps.example", 30)
+        self.fill(store, "other.example", 5)
+
+        stats = store.stats()
+        assert stats["dictionaries"] == 1
+        assert store._host_state("other.example")[0] == NO_DICTIONARY
+        report = store.report()
+        assert report["with_dictionary"] > 0
+        assert report["ratio"] > report["zstd_ratio"] > 1
+        assert report["decode_mb_per_second"] > 0
+
+    def test_retrain_keeps_old_pages_readable(self, store, path):
+        """Test that pages compressed with an older dictionary version still decode"""
+        self.fill(store, "camps.example", 70)
+        assert store.stats()["dictionaries"] == 3
+
+        store.close()
+        reopened = PageStore(path, train_pages=20, retrain_pages=20, dict_size=8 * 1024)
+        try:
+            for number in (0, 25, 45, 69):
+                url = f"https://camps.example/programs/{number}"
+                assert reopened.get(url) == page("camps.example", number)
+            # The host's current version and page count are picked up again
+            assert reopened._host_state("camps.example") == [3, 10]
+        finally:
+            reopened.close()
+
+    def test_training_does_not_block_other_puts(self, store, monkeypatch):
+        """Test that pages are stored while a host's dictionary is being trained"""
+        training, release = threading.Event(), threading.Event()
+        train_dictionary = zstandard.train_dictionary
+
+        def slow_train(*args, **kwargs):
+            training.set()
+            assert release.wait(5)
+            return train_dictionary(*args, **kwargs)
+
+        monkeypatch.setattr(page_store.zstandard, "train_dictionary", slow_train)
+        self.fill(store, "camps.example", 19)
+        trainer = threading.Thread(target=self.fill, args=(store, "camps.example", 1, 19))
+        trainer.start()
+        try:
+            assert training.wait(5)
+            # The store lock is free: other hosts and the training host itself still store pages
+            self.fill(store, "other.example", 3)
+            self.fill(store, "camps.example", 3, 20)
+            assert store.get("https://camps.example/programs/21") == page("camps.example", 21)
+        finally:
+            release.set()
+            trainer.join(5)
+
+        assert store.stats()["dictionaries"] == 1
+        assert store._host_state("camps.example") == [1, 0]
@@ -0,0 +1,97 @@
+from pathlib import Path
+import pytest
+from bs4 import BeautifulSoup
+from crawler.extractors import ContentExtractor
+from crawler.parsers import LxmlDocument, css_to_xpath, parse_html
+from crawler.structured import structured_fields
+
+PAGES = sorted(Path(__file__).parent.joinpath("fixtures", "pages").glob("*.html"))
+
+
+@pytest.fixture(scope="module")
+def extractors():
+    return ContentExtractor(parser="lxml"), ContentExtractor(parser="soup")
+
+
+class TestBackendEquivalence:
+    @pytest.mark.parametrize("path", PAGES, ids=lambda path: path.stem)
+    def test_same_fields(self, extractors, path):
+        """Test that both backends extract the same fields from each fixture page"""
+        html = path.read_text()
+        native, soup = extractors
+
+        assert native.extract_fields(html) == soup.extract_fields(html)
+
+    @pytest.mark.parametrize("path", PAGES, ids=lambda path: path.stem)
+    def test_same_structured_data(self, extractors, path):
+        """Test that JSON-LD and OpenGraph are read the same way by both backends"""
+        html = path.read_text()
+        native, soup = extractors
+
+        assert structured_fields(native.parse(html)) == structured_fields(soup.parse(html))
+
+    @pytest.mark.parametrize("path", PAGES, ids=lambda path: path.stem)
+    def test_same_relevance_text(self, extractors, path):
+        """Test that the scorer sees the same words (whitespace-only strings may differ)"""
+        html = path.read_text()
+        native, soup = extractors
+
+        assert native.relevance_text(native.parse(html)).split() == soup.relevance_text(soup.parse(html)).split()
+
+    def test_fixture_corpus_is_not_trivial(self, extractors):
+        """Test that the corpus covers both relevant and irrelevant pages"""
+        native, _ = extractors
+        fields = [native.extract_fields(path.read_text()) for path in PAGES]
+
+        assert any(fields) and None in fields
+
+
+class TestParseHtml:
+    def test_lxml_backend(self):
+        """Test that the default backend builds a native tree"""
+        assert isinstance(parse_html("<html><body><h1>Camp</h1></body></html>", "lxml"), LxmlDocument)
+
+    def test_soup_backend(self):
+        """Test that BeautifulSoup can still be selected"""
+        assert isinstance(parse_html("<html><body><h1>Camp</h1></body></html>", "soup"), BeautifulSoup)
+
+    def test_empty_page_falls_back_to_soup(self):
+        """Test that a page lxml cannot build a tree for is parsed by BeautifulSoup"""
+        assert isinstance(parse_html("", "lxml"), BeautifulSoup)
+
+    def test_xml_declaration(self):
+        """Test that an XML declaration in str input does not break the native parser"""
+        doc = parse_html('<?xml version="1.0" encoding="utf-8"?><html><head><title>Camp</title></head></html>', "lxml")
+
+        assert isinstance(doc, LxmlDocument)
+        assert doc.find("title").get_text() == "Camp"
+
+
+class TestLxmlElement:
+    @pytest.fixture
+    def doc(self):
+        return LxmlDocument(
+            '<html><head><meta property="og:image" content="/a.jpg"></head><body>'
+            '<div class="hero main"><img src="/hero.jpg"></div>'
+            '<p>One <b>two</b></p><script>var x = 1;</script></body></html>'
+        )
+
+    def test_find_by_attributes(self, doc):
+        """Test find with keyword and attrs filters"""
+        assert doc.find("meta", property="og:image")["content"] == "/a.jpg"
+        assert doc.find("meta", attrs={"name": "description"}) is None
+
+    def test_select_one(self, doc):
+        """Test class and descendant selectors"""
+        assert doc.select_one(".hero img")["src"] == "/hero.jpg"
+        assert doc.select_one('img[src*="hero"]').get("src") == "/hero.jpg"
+        assert doc.select_one("div.missing") is None
+
+    def test_get_text_skips_scripts(self, doc):
+        """Test that script contents are not page text"""
+        assert doc.find("body").get_text(" ", strip=True) == "One two"
+
+    def test_unsupported_selector(self):
+        """Test that selectors outside the supported subset fail loudly"""
+        with pytest.raises(ValueError):
+            css_to_xpath("div > img")
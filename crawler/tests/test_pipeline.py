@@ -0,0 +1,181 @@
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer
+import pytest
+from crawler.config import CIRCUIT_BREAKER_MAX_TRIPS
+from crawler.crawler import WebCrawler
+from crawler.local_store import LocalStore
+from crawler.models import CrawlResult, FetchedPage
+from crawler.pipeline import CrawlPipeline
+from crawler.results import ResultWriter
+from crawler.throttle import HostThrottle
+from crawler.tests.test_network import KeepAliveHandler
+
+
+class StubCrawler:
+    """Stages that record how much work is in flight"""
+
+    def __init__(self, persist_delay: float = 0.0):
+        self.db_manager = LocalStore()
+        self.throttle = HostThrottle()
+        self.persist_delay = persist_delay
+        self.fetched = 0
+        self.persisted = 0
+        self.max_in_flight = 0
+        self.failures = []
+        self._lock = threading.Lock()
+
+    def fetch_page(self, url):
+        with self._lock:
+            self.fetched += 1
+            self.max_in_flight = max(self.max_in_flight, self.fetched - self.persisted)
+        return FetchedPage(url, b"<html></html>", 200, "utf-8", time.time())
+
+    def extract_page(self, page):
+        return CrawlResult(url=page.url, success=True, status_code=page.status_code)
+
+    def persist_result(self, result):
+        time.sleep(self.persist_delay)
+        with self._lock:
+            self.persisted += 1
+
+    def _record_failure(self, url, error, status_code=None):
+        self.failures.append(url)
+
+
+def urls(count):
+    # One host per URL, so per-host pacing does not serialise the test
+    return [f"https://camp{i}.example.com/" for i in range(count)]
+
+
+class TestCrawlPipeline:
+    def test_every_url_is_crawled_once(self):
+        """Test that duplicates and dead URLs are dropped before fetching"""
+        crawler = StubCrawler()
+        crawler.db_manager.mark_url_as_failed(urls(5)[4], "gone", "http_404", 404, permanent=True)
+        pipeline = CrawlPipeline(crawler, fetch_workers=3, extract_workers=2, queue_size=4, filter_chunk=2)
+
+        results = list(pipeline.run(urls(5) + urls(2)))
+
+        assert sorted(r.url for r in results) == urls(4)
+        assert pipeline.stats()["duplicates"] == 2
+        assert pipeline.stats()["filtered"] == 1
+
+    def test_slow_sink_bounds_work_in_flight(self):
+        """Test that a slow persist stage throttles reading and fetching"""
+        crawler = StubCrawler(persist_delay=0.005)
+        read = []
+
+        def source():
+            for url in urls(60):
+                read.append(url)
+                yield url
+
+        pipeline = CrawlPipeline(crawler, fetch_workers=2, extract_workers=1, queue_size=2, filter_chunk=1)
+        results = pipeline.run(source())
+        next(results)
+
+        # Queues of 2 between stages plus one item held by each thread
+        assert len(read) < 20
+        assert len(list(results)) == 59
+        assert crawler.max_in_flight <= 2 * 2 + 2 + 1 + 1
+
+    def test_closing_early_stops_the_stages(self):
+        """Test that abandoning the results generator shuts the threads down"""
+        crawler = StubCrawler(persist_delay=0.01)
+        pipeline = CrawlPipeline(crawler, fetch_workers=2, queue_size=2)
+
+        results = pipeline.run(urls(1000))
+        next(results)
+        results.close()
+
+        assert crawler.fetched < 1000
+        assert not [t for t in threading.enumerate() if t.name.startswith("crawler-fetch")]
+
+    def test_persist_error_is_raised(self):
+        """Test that a failing persist stage raises instead of ending the results early"""
+        crawler = StubCrawler()
+        crawler.persist_result = lambda result: 1 / 0
+
+        with pytest.raises(ZeroDivisionError):
+            list(CrawlPipeline(crawler).run(urls(10)))
+
+    def test_input_error_is_raised(self):
+        """Test that a failing URL source raises instead of ending the crawl quietly"""
+        def broken():
+            yield from urls(3)
+            raise OSError("input stream lost")
+
+        with pytest.raises(OSError, match="input stream lost"):
+            list(CrawlPipeline(StubCrawler()).run(broken()))
+
+    def test_closing_does_not_wait_for_blocked_input(self):
+        """Test that a feed blocked on input that never ends does not hang shutdown"""
+        release = threading.Event()
+
+        def endless():
+            yield from urls(3)
+            release.wait(10)
+
+        results = CrawlPipeline(StubCrawler(), filter_chunk=1).run(endless())
+        next(results)
+        started = time.monotonic()
+        results.close()
+        release.set()
+
+        assert time.monotonic() - started < 2
+
+    def test_dedupe_memory_is_bounded(self):
+        """Test that only the last dedupe_size distinct URLs are remembered"""
+        crawler = StubCrawler()
+        pipeline = CrawlPipeline(crawler, dedupe_size=2)
+
+        results = list(pipeline.run(urls(3) + urls(1) + urls(3)[2:]))
+
+        # The first URL was forgotten once two newer ones were seen; the third was still remembered
+        assert len(results) == 4
+        assert pipeline.stats()["duplicates"] == 1
+
+    def test_abandoned_hosts_fail_without_fetching(self):
+        """Test that URLs of a host given up on become failure results"""
+        crawler = StubCrawler()
+        state = crawler.throttle._state("https://dead.example.com/")
+        state.trips = CIRCUIT_BREAKER_MAX_TRIPS
+        state.open_until = time.monotonic() + 60
+
+        results = list(CrawlPipeline(crawler).run(["https://dead.example.com/a"]))
+
+        assert len(results) == 1
+        assert results[0].success is False
+        assert "Host unavailable" in results[0].error
+        assert crawler.fetched == 0
+        assert crawler.failures == ["https://dead.example.com/a"]
+
+
+class TestRunPipeline:
+    @pytest.fixture
+    def server_url(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+        server.shutdown()
+        server.server_close()
+
+    def test_streams_results_to_the_report(self, server_url, tmp_path):
+        """Test a streaming crawl end to end against a local server"""
+        crawler = WebCrawler(db_manager=LocalStore(known_urls=[f"{server_url}/known"]))
+        output = tmp_path / "results.json"
+        writer = ResultWriter(str(output))
+
+        summary = crawler.run_pipeline(iter([f"{server_url}/known", f"{server_url}/page"]), writer)
+        writer.close(summary)
+        crawler.close()
+
+        data = json.loads(output.read_text())
+        assert data["total_urls"] == 2
+        assert data["pipeline"]["read"] == 2
+        by_url = {r["url"]: r for r in data["results"]}
+        assert by_url[f"{server_url}/known"]["error"] == "URL already exists"
+        assert by_url[f"{server_url}/page"]["status_code"] == 200
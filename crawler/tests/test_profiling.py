@@ -0,0 +1,59 @@
+import pstats
+import threading
+import time
+from crawler.profiling import Profiler
+
+
+def busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(100))
+    return total
+
+
+class TestProfiler:
+    def test_sample_mode_writes_collapsed_stacks(self, tmp_path):
+        """Test that sampled stacks name the busy function"""
+        prefix = str(tmp_path / "reports" / "results")
+        profiler = Profiler(prefix, mode="sample", interval=0.001)
+
+        profiler.start()
+        busy_loop(0.2)
+        profiler.stop()
+
+        lines = (tmp_path / "reports" / "results.collapsed.txt").read_text().splitlines()
+        assert any("test_profiling:busy_loop" in line for line in lines)
+        stack, count = lines[0].rsplit(" ", 1)
+        assert stack.startswith("MainThread;") and int(count) > 0
+        assert not (tmp_path / "reports" / "results.pstats").exists()
+
+    def test_cprofile_and_memory_reports(self, tmp_path):
+        """Test that pstats, the text summary and the allocation report are written"""
+        prefix = str(tmp_path / "results")
+        profiler = Profiler(prefix, mode="cprofile", memory=True, top_n=5)
+
+        profiler.start()
+        data = [bytearray(1024) for _ in range(1000)]
+        busy_loop(0.05)
+        profiler.stop()
+        profiler.stop()
+
+        assert (tmp_path / "results.pstats").stat().st_size > 0
+        assert "busy_loop" in (tmp_path / "results.profile.txt").read_text()
+        assert "test_profiling.py" in (tmp_path / "results.alloc.txt").read_text()
+        assert len(data) == 1000
+
+    def test_cprofile_covers_worker_threads(self, tmp_path):
+        """Test that functions run only in other threads are in the pstats"""
+        prefix = str(tmp_path / "results")
+        profiler = Profiler(prefix, mode="cprofile")
+
+        profiler.start()
+        worker = threading.Thread(target=busy_loop, args=(0.05,))
+        worker.start()
+        worker.join()
+        profiler.stop()
+
+        functions = {name for _, _, name in pstats.Stats(f"{prefix}.pstats").stats}
+        assert "busy_loop" in functions
@@ -0,0 +1,49 @@
+import pytest
+from crawler.relevance import RelevanceScorer, _hash_term
+
+RELEVANT = "Summer camp for international students. Our study abroad program offers language courses."
+IRRELEVANT = "Shopping cart: free shipping on all orders, add items and checkout today."
+
+
+class TestRelevanceScorer:
+    @pytest.fixture
+    def scorer(self):
+        return RelevanceScorer()
+
+    def test_batch_scoring_matches_single_pages(self, scorer):
+        """Test that scoring a batch equals scoring each page alone"""
+        batch = scorer.score_texts([RELEVANT, IRRELEVANT, ""])
+
+        assert batch[0] == pytest.approx(scorer.score_texts([RELEVANT])[0])
+        assert batch[1] == pytest.approx(scorer.score_texts([IRRELEVANT])[0])
+        assert batch[2] == 0
+
+    def test_relevance_decisions(self, scorer):
+        """Test that camp pages pass and shop pages do not"""
+        assert scorer.is_relevant([RELEVANT, IRRELEVANT, ""]) == [True, False, False]
+
+    def test_bigram_terms(self):
+        """Test that two-word terms only match adjacent words"""
+        scorer = RelevanceScorer({"summer camp": 1.0}, threshold=0.5)
+
+        assert scorer.is_relevant(["a summer camp", "camp in summer", "summer\ncamp"]) == [True, False, True]
+
+    def test_bigrams_do_not_span_pages(self):
+        """Test that the last word of one page and first of the next are not joined"""
+        scorer = RelevanceScorer({"summer camp": 1.0}, threshold=0.5)
+
+        assert scorer.is_relevant(["we love summer", "camp starts"]) == [False, False]
+
+    def test_long_terms_rejected(self):
+        """Test that terms longer than two words are refused"""
+        with pytest.raises(ValueError):
+            _hash_term("add to cart")
+
+    def test_calibrate_separates_labelled_pages(self, scorer):
+        """Test that calibration picks a threshold splitting the labelled sets"""
+        result = scorer.calibrate([RELEVANT, RELEVANT + " summer school"], [IRRELEVANT, "casino bonus"])
+
+        assert result["f1"] == pytest.approx(1.0)
+        assert result["pages"] == 4
+        scores = scorer.score_texts([RELEVANT, IRRELEVANT])
+        assert scores[1] < result["threshold"] <= scores[0]
@@ -0,0 +1,84 @@
+import asyncio
+import pytest
+from crawler.aio import BackgroundLoop
+from crawler.renderer import is_spa_shell, visible_text_length
+
+ARTICLE = "<p>" + "Our summer camp offers language courses for international students. " * 5 + "</p>"
+
+RENDERED = f"""<html><head><title>Summer Camp</title></head>
+<body><h1>Summer Camp</h1>{ARTICLE}</body></html>"""
+
+
+class FakeRenderer:
+    def __init__(self, html):
+        self.html = html
+        self.urls = []
+
+    def render(self, url):
+        self.urls.append(url)
+        return self.html
+
+    def stats(self):
+        return {"rendered": len(self.urls)}
+
+
+class FakeResponse:
+    encoding = "utf-8"
+
+
+class TestSpaDetection:
+    @pytest.mark.parametrize("html", [
+        '<html><body><div id="root"></div><script src="/main.js"></script></body></html>',
+        '<html><body><div id="__next"></div></body></html>',
+        '<html><body><app-root></app-root></body></html>',
+        '<html><body><noscript>You need to enable JavaScript to run this app.</noscript></body></html>',
+        '<html><body><script>boot()</script><p>Loading</p></body></html>',
+    ])
+    def test_shells_are_detected(self, html):
+        """Test framework roots, noscript notices and empty scripted pages"""
+        assert is_spa_shell(html) is True
+
+    def test_server_rendered_page_is_not_a_shell(self):
+        """Test that pages with real text are left to the fast path"""
+        html = f'<html><body><div id="root">{ARTICLE}</div><script src="/main.js"></script></body></html>'
+
+        assert is_spa_shell(html) is False
+        assert is_spa_shell('<html><body><p>Short static page about camps.</p></body></html>') is False
+
+    def test_scripts_and_styles_are_not_visible_text(self):
+        """Test the parse-free visible text estimate"""
+        html = "<html><head><title>x</title></head><body><script>var a = 'long text';</script><style>p{}</style>Hello <b>world</b></body></html>"
+
+        assert visible_text_length(html) == len("Hello world")
+
+
+class TestBackgroundLoop:
+    def test_runs_coroutines_from_sync_code(self):
+        """Test submitting a coroutine to the background loop"""
+        async def add(a, b):
+            await asyncio.sleep(0)
+            return a + b
+
+        aio = BackgroundLoop()
+        try:
+            assert aio.run(add(1, 2), timeout=5) == 3
+        finally:
+            aio.stop()
+
+
+class TestRenderFallback:
+    def test_only_shells_are_rendered(self):
+        """Test that shells go through the renderer and static pages do not"""
+        from crawler.crawler import WebCrawler
+        from crawler.local_store import LocalStore
+
+        renderer = FakeRenderer(RENDERED)
+        crawler = WebCrawler(db_manager=LocalStore(), renderer=renderer)
+
+        shell = b'<html><head><title>App</title></head><body><div id="root"></div></body></html>'
+        campsite = crawler._extract(shell, FakeResponse(), "https://spa.example.com/camp")
+        assert renderer.urls == ["https://spa.example.com/camp"]
+        assert campsite is not None and campsite.name == "Summer Camp"
+
+        crawler._extract(RENDERED.encode(), FakeResponse(), "https://static.example.com/camp")
+        assert renderer.urls == ["https://spa.example.com/camp"]
@@ -0,0 +1,104 @@
+import json
+from crawler.models import CampsiteData, CrawlResult
+from crawler.results import ResultBuffer, ResultWriter
+
+
+class TestResultBuffer:
+    def make_results(self):
+        return [
+            CrawlResult(
+                url="https://camp.example.com/a",
+                success=True,
+                campsite_data=CampsiteData(name="A Camp", url="https://camp.example.com/a"),
+                status_code=200,
+                processing_time=1.25
+            ),
+            CrawlResult(url="https://camp.example.com/b", success=False, status_code=200, processing_time=0.5),
+            CrawlResult(url="https://camp.example.com/c", success=False, error="URL already exists"),
+            CrawlResult(url="https://camp.example.com/d", success=False, error="URL already exists"),
+        ]
+
+    def test_round_trip_matches_to_dict(self):
+        """Test that buffered results serialise like CrawlResult.to_dict"""
+        results = self.make_results()
+        buffer = ResultBuffer()
+        for result in results:
+            buffer.append(result)
+
+        assert list(buffer) == [r.to_dict() for r in results]
+
+    def test_summary_counters(self):
+        """Test that summary counters are maintained on append"""
+        buffer = ResultBuffer()
+        for result in self.make_results():
+            buffer.append(result)
+
+        summary = buffer.summary()
+
+        assert summary["total_urls"] == 4
+        assert summary["successful"] == 1
+        assert summary["failed"] == 3
+        assert summary["success_rate"] == 25.0
+        assert summary["campsites_found"] == 1
+
+    def test_errors_are_interned(self):
+        """Test that repeated error messages are stored once"""
+        buffer = ResultBuffer()
+        for result in self.make_results():
+            buffer.append(result)
+
+        assert buffer.errors == ["URL already exists"]
+
+    def test_empty_buffer(self):
+        """Test summary of an empty buffer"""
+        summary = ResultBuffer().summary()
+
+        assert summary["total_urls"] == 0
+        assert summary["success_rate"] == 0.0
+
+    def test_save_results_streams_valid_json(self, tmp_path):
+        """Test that the report written from a buffer is valid JSON"""
+        from crawler.main import save_results
+
+        buffer = ResultBuffer()
+        for result in self.make_results():
+            buffer.append(result)
+        summary = buffer.summary()
+        summary["results"] = buffer
+        output = tmp_path / "results.json"
+
+        save_results(summary, str(output))
+
+        data = json.loads(output.read_text())
+        assert data["total_urls"] == 4
+        assert len(data["results"]) == 4
+        assert data["results"][0]["campsite_found"] is True
+
+
+class TestResultWriter:
+    def test_writes_valid_json_incrementally(self, tmp_path):
+        """Test that streamed results and the closing summary form one report"""
+        output = tmp_path / "results.json"
+        writer = ResultWriter(str(output))
+        for result in TestResultBuffer().make_results():
+            writer.append(result)
+
+        summary = writer.summary()
+        summary["total_time"] = 1.5
+        writer.close(summary)
+        writer.close()
+
+        data = json.loads(output.read_text())
+        assert data["total_urls"] == 4
+        assert data["campsites_found"] == 1
+        assert data["total_time"] == 1.5
+        assert len(data["results"]) == 4
+
+    def test_empty_report(self, tmp_path):
+        """Test that a writer closed without results is still valid JSON"""
+        output = tmp_path / "results.json"
+        ResultWriter(str(output)).close()
+
+        data = json.loads(output.read_text())
+        assert data["results"] == []
+        assert data["total_urls"] == 0
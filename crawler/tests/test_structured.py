@@ -0,0 +1,91 @@
+import pytest
+from bs4 import BeautifulSoup
+from crawler.extractors import ContentExtractor
+from crawler.structured import parse_json_ld, structured_fields
+
+COURSE_PAGE = """
+<html><head>
+<title>Oxford Summer School | Example Education</title>
+<meta property="og:image" content="/img/og.jpg">
+<script type="application/ld+json">
+{"@context": "https://schema.org", "@graph": [
+  {"@type": "EducationalOrganization", "name": "Example Education",
+   "address": {"@type": "PostalAddress", "addressCountry": "US"}},
+  {"@type": "Course", "name": "Oxford Summer School",
+   "description": "A three-week residential summer school for international students aged 14-17 in Oxford.",
+   "image": {"@type": "ImageObject", "url": "https://cdn.example.com/oxford.jpg"},
+   "provider": {"@type": "Organization", "address": {"addressCountry": "GB"}}}
+]}
+</script>
+<script type="application/ld+json">{not json</script>
+</head><body>
+<h1>Welcome</h1>
+<p>Study abroad this summer camp season with international students from Japan.</p>
+</body></html>
+"""
+
+
+class TestStructuredData:
+    def test_json_ld_graph_is_flattened(self):
+        """Test that @graph entities are found, programs first, malformed blocks skipped"""
+        entities = parse_json_ld(BeautifulSoup(COURSE_PAGE, 'lxml'))
+
+        assert [entity["@type"] for entity in entities] == ["Course", "EducationalOrganization"]
+
+    def test_fields_from_course(self):
+        """Test field mapping, including nested provider country codes"""
+        fields = structured_fields(BeautifulSoup(COURSE_PAGE, 'lxml'))
+
+        assert fields["name"] == "Oxford Summer School"
+        assert fields["country"] == "United Kingdom"
+        assert fields["thumbnail_src"] == "https://cdn.example.com/oxford.jpg"
+        assert fields["_sources"] == ["json_ld", "open_graph"]
+
+    def test_open_graph_image_without_json_ld(self):
+        """Test the OpenGraph fallback"""
+        html = '<html><head><meta property="og:image" content="/hero.jpg"></head><body></body></html>'
+
+        fields = structured_fields(BeautifulSoup(html, 'lxml'))
+
+        assert fields["thumbnail_src"] == "/hero.jpg"
+        assert fields["_sources"] == ["open_graph"]
+
+    def test_open_graph_name_and_description(self):
+        """Test that og:title and og:description fill in only what JSON-LD lacks"""
+        html = (
+            '<html><head><meta property="og:title" content="Lakeside Camp">'
+            '<meta property="og:description" content="Two weeks of sailing for ages 10-14.">'
+            '</head><body></body></html>'
+        )
+
+        fields = structured_fields(BeautifulSoup(html, 'lxml'))
+
+        assert fields["name"] == "Lakeside Camp"
+        assert fields["description"] == "Two weeks of sailing for ages 10-14."
+        assert structured_fields(BeautifulSoup(COURSE_PAGE.replace(
+            '<meta property="og:image"', '<meta property="og:title" content="Other"><meta property="og:image"'
+        ), 'lxml'))["name"] == "Oxford Summer School"
+
+
+class TestStructuredFastPath:
+    @pytest.fixture
+    def extractor(self):
+        return ContentExtractor()
+
+    def test_structured_fields_override_text_heuristics(self, extractor):
+        """Test that JSON-LD wins over the h1 and full-text country guess"""
+        campsite = extractor.extract_campsite_data(COURSE_PAGE, "https://example.com/oxford")
+
+        assert campsite.name == "Oxford Summer School"
+        assert campsite.country == "United Kingdom"
+        assert campsite.category == "summer"
+        assert campsite.description.startswith("A three-week residential summer school")
+        assert campsite.thumbnail_url == "https://cdn.example.com/oxford.jpg"
+
+    def test_hit_statistics(self, extractor):
+        """Test that fast path hits are counted"""
+        extractor.extract_campsite_data(COURSE_PAGE, "https://example.com/oxford")
+
+        assert extractor.structured_stats["pages"] == 1
+        assert extractor.structured_stats["json_ld"] == 1
+        assert extractor.structured_stats["full_hits"] == 1
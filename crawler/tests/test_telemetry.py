@@ -0,0 +1,81 @@
+import json
+import urllib.request
+import pytest
+from crawler.models import CampsiteData, CrawlResult
+from crawler.telemetry import CrawlTelemetry, StatusReporter, format_duration
+from crawler.tests.test_throttle import FakeClock
+
+
+def result(url, success=True, campsite=False):
+    data = CampsiteData(name="Camp", url=url) if campsite else None
+    return CrawlResult(url=url, success=success, campsite_data=data, error=None if success else "boom")
+
+
+class TestCrawlTelemetry:
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    def test_counters(self, clock):
+        """Test that totals and per-host counters follow the recorded results"""
+        telemetry = CrawlTelemetry(clock=clock)
+        telemetry.record_bytes("https://a.example.com/1", 2048)
+        telemetry.record(result("https://a.example.com/1", campsite=True))
+        telemetry.record(result("https://a.example.com/2"))
+        telemetry.record(result("https://b.example.com/1", success=False))
+
+        snapshot = telemetry.snapshot()
+        assert (snapshot["crawled"], snapshot["successful"], snapshot["failed"]) == (3, 2, 1)
+        assert snapshot["campsites"] == 1
+        assert snapshot["bytes"] == 2048
+        assert snapshot["top_hosts"][0]["host"] == "a.example.com"
+        assert snapshot["top_hosts"][0]["urls"] == 2
+
+    def test_rate_and_eta_use_the_recent_window(self, clock):
+        """Test that old URLs drop out of the rate and the ETA follows the current pace"""
+        telemetry = CrawlTelemetry(window=10, clock=clock)
+        telemetry.expect(100)
+        for _ in range(50):
+            telemetry.record(result("https://a.example.com/"))
+        clock.advance(30)
+        for _ in range(10):
+            clock.advance(1)
+            telemetry.record(result("https://a.example.com/"))
+
+        assert telemetry.rate() == pytest.approx(1.0)
+        assert telemetry.eta() == pytest.approx(40.0)
+
+    def test_status_line(self, clock):
+        """Test the compact status line"""
+        telemetry = CrawlTelemetry(clock=clock)
+        telemetry.expect(4)
+        telemetry.record(result("https://a.example.com/", campsite=True))
+        clock.advance(2)
+
+        line = telemetry.status_line()
+
+        assert line.startswith("1/4 (25.0%) URLs | 1 ok, 0 failed | 1 campsites | 0 B | 0.5 URLs/s | ETA 6s")
+        assert "a.example.com" in line
+
+    def test_format_duration(self):
+        """Test durations in the status line"""
+        assert [format_duration(s) for s in (12, 460, 3720)] == ["12s", "7m40s", "1h02m"]
+
+
+class TestStatusReporter:
+    def test_serves_status(self):
+        """Test the local status endpoint"""
+        telemetry = CrawlTelemetry()
+        telemetry.record(result("https://a.example.com/"))
+        reporter = StatusReporter(telemetry, interval=0, port=0)
+        reporter.start()
+        try:
+            with urllib.request.urlopen(f"{reporter.address}/status") as response:
+                status = json.load(response)
+            with urllib.request.urlopen(f"{reporter.address}/") as response:
+                line = response.read().decode()
+        finally:
+            reporter.stop()
+
+        assert status["crawled"] == 1
+        assert line.startswith("1 URLs")
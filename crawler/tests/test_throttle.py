@@ -0,0 +1,186 @@
+import pytest
+from datetime import datetime, timezone
+from crawler.config import (
+    REQUEST_DELAY, MIN_REQUEST_DELAY, CIRCUIT_BREAKER_THRESHOLD,
+    CIRCUIT_BREAKER_COOLDOWN, CIRCUIT_BREAKER_MAX_TRIPS,
+)
+from crawler.throttle import HostThrottle, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class TestParseRetryAfter:
+    def test_delta_seconds(self):
+        """Test Retry-After given in seconds"""
+        assert parse_retry_after("120") == 120.0
+
+    def test_http_date(self):
+        """Test Retry-After given as an HTTP date"""
+        now = datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+        assert parse_retry_after("Mon, 01 Jan 2024 12:00:30 GMT", now=now) == 30.0
+
+    def test_invalid_value(self):
+        """Test that unparseable values are ignored"""
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+
+
+class TestHostThrottle:
+    URL = "https://camp.example.com/programs"
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def throttle(self, clock):
+        return HostThrottle(clock=clock)
+
+    def fail(self, throttle, clock, times):
+        for _ in range(times):
+            clock.advance(throttle.wait_time(self.URL))
+            assert throttle.acquire(self.URL, block=False)
+            throttle.release(self.URL, failed=True)
+
+    def test_delay_applies_per_host(self, throttle, clock):
+        """Test that pacing one host does not delay another"""
+        assert throttle.acquire(self.URL, block=False)
+        throttle.release(self.URL, 200)
+
+        assert throttle.acquire(self.URL, block=False) is False
+        assert throttle.acquire("https://other.example.org/", block=False) is True
+
+    def test_success_decreases_delay_and_widens_window(self, throttle, clock):
+        """Test additive increase after successful requests"""
+        for _ in range(20):
+            clock.advance(throttle.wait_time(self.URL))
+            assert throttle.acquire(self.URL, block=False)
+            throttle.release(self.URL, 200)
+
+        state = throttle.hosts["camp.example.com"]
+        assert state.delay == pytest.approx(MIN_REQUEST_DELAY)
+        assert state.window > 1
+
+    def test_throttling_backs_off_multiplicatively(self, throttle, clock):
+        """Test multiplicative decrease on a 503"""
+        assert throttle.acquire(self.URL, block=False)
+        throttle.release(self.URL, 503)
+
+        state = throttle.hosts["camp.example.com"]
+        assert state.delay == pytest.approx(REQUEST_DELAY * 2)
+        assert state.window == 1
+
+    def test_retry_after_is_honoured(self, throttle, clock):
+        """Test that Retry-After pushes back the next request"""
+        assert throttle.acquire(self.URL, block=False)
+        throttle.release(self.URL, 429, retry_after="30")
+
+        assert throttle.wait_time(self.URL) == pytest.approx(30)
+
+    def test_not_found_is_not_a_host_failure(self, throttle, clock):
+        """Test that page-level errors do not count against the host"""
+        for _ in range(CIRCUIT_BREAKER_THRESHOLD):
+            clock.advance(throttle.wait_time(self.URL))
+            assert throttle.acquire(self.URL, block=False)
+            throttle.release(self.URL, 404)
+
+        assert throttle.is_suspended(self.URL) is False
+
+    def test_circuit_opens_after_consecutive_failures(self, throttle, clock):
+        """Test that repeated failures suspend the host"""
+        self.fail(throttle, clock, CIRCUIT_BREAKER_THRESHOLD)
+
+        assert throttle.is_suspended(self.URL) is True
+        assert throttle.acquire(self.URL) is False
+        assert throttle.is_suspended("https://other.example.org/") is False
+
+    def test_half_open_probe_closes_circuit(self, throttle, clock):
+        """Test that a successful probe after the cooldown resumes the host"""
+        self.fail(throttle, clock, CIRCUIT_BREAKER_THRESHOLD)
+        clock.advance(CIRCUIT_BREAKER_COOLDOWN)
+
+        assert throttle.acquire(self.URL, block=False) is True
+        # Only a single probe may be in flight
+        assert throttle.is_suspended(self.URL) is True
+
+        throttle.release(self.URL, 200)
+
+        assert throttle.is_suspended(self.URL) is False
+        assert throttle.hosts["camp.example.com"].trips == 0
+
+    def test_failed_probe_extends_cooldown(self, throttle, clock):
+        """Test that a failed probe reopens the circuit for longer"""
+        self.fail(throttle, clock, CIRCUIT_BREAKER_THRESHOLD)
+        clock.advance(CIRCUIT_BREAKER_COOLDOWN)
+
+        assert throttle.acquire(self.URL, block=False)
+        throttle.release(self.URL, failed=True)
+
+        assert throttle.is_suspended(self.URL) is True
+        assert throttle.wait_time(self.URL) == pytest.approx(CIRCUIT_BREAKER_COOLDOWN * 2)
+
+    def test_host_abandoned_after_max_trips(self, throttle, clock):
+        """Test that a host is given up after repeated trips"""
+        self.fail(throttle, clock, CIRCUIT_BREAKER_THRESHOLD)
+        for _ in range(CIRCUIT_BREAKER_MAX_TRIPS - 1):
+            clock.advance(throttle.wait_time(self.URL))
+            assert throttle.acquire(self.URL, block=False)
+            throttle.release(self.URL, failed=True)
+
+        clock.advance(CIRCUIT_BREAKER_COOLDOWN * 100)
+
+        assert throttle.is_abandoned(self.URL) is True
+        assert throttle.acquire(self.URL, block=False) is False
+
+
+class TestIterCrawlPacing:
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def crawler(self, clock):
+        from crawler.crawler import WebCrawler
+        from crawler.local_store import LocalStore
+        from crawler.models import CrawlResult
+
+        crawler = WebCrawler(db_manager=LocalStore())
+        crawler.throttle = HostThrottle(clock=clock)
+
+        def fetch_page(url):
+            assert crawler.throttle.acquire(url, block=False), f"{url} crawled while its host was waiting"
+            crawler.throttle.release(url, 200)
+            return CrawlResult(url=url, success=False, error="Not relevant", processing_time=0.0)
+
+        crawler.fetch_page = fetch_page
+        return crawler
+
+    def test_backing_off_host_does_not_block_others(self, crawler, monkeypatch):
+        """Test that URLs on other hosts are crawled while one host waits out a Retry-After"""
+        slow = "https://slow.example.com/a"
+        assert crawler.throttle.acquire(slow)
+        crawler.throttle.release(slow, 429, "30")
+        monkeypatch.setattr("crawler.crawler.time.sleep", lambda seconds: pytest.fail("crawl thread slept"))
+
+        results = crawler.iter_crawl([slow, "https://fast.example.com/a", "https://other.example.com/a"])
+
+        assert [next(results).url for _ in range(2)] == ["https://fast.example.com/a", "https://other.example.com/a"]
+
+    def test_sleeps_only_when_every_host_waits(self, crawler, clock, monkeypatch):
+        """Test that the crawl sleeps until the earliest host is ready, then crawls it"""
+        urls = ["https://a.example.com/1", "https://b.example.com/1", "https://a.example.com/2"]
+        slept = []
+        monkeypatch.setattr("crawler.crawler.time.sleep", lambda seconds: slept.append(seconds) or clock.advance(seconds))
+
+        assert [result.url for result in crawler.iter_crawl(urls)] == urls
+        assert slept == [pytest.approx(REQUEST_DELAY)]
@@ -0,0 +1,215 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+import requests
+from .config import (
+    REQUEST_DELAY, MIN_REQUEST_DELAY, MAX_REQUEST_DELAY, DELAY_DECREASE_STEP,
+    DELAY_BACKOFF_FACTOR, MAX_HOST_CONCURRENCY, CIRCUIT_BREAKER_THRESHOLD,
+    CIRCUIT_BREAKER_COOLDOWN, CIRCUIT_BREAKER_MAX_TRIPS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Responses that mean the host (not the page) is struggling
+THROTTLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class HostUnavailableError(requests.exceptions.ConnectionError):
+    """Raised when a request targets a host whose circuit breaker is open"""
+
+
+def parse_retry_after(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds"""
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (retry_at - now).total_seconds())
+
+
+@dataclass
+class HostState:
+    """Health and pacing state for a single host"""
+    delay: float = REQUEST_DELAY
+    window: float = 1.0  # AIMD concurrency window
+    in_flight: int = 0
+    next_request_at: float = 0.0
+    consecutive_failures: int = 0
+    trips: int = 0
+    open_until: float = 0.0
+    probing: bool = False
+    requests: int = 0
+    failures: int = 0
+
+
+class HostThrottle:
+    """Per-host adaptive rate control with a circuit breaker
+
+    Each host gets its own request delay and concurrency window, adjusted
+    AIMD-style: successes shrink the delay and widen the window additively,
+    throttling responses and connection failures back both off
+    multiplicatively. ``Retry-After`` pushes the host's next slot out.
+    After ``CIRCUIT_BREAKER_THRESHOLD`` consecutive failures the host is
+    suspended for a cooldown, then a single probe request decides whether
+    it is closed again or suspended for longer.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.hosts: Dict[str, HostState] = {}
+        self._condition = threading.Condition()
+
+    @staticmethod
+    def host_for(url: str) -> str:
+        """Return the throttling key for a URL"""
+        return urlparse(url).netloc.lower()
+
+    def _state(self, url: str) -> HostState:
+        host = self.host_for(url)
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = HostState()
+        return state
+
+    def _is_blocked(self, state: HostState, now: float) -> bool:
+        """True while the circuit is open and no probe may be sent"""
+        if state.trips >= CIRCUIT_BREAKER_MAX_TRIPS and state.open_until > 0:
+            return True
+        if state.open_until > now:
+            return True
+        return state.probing and state.in_flight > 0
+
+    def is_suspended(self, url: str) -> bool:
+        """Check whether requests to the URL's host are currently suspended"""
+        with self._condition:
+            return self._is_blocked(self._state(url), self.clock())
+
+    def is_abandoned(self, url: str) -> bool:
+        """Check whether the URL's host has tripped too often to retry this run"""
+        with self._condition:
+            state = self._state(url)
+            return state.trips >= CIRCUIT_BREAKER_MAX_TRIPS and state.open_until > 0
+
+    def wait_time(self, url: str) -> float:
+        """Seconds until the URL's host may receive another request"""
+        with self._condition:
+            state = self._state(url)
+            ready_at = max(state.next_request_at, state.open_until)
+            return max(0.0, ready_at - self.clock())
+
+    def acquire(self, url: str, block: bool = True) -> bool:
+        """Reserve a request slot for the URL's host
+
+        Returns False if the host is suspended by the circuit breaker (or,
+        when ``block`` is False, if no slot is free right now).
+        """
+        with self._condition:
+            state = self._state(url)
+
+            while True:
+                now = self.clock()
+                if self._is_blocked(state, now):
+                    return False
+
+                if state.open_until and state.open_until <= now:
+                    # Cooldown elapsed: half-open, let a single probe through
+                    state.open_until = 0.0
+                    state.probing = True
+
+                limit = 1 if state.probing else int(state.window)
+                if state.in_flight < limit and now >= state.next_request_at:
+                    state.in_flight += 1
+                    state.requests += 1
+                    state.next_request_at = now + state.delay
+                    return True
+
+                if not block:
+                    return False
+
+                timeout = state.next_request_at - now if state.in_flight < limit else None
+                self._condition.wait(timeout)
+
+    def release(self, url: str, status_code: Optional[int] = None,
+                retry_after: Optional[str] = None, failed: bool = False):
+        """Record the outcome of a request and adapt the host's pacing
+
+        ``failed`` marks transport-level failures (timeouts, refused or reset
+        connections). HTTP responses other than 429/5xx count as healthy:
+        a 404 is a page problem, not a host problem.
+        """
+        host = self.host_for(url)
+        with self._condition:
+            state = self._state(url)
+            now = self.clock()
+            state.in_flight = max(0, state.in_flight - 1)
+
+            if failed or status_code in THROTTLE_STATUS_CODES:
+                self._on_failure(host, state, now, parse_retry_after(retry_after))
+            else:
+                self._on_success(host, state)
+
+            self._condition.notify_all()
+
+    def _on_success(self, host: str, state: HostState):
+        state.consecutive_failures = 0
+        state.delay = max(MIN_REQUEST_DELAY, state.delay - DELAY_DECREASE_STEP)
+        state.window = min(MAX_HOST_CONCURRENCY, state.window + 1 / state.window)
+
+        if state.probing:
+            state.probing = False
+            state.trips = 0
+            logger.info(f"Circuit closed for {host} after successful probe")
+
+    def _on_failure(self, host: str, state: HostState, now: float, retry_after: Optional[float]):
+        state.failures += 1
+        state.consecutive_failures += 1
+        state.delay = min(MAX_REQUEST_DELAY, state.delay * DELAY_BACKOFF_FACTOR)
+        state.window = max(1.0, state.window / 2)
+
+        pause = state.delay
+        if retry_after is not None:
+            pause = min(MAX_REQUEST_DELAY, max(pause, retry_after))
+        state.next_request_at = max(state.next_request_at, now + pause)
+
+        if state.probing or state.consecutive_failures >= CIRCUIT_BREAKER_THRESHOLD:
+            state.probing = False
+            state.trips += 1
+            cooldown = CIRCUIT_BREAKER_COOLDOWN * 2 ** (state.trips - 1)
+            state.open_until = now + cooldown
+            state.consecutive_failures = 0
+            logger.warning(
+                f"Circuit opened for {host} (trip {state.trips}/{CIRCUIT_BREAKER_MAX_TRIPS}), "
+                f"suspending for {cooldown:.0f}s"
+            )
+
+    def snapshot(self) -> dict:
+        """Summarise per-host health for reporting"""
+        with self._condition:
+            now = self.clock()
+            return {
+                host: {
+                    "requests": state.requests,
+                    "failures": state.failures,
+                    "delay": round(state.delay, 3),
+                    "window": round(state.window, 2),
+                    "suspended": self._is_blocked(state, now),
+                    "trips": state.trips,
+                }
+                for host, state in self.hosts.items()
+            }
@@ -6,6 +6,10 @@ import {
   GlobeAltIcon,
   ChatBubbleLeftRightIcon,
   ExclamationTriangleIcon,
+  ClockIcon,
+  MapIcon,
+  TagIcon,
+  ArrowPathIcon,
 } from '@heroicons/react/24/outline'
 import { AdminLayout } from '@/components/admin/AdminLayout'
 import { StatsCard } from '@/components/admin/StatsCard'
@@ -35,6 +39,11 @@ interface User {
   created_at: string
 }
 
+function topEntry(counts: Record<string, number>): string {
+  const [name, count] = Object.entries(counts).sort((a, b) => b[1] - a[1])[0] || []
+  return name ? `${name} (${count})` : '-'
+}
+
 export default function AdminDashboard() {
   const { t } = useTranslation()
   const [stats, setStats] = useState<AdminStats | null>(null)
@@ -116,6 +125,40 @@ export default function AdminDashboard() {
           </div>
         )}
 
+        {/* Crawl Stats */}
+        {stats?.crawl && (
+          <div className="grid grid-cols-1 gap-5 sm:grid-cols-2 lg:grid-cols-4">
+            <StatsCard
+              title={t('admin.stats.lastCrawl')}
+              value={
+                stats.crawl.lastCrawledAt
+                  ? formatDistanceToNow(new Date(stats.crawl.lastCrawledAt), { addSuffix: true })
+                  : t('admin.stats.never')
+              }
+              icon={ClockIcon}
+              color="blue"
+            />
+            <StatsCard
+              title={t('admin.stats.countriesCovered')}
+              value={Object.keys(stats.crawl.countries).length}
+              icon={MapIcon}
+              color="green"
+            />
+            <StatsCard
+              title={t('admin.stats.topCategory')}
+              value={topEntry(stats.crawl.categories)}
+              icon={TagIcon}
+              color="purple"
+            />
+            <StatsCard
+              title={t('admin.stats.pendingRetries')}
+              value={stats.crawl.pendingRetries}
+              icon={ArrowPathIcon}
+              color="yellow"
+            />
+          </div>
+        )}
+
         <div className="grid grid-cols-1 lg:grid-cols-2 gap-6">
           {/* Recent Comments */}
           <div className="bg-white shadow rounded-lg">
@@ -14,23 +14,55 @@ export type Report = Database['public']['Tables']['reports']['Row'] & {
   } | null
 }
 
+export interface CrawlStatistics {
+  totalCampsites: number
+  categories: Record<string, number>
+  countries: Record<string, number>
+  lastUpdated: string | null
+  lastCrawledAt: string | null
+  pendingRetries: number
+  permanentFailures: number
+}
+
 export interface AdminStats {
   totalCampsites: number
   totalUsers: number
   totalComments: number
   totalReports: number
   pendingReports: number
+  crawl?: CrawlStatistics
+}
+
+// Aggregated server-side by the get_crawl_statistics() SQL function
+export async function getCrawlStatistics(): Promise<CrawlStatistics> {
+  const { data, error } = await supabase.rpc('get_crawl_statistics')
+
+  if (error) {
+    throw new Error(error.message)
+  }
+
+  const stats = (data || {}) as Record<string, any>
+
+  return {
+    totalCampsites: stats.total_campsites || 0,
+    categories: stats.categories || {},
+    countries: stats.countries || {},
+    lastUpdated: stats.last_updated || null,
+    lastCrawledAt: stats.last_crawled_at || null,
+    pendingRetries: stats.pending_retries || 0,
+    permanentFailures: stats.permanent_failures || 0,
+  }
 }
 
 export async function getAdminStats(): Promise<AdminStats> {
   const [
-    { count: totalCampsites },
+    crawl,
     { count: totalUsers },
     { count: totalComments },
     { count: totalReports },
     { count: pendingReports },
   ] = await Promise.all([
-    supabase.from('campsites').select('*', { count: 'exact', head: true }),
+    getCrawlStatistics(),
     supabase.from('users').select('*', { count: 'exact', head: true }),
     supabase.from('comments').select('*', { count: 'exact', head: true }),
     supabase.from('reports').select('*', { count: 'exact', head: true }),
@@ -38,11 +70,12 @@ export async function getAdminStats(): Promise<AdminStats> {
   ])
 
   return {
-    totalCampsites: totalCampsites || 0,
+    totalCampsites: crawl.totalCampsites,
     totalUsers: totalUsers || 0,
     totalComments: totalComments || 0,
     totalReports: totalReports || 0,
     pendingReports: pendingReports || 0,
+    crawl,
   }
 }
 
@@ -0,0 +1,26 @@
+-- Failed crawl tracking: the crawler skips permanently failed URLs and
+-- retries transient failures on an exponential schedule
+
+CREATE TABLE public.crawl_failures (
+  url TEXT PRIMARY KEY,
+  error_type TEXT NOT NULL,
+  error TEXT,
+  status_code INTEGER,
+  permanent BOOLEAN DEFAULT FALSE,
+  attempts INTEGER DEFAULT 1,
+  first_failed_at TIMESTAMPTZ DEFAULT NOW(),
+  last_failed_at TIMESTAMPTZ DEFAULT NOW(),
+  next_attempt_at TIMESTAMPTZ
+);
+
+-- Enable RLS (the crawler uses the service key and bypasses it)
+ALTER TABLE public.crawl_failures ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Admins can view crawl failures" ON public.crawl_failures
+  FOR SELECT USING (
+    EXISTS (SELECT 1 FROM public.users WHERE id = auth.uid() AND role = 'admin')
+  );
+
+-- Due transient failures are picked up in next_attempt_at order
+CREATE INDEX idx_crawl_failures_next_attempt_at ON public.crawl_failures(next_attempt_at)
+  WHERE NOT permanent;
@@ -0,0 +1,31 @@
+-- Aggregated crawl statistics for the admin dashboard and the crawler's
+-- --stats mode, computed server-side in a single query
+
+CREATE OR REPLACE FUNCTION get_crawl_statistics()
+RETURNS JSONB AS $$
+  WITH grouped AS (
+    SELECT
+      COALESCE(category::TEXT, 'uncategorized') AS category,
+      COALESCE(country, 'Unknown') AS country,
+      COUNT(*) AS total,
+      MAX(updated_at) AS last_updated,
+      GROUPING(category) AS by_all_categories,
+      GROUPING(country) AS by_all_countries
+    FROM public.campsites
+    GROUP BY GROUPING SETS ((category), (country), ())
+  ),
+  failures AS (
+    SELECT
+      COUNT(*) FILTER (WHERE NOT permanent) AS pending_retries,
+      COUNT(*) FILTER (WHERE permanent) AS permanent_failures
+    FROM public.crawl_failures
+  )
+  SELECT jsonb_build_object(
+    'total_campsites', COALESCE((SELECT total FROM grouped WHERE by_all_categories = 1 AND by_all_countries = 1), 0),
+    'categories', COALESCE((SELECT jsonb_object_agg(category, total) FROM grouped WHERE by_all_categories = 0), '{}'::JSONB),
+    'countries', COALESCE((SELECT jsonb_object_agg(country, total) FROM grouped WHERE by_all_countries = 0), '{}'::JSONB),
+    'last_updated', (SELECT last_updated FROM grouped WHERE by_all_categories = 1 AND by_all_countries = 1),
+    'pending_retries', (SELECT pending_retries FROM failures),
+    'permanent_failures', (SELECT permanent_failures FROM failures)
+  );
+$$ LANGUAGE sql STABLE;
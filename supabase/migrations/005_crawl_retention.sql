@@ -0,0 +1,74 @@
+-- Crawl provenance and retention: the crawler records where rows came from
+-- and when it last saw them, so stale crawler rows can be cleaned up
+
+ALTER TABLE public.campsites
+  ADD COLUMN source TEXT DEFAULT 'manual',
+  ADD COLUMN last_crawled_at TIMESTAMPTZ DEFAULT NOW();
+
+-- Keyset pagination over stale crawler rows
+CREATE INDEX idx_campsites_crawler_last_crawled_at ON public.campsites(last_crawled_at, id)
+  WHERE source = 'crawler';
+
+-- Archived rows removed by the retention job
+CREATE TABLE public.campsites_archive (
+  LIKE public.campsites INCLUDING DEFAULTS,
+  archived_at TIMESTAMPTZ DEFAULT NOW(),
+  PRIMARY KEY (id)
+);
+
+ALTER TABLE public.campsites_archive ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Admins can view archived campsites" ON public.campsites_archive
+  FOR SELECT USING (
+    EXISTS (SELECT 1 FROM public.users WHERE id = auth.uid() AND role = 'admin')
+  );
+
+-- Recording that the crawler saw a row again is not a content change, so it
+-- must not bump updated_at
+CREATE OR REPLACE FUNCTION update_campsites_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF (to_jsonb(NEW) - 'last_crawled_at' - 'updated_at')
+     IS DISTINCT FROM (to_jsonb(OLD) - 'last_crawled_at' - 'updated_at') THEN
+    NEW.updated_at = NOW();
+  END IF;
+  RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER update_campsites_updated_at ON public.campsites;
+
+CREATE TRIGGER update_campsites_updated_at BEFORE UPDATE ON public.campsites
+  FOR EACH ROW EXECUTE FUNCTION update_campsites_updated_at_column();
+
+-- Report the last crawl time alongside the other aggregates
+CREATE OR REPLACE FUNCTION get_crawl_statistics()
+RETURNS JSONB AS $$
+  WITH grouped AS (
+    SELECT
+      COALESCE(category::TEXT, 'uncategorized') AS category,
+      COALESCE(country, 'Unknown') AS country,
+      COUNT(*) AS total,
+      MAX(updated_at) AS last_updated,
+      MAX(last_crawled_at) FILTER (WHERE source = 'crawler') AS last_crawled_at,
+      GROUPING(category) AS by_all_categories,
+      GROUPING(country) AS by_all_countries
+    FROM public.campsites
+    GROUP BY GROUPING SETS ((category), (country), ())
+  ),
+  failures AS (
+    SELECT
+      COUNT(*) FILTER (WHERE NOT permanent) AS pending_retries,
+      COUNT(*) FILTER (WHERE permanent) AS permanent_failures
+    FROM public.crawl_failures
+  )
+  SELECT jsonb_build_object(
+    'total_campsites', COALESCE((SELECT total FROM grouped WHERE by_all_categories = 1 AND by_all_countries = 1), 0),
+    'categories', COALESCE((SELECT jsonb_object_agg(category, total) FROM grouped WHERE by_all_categories = 0), '{}'::JSONB),
+    'countries', COALESCE((SELECT jsonb_object_agg(country, total) FROM grouped WHERE by_all_countries = 0), '{}'::JSONB),
+    'last_updated', (SELECT last_updated FROM grouped WHERE by_all_categories = 1 AND by_all_countries = 1),
+    'last_crawled_at', (SELECT last_crawled_at FROM grouped WHERE by_all_categories = 1 AND by_all_countries = 1),
+    'pending_retries', (SELECT pending_retries FROM failures),
+    'permanent_failures', (SELECT permanent_failures FROM failures)
+  );
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,44 @@
+-- Field-level updates from recrawls: the crawler stores a fingerprint of the
+-- columns it writes, and only rows whose extraction changed are updated,
+-- with only the changed columns
+
+ALTER TABLE public.campsites
+  ADD COLUMN content_fingerprint TEXT;
+
+ALTER TABLE public.campsites_archive
+  ADD COLUMN content_fingerprint TEXT;
+
+-- A fingerprint backfilled on an otherwise unchanged row is not a content change
+CREATE OR REPLACE FUNCTION update_campsites_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF (to_jsonb(NEW) - 'last_crawled_at' - 'updated_at' - 'content_fingerprint')
+     IS DISTINCT FROM (to_jsonb(OLD) - 'last_crawled_at' - 'updated_at' - 'content_fingerprint') THEN
+    NEW.updated_at = NOW();
+  END IF;
+  RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+-- Apply a batch of sparse updates in one statement. Each change is
+-- {"url": ..., "fields": {column: value, ...}, "fingerprint": ...}; columns
+-- missing from "fields" keep their current value.
+CREATE OR REPLACE FUNCTION apply_campsite_changes(changes JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+  updated INTEGER;
+BEGIN
+  UPDATE public.campsites AS c
+  SET (name, description, country, category, thumbnail_url) = (
+        SELECT r.name, r.description, r.country, r.category, r.thumbnail_url
+        FROM jsonb_populate_record(c, change->'fields') AS r
+      ),
+      content_fingerprint = change->>'fingerprint',
+      last_crawled_at = NOW()
+  FROM jsonb_array_elements(changes) AS change
+  WHERE c.url = change->>'url';
+
+  GET DIAGNOSTICS updated = ROW_COUNT;
+  RETURN updated;
+END;
+$$ LANGUAGE plpgsql;
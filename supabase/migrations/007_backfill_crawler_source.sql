@@ -0,0 +1,15 @@
+-- Rows the crawler wrote before 005 got the 'manual' default for source, so
+-- the retention job never considered them. Only the crawler stores content
+-- fingerprints (006), so a 'manual' row with one was written or recrawled by
+-- the crawler. Older rows it has not seen since cannot be told apart from
+-- admin-created ones and deliberately stay 'manual'.
+
+-- Reclassifying a row is not a content change, so it must not bump updated_at
+ALTER TABLE public.campsites DISABLE TRIGGER update_campsites_updated_at;
+
+UPDATE public.campsites
+SET source = 'crawler'
+WHERE source = 'manual'
+  AND content_fingerprint IS NOT NULL;
+
+ALTER TABLE public.campsites ENABLE TRIGGER update_campsites_updated_at;